@@ -0,0 +1,289 @@
+# Estados parciais de agregação por faixa, combináveis (map-reduce).
+# As tabelas por faixa dos scripts (média e desvio do tempo para merge, médias da ideia 3,
+# proporções de status da CI e de estados das reviews) só precisam, por faixa, de contagem,
+# soma, soma dos quadrados dos desvios, mínimo e máximo de cada coluna numérica e das
+# contagens de cada valor das colunas categóricas. Esses estados são calculados por
+# repositório (ou por lote de arquivos) em processos separados, viram JSON para ir de um
+# processo ou máquina para outro e são combinados em qualquer ordem e agrupamento: combinar é
+# associativo e comutativo. O estado final reproduz as tabelas do groupby sobre o corpus inteiro.
+# Formato do estado:
+#   {'numericas': {coluna: {faixa: {'n', 'soma', 'm2', 'minimo', 'maximo'}}},
+#    'categorias': {coluna: {faixa: {valor: contagem}}}}
+# A variância é guardada como soma dos quadrados dos desvios (m2) e combinada pela fórmula de
+# Chan et al., que não perde precisão como a diferença soma(x²) - soma(x)²/n.
+# Colunas declaradas em 'distribuicoes' guardam também um esboço de quantis por faixa (ver
+# quantis), de onde saem quartis, percentis e box plots sem manter as colunas inteiras:
+#    'distribuicoes': {coluna: {faixa: esboço}}
+
+import json
+from collections import defaultdict
+from functools import partial, reduce
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from carregador_prs import (BASE_DIR, listar_arquivos_de_prs, _ler_lote, compilar_projecao,
+                            enriquecer_com_faixa, executar_em_lotes)
+from metricas_vetorizadas import explodir_prs, calcular_eficiencia, calcular_qualidade
+from instrumentacao import instrumentado, registrar_erros, contar
+from quantis import (K_PADRAO, esbocos_por_grupo, combinar as combinar_esbocos, quantis as quantis_do_esboco,
+                     caixa, bordas_de_quantis)
+
+ORDEM_FAIXAS = ['E', 'D', 'C', 'B', 'A']
+CAMPOS_ESTADO = ('n', 'soma', 'm2', 'minimo', 'maximo')
+
+
+def estado_vazio():
+    return {'numericas': {}, 'categorias': {}, 'distribuicoes': {}}
+
+
+def resumir(df, colunas=(), categorias=(), grupo='faixa', distribuicoes=(), k=K_PADRAO):
+    """
+    Estado parcial de uma tabela (um PR, commit, review... por linha) agrupada por 'grupo'.
+    Valores nulos são ignorados nas colunas numéricas; nas categóricas, contam como 'None'.
+    As colunas de 'distribuicoes' ganham um esboço de quantis (de parâmetro k) por grupo.
+    """
+    estado = estado_vazio()
+    chaves = df[grupo].astype(str)
+    for coluna in colunas:
+        valores = pd.to_numeric(df[coluna], errors='coerce').astype('float64')
+        grupos = valores.groupby(chaves)
+        momentos = pd.DataFrame({'n': grupos.count(), 'soma': grupos.sum(), 'media': grupos.mean(),
+                                 'minimo': grupos.min(), 'maximo': grupos.max()})
+        desvios = (valores - chaves.map(momentos['media'])) ** 2
+        momentos['m2'] = desvios.groupby(chaves).sum()
+        estado['numericas'][coluna] = {
+            str(faixa): {campo: (int(linha[campo]) if campo == 'n' else float(linha[campo])) for campo in CAMPOS_ESTADO}
+            for faixa, linha in momentos[momentos['n'] > 0].iterrows()
+        }
+    for coluna in categorias:
+        contagens = df.groupby([chaves, df[coluna].astype(str)]).size()
+        por_faixa = defaultdict(dict)
+        for (faixa, valor), n in contagens.items():
+            por_faixa[faixa][valor] = int(n)
+        estado['categorias'][coluna] = dict(por_faixa)
+    for coluna in distribuicoes:
+        valores = pd.to_numeric(df[coluna], errors='coerce').to_numpy(dtype='float64')
+        estado['distribuicoes'][coluna] = esbocos_por_grupo(chaves.to_numpy(), valores, k)
+    return estado
+
+
+def _combinar_momentos(a, b):
+    n = a['n'] + b['n']
+    delta = b['soma'] / b['n'] - a['soma'] / a['n']
+    return {
+        'n': n,
+        'soma': a['soma'] + b['soma'],
+        'm2': a['m2'] + b['m2'] + delta * delta * a['n'] * b['n'] / n,
+        'minimo': min(a['minimo'], b['minimo']),
+        'maximo': max(a['maximo'], b['maximo']),
+    }
+
+
+def _combinar_dois(a, b):
+    resultado = estado_vazio()
+    for coluna in set(a['numericas']) | set(b['numericas']):
+        x, y = a['numericas'].get(coluna, {}), b['numericas'].get(coluna, {})
+        resultado['numericas'][coluna] = {
+            faixa: _combinar_momentos(x[faixa], y[faixa]) if faixa in x and faixa in y else dict(x.get(faixa) or y[faixa])
+            for faixa in set(x) | set(y)
+        }
+    for coluna in set(a['categorias']) | set(b['categorias']):
+        x, y = a['categorias'].get(coluna, {}), b['categorias'].get(coluna, {})
+        combinado = {}
+        for faixa in set(x) | set(y):
+            contagens = dict(x.get(faixa, {}))
+            for valor, n in y.get(faixa, {}).items():
+                contagens[valor] = contagens.get(valor, 0) + n
+            combinado[faixa] = contagens
+        resultado['categorias'][coluna] = combinado
+    x_todas, y_todas = a.get('distribuicoes', {}), b.get('distribuicoes', {})
+    for coluna in set(x_todas) | set(y_todas):
+        x, y = x_todas.get(coluna, {}), y_todas.get(coluna, {})
+        resultado['distribuicoes'][coluna] = {
+            faixa: combinar_esbocos(x[faixa], y[faixa]) if faixa in x and faixa in y else (x.get(faixa) or y[faixa])
+            for faixa in set(x) | set(y)
+        }
+    return resultado
+
+
+def combinar(*estados):
+    """
+    Combina estados parciais (de repositórios, lotes ou máquinas diferentes) em um só.
+    """
+    return reduce(_combinar_dois, estados, estado_vazio())
+
+
+def serializar(estado):
+    # Os níveis dos esboços de quantis são arrays NumPy
+    return json.dumps(estado, sort_keys=True, default=lambda valor: valor.tolist())
+
+
+def desserializar(texto):
+    return json.loads(texto)
+
+
+# --------------------------
+# Tabelas a partir do estado
+# --------------------------
+
+def media_e_desvio(estado, coluna, ordem=ORDEM_FAIXAS):
+    """
+    Mesma tabela de graficos.agregar_media_e_desvio: média, desvio padrão amostral e contagem.
+    """
+    momentos = estado['numericas'].get(coluna, {})
+    linhas = {}
+    for faixa, m in momentos.items():
+        linhas[faixa] = {'valor': m['soma'] / m['n'],
+                         'erro': np.sqrt(m['m2'] / (m['n'] - 1)) if m['n'] > 1 else np.nan,
+                         'n': m['n']}
+    return pd.DataFrame.from_dict(linhas, orient='index', columns=['valor', 'erro', 'n']).reindex(ordem)
+
+
+def medias(estado, colunas, ordem=ORDEM_FAIXAS):
+    """
+    Média de cada coluna por faixa (como df.groupby('faixa')[colunas].mean()).
+    """
+    return pd.DataFrame({coluna: media_e_desvio(estado, coluna, ordem)['valor'] for coluna in colunas})
+
+
+def proporcoes(estado, coluna, valores=None, ordem=ORDEM_FAIXAS):
+    """
+    Proporção de cada valor de uma coluna categórica por faixa (linhas somam 1). Com 'valores',
+    só esses entram no denominador (ex.: os status válidos da CI).
+    """
+    contagens = pd.DataFrame.from_dict(estado['categorias'].get(coluna, {}), orient='index').fillna(0)
+    if valores is not None:
+        contagens = contagens.reindex(columns=list(valores), fill_value=0)
+    return contagens.div(contagens.sum(axis=1), axis=0).reindex(ordem)
+
+
+def quantis_por_faixa(estado, coluna, qs=(0.25, 0.5, 0.75), ordem=ORDEM_FAIXAS):
+    """
+    Tabela de percentis aproximados (faixa x quantil) a partir dos esboços do estado.
+    """
+    esbocos = estado.get('distribuicoes', {}).get(coluna, {})
+    linhas = {faixa: quantis_do_esboco(esboco, qs) for faixa, esboco in esbocos.items()}
+    return pd.DataFrame.from_dict(linhas, orient='index', columns=list(qs)).reindex(ordem)
+
+
+def caixas(estado, coluna, ordem=ORDEM_FAIXAS):
+    """
+    Estatísticas de box plot por faixa, no formato de graficos.agregar_boxplot (Axes.bxp).
+    """
+    esbocos = estado.get('distribuicoes', {}).get(coluna, {})
+    return [caixa(esbocos[faixa], faixa) for faixa in ordem if faixa in esbocos and esbocos[faixa]['n'] > 0]
+
+
+def bordas(estado, coluna, q=4, faixas=ORDEM_FAIXAS):
+    """
+    Bordas de q caixas de mesma frequência da coluna somando as faixas pedidas (ex.: os
+    quartis de tamanho_pr usados com pd.cut no lugar de pd.qcut).
+    """
+    esbocos = [esboco for faixa, esboco in estado.get('distribuicoes', {}).get(coluna, {}).items() if faixa in faixas]
+    return bordas_de_quantis(reduce(combinar_esbocos, esbocos), q) if esbocos else np.array([])
+
+
+# --------------------------
+# Resumos das análises e execução por repositório
+# --------------------------
+
+def tabela_eficiencia(prs):
+    """
+    Tabela da ideia 2 (um PR por linha), como ideia_2.analisar_eficiencia.
+    """
+    return calcular_eficiencia(explodir_prs(prs))
+
+
+def resumir_tabela_eficiencia(df):
+    """
+    Estado da ideia 2 a partir da tabela: tempo para merge, hora e dia de criação e contagens
+    de status da CI.
+    """
+    return resumir(df, ['tempo_merge_horas', 'ci_sucesso', 'hora_criacao', 'dia_semana_criacao'], ['ci_status'],
+                   distribuicoes=['tempo_merge_horas', 'hora_criacao', 'dia_semana_criacao'])
+
+
+def resumir_eficiencia(prs):
+    """
+    Estado da ideia 2 a partir dos PRs.
+    """
+    return resumir_tabela_eficiencia(tabela_eficiencia(prs))
+
+
+def resumir_qualidade(prs):
+    """
+    Estado da ideia 3: médias das métricas de qualidade e contagens de estado das reviews.
+    """
+    tabelas = explodir_prs(prs)
+    df = calcular_qualidade(tabelas)
+    estado = resumir(df, ['num_review_comments', 'densidade_comentarios', 'rework_commits',
+                          'proporcao_changes_requested', 'tamanho_pr'],
+                     distribuicoes=['tamanho_pr', 'num_review_comments'])
+    reviews = tabelas['reviews']
+    reviews = reviews.assign(faixa=tabelas['prs']['faixa'].to_numpy()[reviews['pr'].to_numpy(dtype='int64')])
+    return combinar(estado, resumir(reviews, categorias=['state']))
+
+
+def _resumir_lote(lote, funcao_resumo, mapa_devs, projecao=None, funcao_tabela=None):
+    """
+    Executado nos processos do pool: lê os arquivos de um repositório e devolve apenas o estado
+    parcial (alguns kB), em JSON, os erros de leitura e, com funcao_tabela, a tabela resumida.
+    """
+    prs, erros, _ = _ler_lote(lote, projecao)
+    if mapa_devs is not None:
+        enriquecer_com_faixa(prs, mapa_devs)
+    if funcao_tabela is None:
+        return serializar(funcao_resumo(prs)), erros, None
+    tabela = funcao_tabela(prs)
+    return serializar(funcao_resumo(tabela)), erros, tabela
+
+
+@instrumentado('agregados')
+def resumir_por_repositorio(funcao_resumo, base_path=BASE_DIR, mapa_devs=None, campos=None, workers=None,
+                            apenas_amostra=True, arquivos=None, funcao_tabela=None, tabelas=None):
+    """
+    Map-reduce por repositório: cada repositório é lido e resumido por 'funcao_resumo' (ex.:
+    resumir_eficiencia, definida no nível do módulo) em um processo do pool, e os estados são
+    combinados à medida que chegam. Retorna (estado combinado, {repo: estado}).
+    Com 'arquivos' (lista de (repo, autor, caminho) já resolvida, ex.: por
+    amostragem.arquivos_da_amostra), o diretório base não é varrido. Com 'funcao_tabela' (ex.:
+    tabela_eficiencia), cada repositório vira primeiro uma tabela, resumida por 'funcao_resumo'
+    (ex.: resumir_tabela_eficiencia) e, se 'tabelas' for uma lista, anexada a ela: a mesma
+    leitura serve ao estado e às análises que precisam das linhas.
+    """
+    if arquivos is None:
+        autores = set(mapa_devs) if apenas_amostra and mapa_devs is not None else None
+        arquivos = listar_arquivos_de_prs(base_path, autores)
+    por_repo = defaultdict(list)
+    for arquivo in arquivos:
+        por_repo[arquivo[0]].append(arquivo)
+
+    projecao = compilar_projecao(campos) if campos is not None else None
+    funcao = partial(_resumir_lote, funcao_resumo=funcao_resumo, mapa_devs=mapa_devs, projecao=projecao,
+                     funcao_tabela=funcao_tabela)
+    repos = sorted(por_repo)
+    parciais = {}
+    lotes = executar_em_lotes(funcao, [por_repo[r] for r in repos], workers, True)
+    for repo, (texto, erros, tabela) in zip(repos, lotes):
+        registrar_erros(erros)
+        contar('arquivos_lidos', len(por_repo[repo]))
+        parciais[repo] = desserializar(texto)
+        if tabelas is not None and tabela is not None:
+            tabelas.append(tabela)
+    return combinar(*parciais.values()), parciais
+
+
+def resumir_em_fluxo(prs, funcao_resumo, tamanho_bloco=5000):
+    """
+    Resume um fluxo de PRs (ex.: carregador_prs.iterar_pull_requests) bloco a bloco: só um
+    bloco de PRs e o estado acumulado ficam em memória.
+    """
+    prs = iter(prs)
+    estado = estado_vazio()
+    while True:
+        bloco = list(islice(prs, tamanho_bloco))
+        if not bloco:
+            return estado
+        estado = combinar(estado, funcao_resumo(bloco))
@@ -0,0 +1,157 @@
+# Amostragem reprodutível e estratificada dos autores.
+# Os autores são sorteados por estrato (repositório x faixa) com um gerador semeado: a mesma
+# semente dá sempre a mesma amostra, e a semente de cada estrato deriva do nome do estrato, de
+# modo que incluir ou remover um repositório não muda o sorteio dos demais.
+# A amostra é resolvida contra um índice de arquivos já montado (o manifesto de
+# ingestao_incremental, que guarda repo e autor de cada JSON): só os results/*.json dos autores
+# sorteados são abertos, sem varrer o diretório do corpus.
+# Para estimar a variância de uma métrica, as subamostras repetidas são sorteadas sobre uma
+# tabela já carregada (um PR por linha): cada repetição só soma as contribuições por autor,
+# sem reler nenhum PR.
+
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from carregador_prs import BASE_DIR, FAIXA_DESCONHECIDA, chave_dev, listar_arquivos_de_prs, iterar_pull_requests
+from ingestao_incremental import carregar_manifesto
+
+SEMENTE_PADRAO = 42
+# Autores por estrato: 3 por faixa x 5 faixas = os 15 autores por repositório da ideia 2
+AUTORES_POR_ESTRATO = 3
+REPETICOES_PADRAO = 200
+
+
+def tabela_de_autores(autores):
+    """
+    Normaliza a origem dos autores em uma tabela (repo, author, faixa) com chaves normalizadas.
+    Aceita o mapa (repo, autor) -> faixa (carregar_faixas_desenvolvedores) ou o índice de
+    autores (indice_autores), do qual vêm apenas os autores da amostra.
+    """
+    if isinstance(autores, dict):
+        linhas = [chave_dev(repo, autor) + (faixa,) for (repo, autor), faixa in autores.items()]
+        return pd.DataFrame.from_records(linhas, columns=['repo', 'author', 'faixa'])
+    tabela = pd.DataFrame({
+        'repo': autores['repo'].astype(str).to_numpy(),
+        'author': autores['author'].astype(str).to_numpy(),
+        'faixa': autores['faixa'].astype(str).to_numpy(),
+    })
+    return tabela[tabela['faixa'] != FAIXA_DESCONHECIDA].reset_index(drop=True)
+
+
+def _tamanho_do_estrato(tamanhos, repo, faixa):
+    """
+    'tamanhos' pode ser um inteiro (o mesmo para todos os estratos), um dicionário por faixa
+    ({'A': 5, 'E': 2}) ou por estrato ({('org-proj', 'A'): 5}); estratos ausentes ficam vazios.
+    """
+    if isinstance(tamanhos, dict):
+        return tamanhos.get((repo, faixa), tamanhos.get(faixa, 0))
+    return tamanhos
+
+
+def _gerador(semente, *partes):
+    """
+    Gerador semeado pela semente global e pelos nomes (estáveis entre execuções) do estrato.
+    """
+    return np.random.default_rng([semente] + [zlib.crc32(str(parte).encode('utf-8')) for parte in partes])
+
+
+def sortear(autores, tamanhos=AUTORES_POR_ESTRATO, semente=SEMENTE_PADRAO):
+    """
+    Sorteia, sem reposição, 'tamanhos' autores em cada estrato (repositório x faixa).
+    Estratos menores que o tamanho pedido entram inteiros.
+    Retorna o mapa (repo, autor) -> faixa dos escolhidos, no formato de mapa_devs.
+    """
+    tabela = tabela_de_autores(autores)
+    escolhidos = {}
+    for (repo, faixa), grupo in tabela.groupby(['repo', 'faixa'], sort=True):
+        nomes = np.sort(grupo['author'].unique())
+        n = min(int(_tamanho_do_estrato(tamanhos, repo, faixa)), len(nomes))
+        if n <= 0:
+            continue
+        for autor in _gerador(semente, repo, faixa).choice(nomes, size=n, replace=False):
+            escolhidos[(repo, str(autor))] = faixa
+    return escolhidos
+
+
+def arquivos_da_amostra(escolhidos, manifesto=None, base_path=BASE_DIR):
+    """
+    Lista (repo, autor, caminho) dos JSONs dos autores escolhidos, em ordem determinística.
+    Com um manifesto de ingestao_incremental (o dicionário ou o caminho do dataset), os arquivos
+    vêm do índice e nenhum diretório é varrido; sem ele, apenas as pastas dos escolhidos são
+    listadas. Arquivos marcados com erro no manifesto ficam de fora.
+    """
+    if manifesto is None:
+        return listar_arquivos_de_prs(base_path, set(escolhidos))
+    if isinstance(manifesto, str):
+        manifesto = carregar_manifesto(manifesto)
+    return sorted(
+        (entrada['repo'], entrada['author'], caminho) for caminho, entrada in manifesto.items()
+        if not entrada.get('erro') and chave_dev(entrada['repo'], entrada['author']) in escolhidos
+    )
+
+
+def iterar_amostra(escolhidos, campos=None, manifesto=None, base_path=BASE_DIR, workers=None):
+    """
+    Gerador dos PRs dos autores escolhidos, enriquecidos com a faixa do sorteio
+    (ver carregador_prs.iterar_pull_requests).
+    """
+    arquivos = arquivos_da_amostra(escolhidos, manifesto, base_path)
+    print(f"-> Amostra: {len(escolhidos)} autores, {len(arquivos)} arquivos.")
+    return iterar_pull_requests(base_path, campos, escolhidos, workers, arquivos=arquivos)
+
+
+def _indicadores(n_autores, n_escolhidos, repeticoes, gerador):
+    """
+    Matriz booleana (repetições x autores) com 'n_escolhidos' autores marcados por linha,
+    sorteados sem reposição de forma independente em cada repetição.
+    """
+    ordem = gerador.random((repeticoes, n_autores)).argsort(axis=1)[:, :n_escolhidos]
+    marcados = np.zeros((repeticoes, n_autores), dtype=bool)
+    np.put_along_axis(marcados, ordem, True, axis=1)
+    return marcados
+
+
+def subamostrar_medias(df, coluna, tamanhos=AUTORES_POR_ESTRATO, repeticoes=REPETICOES_PADRAO,
+                       semente=SEMENTE_PADRAO):
+    """
+    Média de 'coluna' por faixa em 'repeticoes' subamostras estratificadas de autores.
+
+    'df' tem um PR por linha com as colunas 'repo', 'author', 'faixa' e 'coluna' (ex.: os PRs de
+    uma amostra maior já carregada). A soma e a contagem de cada autor são calculadas uma vez;
+    cada repetição sorteia os autores de cada estrato e combina essas parciais.
+    Retorna um DataFrame (repetição x faixa).
+    """
+    dados = df[['repo', 'author', 'faixa', coluna]].dropna(subset=[coluna])
+    dados = dados[dados['faixa'] != FAIXA_DESCONHECIDA]
+    repos, autores = dados['repo'].astype(str), dados['author'].astype(str)
+    por_autor = dados[coluna].astype('float64').groupby([repos, autores, dados['faixa']]).agg(['sum', 'count'])
+
+    somas, contagens = {}, {}
+    for (repo, faixa), grupo in por_autor.groupby(level=[0, 2], sort=True):
+        n = min(int(_tamanho_do_estrato(tamanhos, repo, faixa)), len(grupo))
+        if n <= 0:
+            continue
+        marcados = _indicadores(len(grupo), n, repeticoes, _gerador(semente, repo, faixa))
+        somas[faixa] = somas.get(faixa, 0) + marcados @ grupo['sum'].to_numpy()
+        contagens[faixa] = contagens.get(faixa, 0) + marcados @ grupo['count'].to_numpy()
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        medias = {faixa: somas[faixa] / contagens[faixa] for faixa in somas}
+    return pd.DataFrame(medias, index=pd.RangeIndex(repeticoes, name='repeticao'))
+
+
+def variancia_entre_subamostras(df, coluna, tamanhos=AUTORES_POR_ESTRATO, repeticoes=REPETICOES_PADRAO,
+                                semente=SEMENTE_PADRAO, ordem=('E', 'D', 'C', 'B', 'A')):
+    """
+    Resume subamostrar_medias por faixa: média das repetições, desvio padrão (o erro de
+    amostragem da média) e o intervalo de 95% entre os percentis 2,5 e 97,5.
+    """
+    medias = subamostrar_medias(df, coluna, tamanhos, repeticoes, semente)
+    return pd.DataFrame({
+        'media': medias.mean(),
+        'desvio': medias.std(),
+        'ic_inferior': medias.quantile(0.025),
+        'ic_superior': medias.quantile(0.975),
+    }).reindex(list(ordem))
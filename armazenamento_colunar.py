@@ -0,0 +1,189 @@
+# Armazenamento colunar (Parquet) do corpus de Pull Requests.
+# Substitui o pickle 'lista_completa_prs.pkl': os PRs enriquecidos são gravados como
+# datasets Parquet particionados por repositório, com uma tabela plana 'prs' e
+# tabelas filhas (commits, files, reviews, ...) ligadas pela chave (repo, pr_number).
+# As análises leem apenas as tabelas e colunas de que precisam.
+
+import os
+import json
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+DIRETORIO_PARQUET = 'prs-parquet'
+TABELAS_FILHAS = ('commits', 'files', 'reviews', 'review_comments', 'issue_comments', 'timeline')
+CHAVE_PR = ['repo', 'pr_number']
+PRS_POR_PARTE = 5000
+SEPARADOR = '.'
+
+_PARTICIONAMENTO = ds.partitioning(pa.schema([('repo', pa.string())]), flavor='hive')
+
+
+def _achatar(item, prefixo=''):
+    """
+    Achata um dicionário aninhado em colunas 'pai.filho'. Listas viram texto JSON.
+    """
+    linha = {}
+    for chave, valor in item.items():
+        nome = f"{prefixo}{chave}"
+        if isinstance(valor, dict):
+            linha.update(_achatar(valor, nome + SEPARADOR))
+        elif isinstance(valor, list):
+            linha[nome] = json.dumps(valor, ensure_ascii=False)
+        else:
+            linha[nome] = valor
+    return linha
+
+
+def _desachatar(linha):
+    """
+    Operação inversa de _achatar para uma linha lida do Parquet (valores nulos são omitidos).
+    """
+    item = {}
+    for nome, valor in linha.items():
+        if valor is None or (isinstance(valor, float) and pd.isna(valor)):
+            continue
+        partes = nome.split(SEPARADOR)
+        destino = item
+        for parte in partes[:-1]:
+            destino = destino.setdefault(parte, {})
+        destino[partes[-1]] = valor
+    return item
+
+
+def separar_em_tabelas(prs):
+    """
+    Converte uma lista de PRs (dicionários aninhados) em DataFrames: 'prs' e uma tabela por lista filha.
+    """
+    linhas = {'prs': []}
+    for nome in TABELAS_FILHAS:
+        linhas[nome] = []
+
+    for pr in prs:
+        chave = {'repo': pr['repo'], 'pr_number': pr.get('pr_number')}
+        plano = {}
+        for campo, valor in pr.items():
+            if campo in TABELAS_FILHAS and isinstance(valor, list):
+                for posicao, item in enumerate(valor):
+                    linha = dict(chave, posicao=posicao)
+                    linha.update(_achatar(item) if isinstance(item, dict) else {'valor': item})
+                    linhas[campo].append(linha)
+            elif isinstance(valor, dict):
+                plano.update(_achatar(valor, campo + SEPARADOR))
+            elif isinstance(valor, list):
+                plano[campo] = json.dumps(valor, ensure_ascii=False)
+            else:
+                plano[campo] = valor
+        plano.update(chave)
+        linhas['prs'].append(plano)
+
+    return {nome: pd.DataFrame(registros) for nome, registros in linhas.items()}
+
+
+def _gravar_parte(df, caminho_tabela, numero_parte):
+    if df.empty:
+        return
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(
+        tabela, caminho_tabela, format='parquet', partitioning=_PARTICIONAMENTO,
+        basename_template=f'parte-{numero_parte:05d}-{{i}}.parquet',
+        existing_data_behavior='overwrite_or_ignore'
+    )
+
+
+def exportar_para_parquet(prs, diretorio=DIRETORIO_PARQUET, prs_por_parte=PRS_POR_PARTE):
+    """
+    Grava o corpus como datasets Parquet particionados por repositório.
+    'prs' pode ser uma lista ou qualquer iterável (ex.: um gerador), gravado em partes
+    de 'prs_por_parte' PRs para que a exportação não precise do corpus inteiro em memória.
+    """
+    if os.path.isdir(diretorio):
+        shutil.rmtree(diretorio)
+
+    lote, partes, total = [], 0, 0
+    for pr in prs:
+        lote.append(pr)
+        if len(lote) >= prs_por_parte:
+            _exportar_lote(lote, diretorio, partes)
+            total, partes, lote = total + len(lote), partes + 1, []
+    if lote:
+        _exportar_lote(lote, diretorio, partes)
+        total, partes = total + len(lote), partes + 1
+
+    print(f"-> {total} PRs exportados para '{diretorio}' ({partes} partes).")
+
+
+def _exportar_lote(lote, diretorio, numero_parte):
+    for nome, df in separar_em_tabelas(lote).items():
+        _gravar_parte(df, os.path.join(diretorio, nome), numero_parte)
+
+
+def abrir_tabela(nome, diretorio=DIRETORIO_PARQUET):
+    """
+    Abre uma tabela como pyarrow.dataset. O schema é unificado entre as partes
+    (uma coluna toda nula em uma parte e preenchida em outra não gera conflito).
+    """
+    caminho = os.path.join(diretorio, nome)
+    dataset = ds.dataset(caminho, format='parquet', partitioning=_PARTICIONAMENTO)
+    schemas = [fragmento.physical_schema for fragmento in dataset.get_fragments()]
+    if len(schemas) > 1:
+        schema = pa.unify_schemas(schemas + [_PARTICIONAMENTO.schema], promote_options='permissive')
+        dataset = ds.dataset(caminho, schema=schema, format='parquet', partitioning=_PARTICIONAMENTO)
+    return dataset
+
+
+def ler_tabela(nome, diretorio=DIRETORIO_PARQUET, colunas=None, repos=None):
+    """
+    Lê uma tabela Parquet como DataFrame, projetando apenas as colunas pedidas
+    e, opcionalmente, apenas as partições dos repositórios informados.
+    """
+    caminho = os.path.join(diretorio, nome)
+    if not os.path.isdir(caminho):
+        return pd.DataFrame(columns=colunas or CHAVE_PR)
+
+    dataset = abrir_tabela(nome, diretorio)
+    if colunas is not None:
+        colunas = [c for c in colunas if c in dataset.schema.names]
+    filtro = ds.field('repo').isin(list(repos)) if repos is not None else None
+    return dataset.to_table(columns=colunas, filter=filtro).to_pandas()
+
+
+def reconstruir_prs(diretorio=DIRETORIO_PARQUET, colunas_prs=None, tabelas=(), colunas_filhas=None, repos=None):
+    """
+    Reconstrói a lista de PRs como dicionários aninhados, mas apenas com as colunas de 'prs'
+    e as tabelas filhas pedidas. Serve para as funções de análise que ainda iteram sobre dicionários.
+
+    colunas_filhas: dicionário opcional {tabela: [colunas]} para projetar as tabelas filhas.
+    """
+    colunas_filhas = colunas_filhas or {}
+    if colunas_prs is not None:
+        colunas_prs = list(dict.fromkeys(CHAVE_PR + list(colunas_prs)))
+    df_prs = ler_tabela('prs', diretorio, colunas_prs, repos)
+
+    filhos = {}
+    for nome in tabelas:
+        colunas = colunas_filhas.get(nome)
+        if colunas is not None:
+            colunas = list(dict.fromkeys(CHAVE_PR + ['posicao'] + list(colunas)))
+        df = ler_tabela(nome, diretorio, colunas, repos)
+        if df.empty:
+            filhos[nome] = {}
+            continue
+        df = df.sort_values(CHAVE_PR + ['posicao'])
+        itens = df.drop(columns=CHAVE_PR + ['posicao']).to_dict('records')
+        chaves = zip(df['repo'], df['pr_number'])
+        agrupado = {}
+        for chave, item in zip(chaves, itens):
+            agrupado.setdefault(chave, []).append(_desachatar(item))
+        filhos[nome] = agrupado
+
+    prs = []
+    for linha in df_prs.to_dict('records'):
+        pr = _desachatar(linha)
+        chave = (linha['repo'], linha['pr_number'])
+        for nome in tabelas:
+            pr[nome] = filhos[nome].get(chave, [])
+        prs.append(pr)
+    return prs
@@ -0,0 +1,281 @@
+# Benchmark de ponta a ponta das etapas do pipeline sobre um corpus (real ou sintético, ver
+# corpus_sintetico). Cada etapa roda num subprocesso próprio, para que o pico de memória
+# (RSS) medido seja o da etapa e não o acumulado das anteriores. Para cada etapa são
+# registrados o tempo de parede, o tempo de CPU (processo principal + pool), a quantidade de
+# itens processados, a vazão e o pico de RSS. O resultado de cada execução é anexado, como
+# uma linha JSON com o commit atual, a 'benchmark_resultados.jsonl', para comparar commits.
+#   python benchmark.py <corpus> [--workers N] [--etapas leitura,qualidade] [--saida arquivo]
+#   python benchmark.py --gerar <quantidade_de_prs> <destino>
+#   python benchmark.py --comparar <commit_a> <commit_b> [--saida arquivo]
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import resource
+import platform
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+CAMINHO_RESULTADOS = 'benchmark_resultados.jsonl'
+REPLICAS_BENCHMARK = 1000
+
+
+# --------------------------
+# Etapas
+# --------------------------
+# Cada etapa recebe (corpus, workers, trabalho), onde 'trabalho' é um diretório compartilhado
+# entre as etapas de uma mesma execução, e devolve a quantidade de itens processados.
+
+def etapa_varredura(corpus, workers, trabalho):
+    from carregador_prs import listar_arquivos_de_prs
+    return len(listar_arquivos_de_prs(corpus))
+
+
+def etapa_leitura(corpus, workers, trabalho):
+    from carregador_prs import iterar_pull_requests
+    return sum(1 for _ in iterar_pull_requests(corpus, workers=workers))
+
+
+def etapa_enriquecimento(corpus, workers, trabalho):
+    from carregador_prs import listar_arquivos_de_prs
+    from indice_autores import atualizar_indice, consultar
+    indice = atualizar_indice(corpus, os.path.join(trabalho, 'indice_autores.arrow'),
+                              os.path.join(trabalho, 'indice_autores.datas.feather'), workers)
+    arquivos = listar_arquivos_de_prs(corpus)
+    consultar(indice, [autor for _, autor, _ in arquivos], [repo for repo, _, _ in arquivos])
+    return len(arquivos)
+
+
+def etapa_eficiencia(corpus, workers, trabalho):
+    from carregador_prs import carregar_faixas_desenvolvedores
+    from ideia_2 import analisar_eficiencia_em_fluxo
+    df = analisar_eficiencia_em_fluxo(corpus, carregar_faixas_desenvolvedores(corpus), workers)
+    df.reset_index(drop=True).to_feather(os.path.join(trabalho, 'eficiencia.feather'))
+    return len(df)
+
+
+def etapa_qualidade(corpus, workers, trabalho):
+    from ideia_3 import analisar_qualidade_em_fluxo
+    from indice_autores import obter_indice
+    indice = obter_indice(corpus, os.path.join(trabalho, 'indice_autores.arrow'),
+                          os.path.join(trabalho, 'indice_autores.datas.feather'), workers)
+    df = analisar_qualidade_em_fluxo(corpus, workers, indice)
+    df.reset_index(drop=True).to_feather(os.path.join(trabalho, 'qualidade.feather'))
+    return len(df)
+
+
+def _prs_da_amostra(corpus, campos, workers):
+    from carregador_prs import carregar_faixas_desenvolvedores, iterar_pull_requests
+    mapa_devs = carregar_faixas_desenvolvedores(corpus)
+    return iterar_pull_requests(corpus, campos, mapa_devs, workers, apenas_amostra=True)
+
+
+def etapa_conformidade(corpus, workers, trabalho):
+    from conformidade_commits import tabela_de_commits, analisar_conformidade_commits
+    commits = tabela_de_commits(_prs_da_amostra(corpus, ['pr_number', 'commits[].message'], workers))
+    analisar_conformidade_commits(commits, workers=workers)
+    return len(commits)
+
+
+def etapa_escopo(corpus, workers, trabalho):
+    from classificacao_arquivos import tabela_de_arquivos, analisar_escopo_mudancas
+    arquivos = tabela_de_arquivos(_prs_da_amostra(corpus, ['pr_number', 'files[].filename'], workers))
+    mapeamento = {repo: ('src/', 'lib/', 'core/') for repo in arquivos['repo'].unique()}
+    analisar_escopo_mudancas(arquivos, mapeamento)
+    return len(arquivos)
+
+
+def etapa_timeline(corpus, workers, trabalho):
+    from eventos_timeline import tabelas_da_timeline, analisar_auto_revisao
+    df_prs, eventos = tabelas_da_timeline(_prs_da_amostra(corpus, ['pr_number', 'created_at', 'timeline'], workers))
+    analisar_auto_revisao(df_prs, eventos)
+    return len(eventos)
+
+
+def etapa_sentimento(corpus, workers, trabalho):
+    from classificacao_sentimento import coletar_comentarios, classificar_textos
+    comentarios = coletar_comentarios(corpus, workers=workers)
+    classificar_textos(comentarios['texto'].tolist(), cache={}, workers=workers)
+    return len(comentarios)
+
+
+def etapa_testes(corpus, workers, trabalho):
+    import pandas as pd
+    from testes_estatisticos import analisar_metrica
+    df = pd.read_feather(os.path.join(trabalho, 'qualidade.feather'))
+    analisar_metrica(df, 'densidade_comentarios', replicas=REPLICAS_BENCHMARK, workers=workers)
+    return len(df)
+
+
+def etapa_graficos(corpus, workers, trabalho):
+    import pandas as pd
+    import ideia_2
+    import ideia_3
+    from graficos import renderizar_graficos
+    eficiencia = pd.read_feather(os.path.join(trabalho, 'eficiencia.feather'))
+    qualidade = pd.read_feather(os.path.join(trabalho, 'qualidade.feather'))
+    especificacoes = (ideia_2.especificacoes_eficiencia(ideia_2.agregar_eficiencia(eficiencia))
+                      + ideia_3.especificacoes_qualidade(ideia_3.agregar_qualidade(qualidade)))
+    renderizar_graficos(especificacoes, workers, os.path.join(trabalho, 'graficos'))
+    return len(eficiencia) + len(qualidade)
+
+
+# 'modulos': módulos importados antes de iniciar a medição, para que o tempo de importar
+# pandas, pyarrow, scipy, matplotlib... não entre no tempo (nem na vazão) da etapa.
+ETAPAS = {
+    'varredura': {'funcao': etapa_varredura, 'modulos': ['carregador_prs']},
+    'leitura': {'funcao': etapa_leitura, 'modulos': ['carregador_prs']},
+    'enriquecimento': {'funcao': etapa_enriquecimento, 'modulos': ['carregador_prs', 'indice_autores']},
+    'eficiencia': {'funcao': etapa_eficiencia, 'modulos': ['carregador_prs', 'ideia_2']},
+    'qualidade': {'funcao': etapa_qualidade, 'modulos': ['ideia_3', 'indice_autores']},
+    'conformidade': {'funcao': etapa_conformidade, 'modulos': ['carregador_prs', 'conformidade_commits']},
+    'escopo': {'funcao': etapa_escopo, 'modulos': ['carregador_prs', 'classificacao_arquivos']},
+    'timeline': {'funcao': etapa_timeline, 'modulos': ['carregador_prs', 'eventos_timeline']},
+    'sentimento': {'funcao': etapa_sentimento, 'modulos': ['classificacao_sentimento']},
+    'testes': {'funcao': etapa_testes, 'modulos': ['pandas', 'testes_estatisticos']},
+    'graficos': {'funcao': etapa_graficos, 'modulos': ['pandas', 'ideia_2', 'ideia_3', 'graficos']},
+}
+
+
+# --------------------------
+# Medição
+# --------------------------
+
+def medir_etapa(nome, corpus, workers, trabalho):
+    """
+    Executa uma etapa no processo atual e devolve as medidas. Os módulos da etapa são
+    importados antes da medição. O pico de RSS do pool é o maior entre os processos filhos já
+    encerrados (os workers terminam junto com o pool).
+    """
+    for modulo in ETAPAS[nome]['modulos']:
+        importlib.import_module(modulo)
+    antes_filhos = resource.getrusage(resource.RUSAGE_CHILDREN)
+    antes = resource.getrusage(resource.RUSAGE_SELF)
+    inicio = time.perf_counter()
+    itens = ETAPAS[nome]['funcao'](corpus, workers, trabalho)
+    segundos = time.perf_counter() - inicio
+    depois = resource.getrusage(resource.RUSAGE_SELF)
+    depois_filhos = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    cpu = ((depois.ru_utime + depois.ru_stime) - (antes.ru_utime + antes.ru_stime)
+           + (depois_filhos.ru_utime + depois_filhos.ru_stime) - (antes_filhos.ru_utime + antes_filhos.ru_stime))
+    return {
+        'etapa': nome,
+        'segundos': round(segundos, 4),
+        'cpu_segundos': round(cpu, 4),
+        'itens': itens,
+        'itens_por_segundo': round(itens / segundos, 2) if segundos > 0 else None,
+        # ru_maxrss é dado em KiB no Linux
+        'pico_rss_mb': round(depois.ru_maxrss / 1024, 1),
+        'pico_rss_workers_mb': round(depois_filhos.ru_maxrss / 1024, 1),
+    }
+
+
+def _executar_em_subprocesso(nome, corpus, workers, trabalho):
+    comando = [sys.executable, os.path.abspath(__file__), '--etapa', nome, os.path.abspath(corpus),
+               '--trabalho', trabalho]
+    if workers is not None:
+        comando += ['--workers', str(workers)]
+    # A etapa roda dentro do diretório de trabalho: arquivos gravados em caminhos relativos
+    # (datasets, manifestos, caches) não vão parar no repositório
+    processo = subprocess.run(comando, capture_output=True, text=True, cwd=trabalho)
+    if processo.returncode != 0:
+        print(processo.stderr)
+        return {'etapa': nome, 'erro': processo.stderr.strip().splitlines()[-1:]}
+    # A medida é a última linha da saída; as anteriores são os prints da própria etapa
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def executar_benchmark(corpus, etapas=None, workers=None, caminho_resultados=CAMINHO_RESULTADOS):
+    """
+    Executa as etapas pedidas (todas, por padrão, na ordem de ETAPAS), cada uma num subprocesso,
+    imprime uma tabela e anexa o resultado a 'caminho_resultados'. Retorna o resultado.
+    """
+    from carregador_prs import listar_arquivos_de_prs
+
+    etapas = etapas or list(ETAPAS)
+    resultado = {
+        'commit': commit_atual(),
+        'data': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'corpus': os.path.abspath(corpus),
+        'prs': len(listar_arquivos_de_prs(corpus)),
+        'workers': workers,
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+        'etapas': [],
+    }
+    with tempfile.TemporaryDirectory(prefix='benchmark-') as trabalho:
+        for nome in etapas:
+            medida = _executar_em_subprocesso(nome, corpus, workers, trabalho)
+            resultado['etapas'].append(medida)
+            if 'erro' in medida:
+                print(f"{nome:>15}: ERRO {medida['erro']}")
+            else:
+                print(f"{nome:>15}: {medida['segundos']:9.2f} s  {medida['cpu_segundos']:9.2f} s CPU  "
+                      f"{medida['itens_por_segundo'] or 0:12.1f} itens/s  "
+                      f"pico {medida['pico_rss_mb']:8.1f} MB (pool {medida['pico_rss_workers_mb']:.1f} MB)")
+
+    with open(caminho_resultados, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(resultado) + '\n')
+    print(f"-> Resultado anexado a '{caminho_resultados}' (commit {resultado['commit']}, {resultado['prs']} PRs).")
+    return resultado
+
+
+def comparar_resultados(commit_a, commit_b, caminho_resultados=CAMINHO_RESULTADOS):
+    """
+    Compara a última execução de cada commit em 'caminho_resultados', etapa por etapa.
+    Retorna um DataFrame com os tempos, a razão b/a e os picos de memória.
+    """
+    import pandas as pd
+
+    ultimos = {}
+    with open(caminho_resultados, 'r', encoding='utf-8') as f:
+        for linha in f:
+            resultado = json.loads(linha)
+            ultimos[resultado['commit']] = resultado
+    tabelas = []
+    for commit in (commit_a, commit_b):
+        if commit not in ultimos:
+            raise KeyError(f"Commit '{commit}' não encontrado em '{caminho_resultados}'.")
+        etapas = pd.DataFrame([e for e in ultimos[commit]['etapas'] if 'erro' not in e]).set_index('etapa')
+        tabelas.append(etapas[['segundos', 'pico_rss_mb']].add_suffix(f'_{commit}'))
+    comparacao = tabelas[0].join(tabelas[1], how='outer')
+    comparacao['razao_tempo'] = comparacao[f'segundos_{commit_b}'] / comparacao[f'segundos_{commit_a}']
+    return comparacao
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das etapas da análise de PRs.")
+    parser.add_argument('corpus', nargs='?', help="diretório repositories-mined")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--etapas', default=None, help="lista separada por vírgulas (padrão: todas)")
+    parser.add_argument('--saida', default=CAMINHO_RESULTADOS)
+    parser.add_argument('--gerar', nargs=2, metavar=('PRS', 'DESTINO'), help="gera um corpus sintético")
+    parser.add_argument('--comparar', nargs=2, metavar=('COMMIT_A', 'COMMIT_B'))
+    # Uso interno: execução de uma única etapa no subprocesso
+    parser.add_argument('--etapa', help=argparse.SUPPRESS)
+    parser.add_argument('--trabalho', help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+
+    if argumentos.etapa:
+        print(json.dumps(medir_etapa(argumentos.etapa, argumentos.corpus, argumentos.workers, argumentos.trabalho)))
+    elif argumentos.gerar:
+        from corpus_sintetico import gerar_corpus
+        gerar_corpus(argumentos.gerar[1], int(argumentos.gerar[0]), workers=argumentos.workers)
+    elif argumentos.comparar:
+        print(comparar_resultados(*argumentos.comparar, argumentos.saida).to_string())
+    else:
+        etapas = argumentos.etapas.split(',') if argumentos.etapas else None
+        executar_benchmark(argumentos.corpus, etapas, argumentos.workers, argumentos.saida)
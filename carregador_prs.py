@@ -0,0 +1,256 @@
+# Carregador compartilhado dos Pull Requests minerados.
+# Todas as análises (ideias 1 a 5) leem a mesma árvore:
+#   repositories-mined/<repo>/sample-devs.jsonl
+#   repositories-mined/<repo>/developer/<dev>/results/*.json
+# Este módulo concentra a varredura dos diretórios, a leitura dos JSONs (em paralelo,
+# com um pool de processos) e o enriquecimento com repo, autor e faixa.
+# Cada análise pode declarar os campos de que precisa (ex.: 'files[].additions'): o PR é
+# projetado nesses campos ainda no processo de leitura, e os registros chegam em fluxo.
+
+import os
+import json
+import time
+from collections import deque
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from instrumentacao import etapa, contar, acumular_tempo, registrar_arquivos, registrar_erros
+
+BASE_DIR = 'repositories-mined'
+FAIXA_DESCONHECIDA = 'Desconhecida'
+TAMANHO_LOTE_PADRAO = 64
+
+
+def chave_dev(repo, autor):
+    """
+    Normaliza o par (repositório, autor) usado como chave nos mapeamentos de faixa.
+    """
+    return (repo.lower().replace('/', '-'), autor.lower())
+
+
+def carregar_faixas_desenvolvedores(base_path=BASE_DIR):
+    """
+    Carrega o mapeamento de (repositório, autor) para a faixa a partir dos arquivos sample-devs.jsonl.
+    """
+    mapa_devs = {}
+    if not os.path.isdir(base_path):
+        print(f"ERRO: O diretório base '{base_path}' não foi encontrado.")
+        return mapa_devs
+
+    for repo_name in sorted(os.listdir(base_path)):
+        devs_file = os.path.join(base_path, repo_name, 'sample-devs.jsonl')
+        if not os.path.isfile(devs_file):
+            continue
+        with open(devs_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                    mapa_devs[chave_dev(data['repo'], data['author'])] = data['faixa']
+                except (json.JSONDecodeError, KeyError):
+                    print(f"Aviso: Linha mal formatada em {devs_file}: {line.strip()}")
+    print(f"-> Mapeamento de {len(mapa_devs)} desenvolvedores carregado.")
+    return mapa_devs
+
+
+def listar_arquivos_de_prs(base_path=BASE_DIR, autores=None):
+    """
+    Lista os JSONs de PR como tuplas (repo, autor, caminho), em ordem determinística.
+    Se 'autores' for informado (conjunto de chaves (repo, autor) normalizadas),
+    somente as pastas desses autores são listadas.
+    """
+    arquivos = []
+    if not os.path.isdir(base_path):
+        return arquivos
+
+    with etapa('varredura') as registro:
+        for repo_name in sorted(os.listdir(base_path)):
+            devs_path = os.path.join(base_path, repo_name, 'developer')
+            if not os.path.isdir(devs_path):
+                continue
+            for dev_name in sorted(os.listdir(devs_path)):
+                if autores is not None and chave_dev(repo_name, dev_name) not in autores:
+                    continue
+                results_path = os.path.join(devs_path, dev_name, 'results')
+                if not os.path.isdir(results_path):
+                    continue
+                for entrada in sorted(os.scandir(results_path), key=lambda e: e.name):
+                    if entrada.name.endswith('.json') and entrada.is_file():
+                        arquivos.append((repo_name, dev_name, entrada.path))
+        registro['itens'] = len(arquivos)
+    return arquivos
+
+
+def compilar_projecao(campos):
+    """
+    Converte caminhos de campos em uma árvore de projeção.
+    Ex.: ['created_at', 'counts', 'files[].additions'] -> {'created_at': True, 'counts': True,
+    'files': {'additions': True}}. O sufixo '[]' apenas documenta que o campo é uma lista:
+    a projeção de uma lista é aplicada a cada um dos seus elementos.
+    """
+    arvore = {}
+    for campo in campos:
+        no = arvore
+        partes = [parte.removesuffix('[]') for parte in campo.split('.')]
+        for parte in partes[:-1]:
+            if no.get(parte) is True:
+                break
+            no = no.setdefault(parte, {})
+        else:
+            no[partes[-1]] = True
+    return arvore
+
+
+def projetar(valor, arvore):
+    """
+    Mantém de 'valor' (dicionário, lista ou escalar) apenas os campos presentes na árvore de projeção.
+    """
+    if arvore is True:
+        return valor
+    if isinstance(valor, list):
+        return [projetar(item, arvore) for item in valor]
+    if isinstance(valor, dict):
+        return {chave: projetar(valor[chave], sub) for chave, sub in arvore.items() if chave in valor}
+    return valor
+
+
+def _ler_lote(lote, projecao=None):
+    """
+    Lê um lote de arquivos (executado nos processos do pool), projetando cada PR nos campos pedidos.
+    Retorna a lista de PRs lidos, a lista de erros (caminho, mensagem) e o tempo de leitura
+    de cada arquivo (segundos, caminho).
+    """
+    prs, erros, tempos = [], [], []
+    for repo_name, dev_name, caminho in lote:
+        inicio = time.perf_counter()
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                pr_data = json.load(f)
+            if not isinstance(pr_data, dict):
+                raise ValueError(f"esperado um objeto JSON, encontrado {type(pr_data).__name__}")
+            if projecao is not None:
+                pr_data = projetar(pr_data, projecao)
+            pr_data['repo'] = repo_name
+            pr_data['author'] = dev_name
+            prs.append(pr_data)
+        except (OSError, ValueError) as e:
+            erros.append((caminho, str(e)))
+        tempos.append((time.perf_counter() - inicio, caminho))
+    return prs, erros, tempos
+
+
+def dividir_em_lotes(itens, tamanho_lote):
+    return [itens[i:i + tamanho_lote] for i in range(0, len(itens), tamanho_lote)]
+
+
+def executar_em_lotes(funcao, lotes, workers, ordenado, janela=None):
+    """
+    Aplica 'funcao' a cada lote, em série (workers=1) ou num pool de processos.
+    Com ordenado=True os resultados saem na ordem dos lotes; senão, na ordem de conclusão.
+    No máximo 'janela' lotes (padrão: 2 por processo) ficam em andamento ao mesmo tempo, de modo
+    que a memória ocupada pelos resultados não cresce com o corpus quando o consumo é em fluxo.
+    """
+    if workers == 1 or len(lotes) <= 1:
+        for lote in lotes:
+            yield funcao(lote)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    janela = janela or 2 * workers
+    restantes = iter(lotes)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pendentes = deque(executor.submit(funcao, lote) for lote in _primeiros(restantes, janela))
+        while pendentes:
+            if ordenado:
+                concluido = pendentes.popleft()
+                resultado = concluido.result()
+            else:
+                prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                concluido = prontos.pop()
+                pendentes.remove(concluido)
+                resultado = concluido.result()
+            for lote in _primeiros(restantes, 1):
+                pendentes.append(executor.submit(funcao, lote))
+            yield resultado
+
+
+def _primeiros(iterador, n):
+    for _ in range(n):
+        try:
+            yield next(iterador)
+        except StopIteration:
+            return
+
+
+def enriquecer_com_faixa(prs, mapa_devs):
+    """
+    Adiciona a chave 'faixa' a cada PR a partir do mapeamento (repo, autor) -> faixa.
+    """
+    for pr in prs:
+        pr['faixa'] = mapa_devs.get(chave_dev(pr['repo'], pr['author']), FAIXA_DESCONHECIDA)
+    return prs
+
+
+def iterar_pull_requests(base_path=BASE_DIR, campos=None, mapa_devs=None, workers=None,
+                         tamanho_lote=TAMANHO_LOTE_PADRAO, ordenado=True,
+                         apenas_amostra=False, autores=None, erros=None, arquivos=None):
+    """
+    Gerador de PRs enriquecidos com 'repo', 'author' e (com mapa_devs) 'faixa'.
+
+    Com 'campos' (ex.: ['created_at', 'files[].additions']), cada PR é projetado apenas nesses
+    campos ainda no processo de leitura; o documento completo é descartado logo após o parse.
+    Como os lotes são consumidos em fluxo, a memória de pico é limitada por alguns lotes e não
+    pelo corpus. Erros de leitura são contados na instrumentação (ver instrumentacao) e, se
+    'erros' for uma lista, anexados a ela. O tempo gasto esperando pelos lotes é acumulado em
+    'leitura', separado do tempo de quem consome os PRs.
+    Com 'arquivos' (lista de (repo, autor, caminho) já resolvida, ex.: pela amostragem), o
+    diretório base não é varrido.
+    """
+    if arquivos is None:
+        if autores is None and apenas_amostra and mapa_devs is not None:
+            autores = set(mapa_devs)
+        arquivos = listar_arquivos_de_prs(base_path, autores)
+    projecao = compilar_projecao(campos) if campos is not None else None
+
+    funcao = partial(_ler_lote, projecao=projecao)
+    lotes = executar_em_lotes(funcao, dividir_em_lotes(arquivos, tamanho_lote), workers, ordenado)
+    while True:
+        inicio = time.perf_counter()
+        try:
+            prs, erros_lote, tempos = next(lotes)
+        except StopIteration:
+            break
+        acumular_tempo('leitura', time.perf_counter() - inicio)
+        registrar_arquivos(tempos)
+        registrar_erros(erros_lote)
+        contar('arquivos_lidos', len(tempos))
+        if erros is not None:
+            erros.extend(erros_lote)
+        if mapa_devs is not None:
+            enriquecer_com_faixa(prs, mapa_devs)
+        yield from prs
+
+
+def carregar_pull_requests(base_path=BASE_DIR, mapa_devs=None, workers=None,
+                           tamanho_lote=TAMANHO_LOTE_PADRAO, ordenado=True,
+                           apenas_amostra=False, autores=None, campos=None):
+    """
+    Carrega os JSONs dos PRs e enriquece cada um com 'repo' e 'author' (extraídos do caminho)
+    e 'faixa' (do mapa_devs, quando informado).
+
+    - workers: número de processos (None = todos os núcleos, 1 = leitura em série);
+    - tamanho_lote: quantos arquivos cada tarefa do pool lê de uma vez;
+    - ordenado: mantém a ordem determinística dos arquivos no resultado;
+    - apenas_amostra: lê somente os autores presentes no mapa_devs;
+    - autores: conjunto explícito de chaves (repo, autor) a serem lidas;
+    - campos: caminhos dos campos a manter em cada PR (ver iterar_pull_requests).
+    """
+    print(f"Iniciando varredura em: {base_path}")
+    erros = []
+    with etapa('carregamento') as registro:
+        todos_os_prs = list(iterar_pull_requests(base_path, campos, mapa_devs, workers, tamanho_lote,
+                                                 ordenado, apenas_amostra, autores, erros))
+        registro['itens'] = len(todos_os_prs)
+    print(f"Carregamento concluído. Total de {len(todos_os_prs)} PRs encontrados ({len(erros)} com erro).")
+    return todos_os_prs
@@ -0,0 +1,149 @@
+# Classificação dos arquivos modificados em áreas do projeto (ideia 5, escopo das mudanças).
+# O mapeamento de cada repositório associa prefixos de caminho a áreas, ex.:
+#   {'nodejs-node': ('src/', 'lib/')}                      -> todos os prefixos são 'core'
+#   {'zed-industries-zed': {'crates/': 'core',
+#                           'crates/gpui/': ('core/ui', 0.5),
+#                           'docs/': ('docs', 0.0)}}      -> áreas com peso e subáreas
+# Vale o prefixo mais longo, então 'crates/gpui/x.rs' cai em 'core/ui'. Áreas com '/'
+# formam níveis: no nível 1, 'core/ui' conta como 'core'.
+# Em vez de testar cada arquivo contra cada prefixo, os nomes de arquivo de um repositório
+# são ordenados uma vez e cada prefixo vira um intervalo contíguo dessa ordem (np.searchsorted),
+# de modo que o custo cresce com log(arquivos) por prefixo, e não com arquivos x prefixos.
+
+import numpy as np
+import pandas as pd
+
+from carregador_prs import FAIXA_DESCONHECIDA
+from instrumentacao import instrumentado
+
+AREA_CORE = 'core'
+AREA_PERIFERIA = 'periferia'
+PESO_CORE = 1.0
+PESO_PERIFERIA = 0.0
+_MAIOR_CARACTERE = chr(0x10FFFF)
+
+
+def compilar_areas(mapeamento):
+    """
+    Normaliza o mapeamento repo -> prefixos em repo -> (prefixos, áreas, pesos), com os prefixos
+    ordenados do mais curto para o mais longo (a atribuição dos mais longos prevalece).
+    Aceita uma tupla de prefixos 'core' ou um dicionário prefixo -> área ou (área, peso).
+    """
+    compilado = {}
+    for repo, regras in mapeamento.items():
+        if not isinstance(regras, dict):
+            regras = {prefixo: AREA_CORE for prefixo in regras}
+        entradas = []
+        for prefixo, destino in regras.items():
+            area, peso = destino if isinstance(destino, tuple) else (destino, None)
+            if peso is None:
+                peso = PESO_CORE if area_no_nivel(area, 1) == AREA_CORE else PESO_PERIFERIA
+            entradas.append((prefixo, area, float(peso)))
+        entradas.sort(key=lambda entrada: len(entrada[0]))
+        compilado[repo] = (
+            [prefixo for prefixo, _, _ in entradas],
+            [area for _, area, _ in entradas],
+            np.array([peso for _, _, peso in entradas], dtype='float64'),
+        )
+    return compilado
+
+
+def area_no_nivel(area, nivel):
+    """
+    Corta o nome hierárquico da área no nível pedido: area_no_nivel('core/ui', 1) == 'core'.
+    """
+    return '/'.join(area.split('/')[:nivel])
+
+
+def _classificar_nomes(nomes, prefixos, areas, pesos):
+    """
+    Classifica um vetor de nomes de arquivo (já únicos e ordenados) pelos prefixos compilados.
+    Retorna os códigos de área (-1 = periferia) e os pesos de cada nome.
+    """
+    codigos = np.full(len(nomes), -1, dtype='int64')
+    pesos_nomes = np.full(len(nomes), PESO_PERIFERIA, dtype='float64')
+    inicio = np.searchsorted(nomes, np.array(prefixos), side='left')
+    fim = np.searchsorted(nomes, np.array([p + _MAIOR_CARACTERE for p in prefixos]), side='left')
+    for codigo, (a, b) in enumerate(zip(inicio, fim)):
+        if a < b:
+            codigos[a:b] = codigo
+            pesos_nomes[a:b] = pesos[codigo]
+    return codigos, pesos_nomes
+
+
+def classificar_arquivos(arquivos, areas_compiladas):
+    """
+    Adiciona as colunas 'area' e 'peso' a uma tabela de arquivos com as colunas 'repo' e 'filename'.
+    Arquivos de repositórios sem mapeamento ficam com área nula.
+    """
+    arquivos = arquivos.copy()
+    area = np.full(len(arquivos), None, dtype=object)
+    peso = np.full(len(arquivos), np.nan, dtype='float64')
+    nomes_arquivos = arquivos['filename'].fillna('').astype(str).to_numpy()
+
+    for repo, linhas in arquivos.groupby('repo', sort=False).indices.items():
+        if repo not in areas_compiladas:
+            continue
+        prefixos, areas, pesos = areas_compiladas[repo]
+        nomes, inverso = np.unique(nomes_arquivos[linhas], return_inverse=True)
+        codigos, pesos_nomes = _classificar_nomes(nomes, prefixos, areas, pesos)
+        rotulos = np.array(areas + [AREA_PERIFERIA], dtype=object)
+        area[linhas] = rotulos[codigos[inverso]]
+        peso[linhas] = pesos_nomes[inverso]
+
+    arquivos['area'] = area
+    arquivos['peso'] = peso
+    return arquivos
+
+
+def tabela_de_arquivos(prs):
+    """
+    Explode os PRs (dicionários) em uma tabela (repo, pr_number, faixa, filename), um arquivo por linha.
+    """
+    linhas = [
+        (pr.get('repo'), pr.get('pr_number'), pr.get('faixa'), arquivo.get('filename', ''))
+        for pr in prs for arquivo in pr.get('files') or []
+    ]
+    return pd.DataFrame.from_records(linhas, columns=['repo', 'pr_number', 'faixa', 'filename'])
+
+
+def tabela_de_arquivos_do_parquet(diretorio, repos=None):
+    """
+    Lê a mesma tabela diretamente do armazenamento Parquet (ver armazenamento_colunar).
+    """
+    from armazenamento_colunar import ler_tabela, CHAVE_PR
+
+    arquivos = ler_tabela('files', diretorio, CHAVE_PR + ['filename'], repos)
+    faixas = ler_tabela('prs', diretorio, CHAVE_PR + ['faixa'], repos)
+    return arquivos.merge(faixas, on=CHAVE_PR, how='left')[['repo', 'pr_number', 'faixa', 'filename']]
+
+
+def _por_area(areas, funcao):
+    # A função é avaliada uma vez por área distinta, não uma vez por arquivo
+    return {area: funcao(area) for area in areas.unique()}
+
+
+@instrumentado('escopo')
+def analisar_escopo_mudancas(arquivos, core_dirs_mapping, nivel=None):
+    """
+    Calcula, por PR, a proporção de arquivos "core" modificados e o peso médio dos arquivos.
+    'arquivos' é a tabela de tabela_de_arquivos (ou do Parquet). Com 'nivel', também devolve
+    uma coluna 'proporcao_<area>' para cada área cortada nesse nível.
+    PRs de faixa desconhecida e de repositórios fora do mapeamento são ignorados.
+    """
+    areas_compiladas = compilar_areas(core_dirs_mapping)
+    arquivos = arquivos[(arquivos['faixa'] != FAIXA_DESCONHECIDA) & arquivos['repo'].isin(list(areas_compiladas))]
+    arquivos = classificar_arquivos(arquivos, areas_compiladas)
+    arquivos['core'] = arquivos['area'].map(_por_area(arquivos['area'], lambda area: area_no_nivel(area, 1) == AREA_CORE))
+
+    chave = ['repo', 'pr_number']
+    por_pr = arquivos.groupby(chave, sort=False).agg(
+        faixa=('faixa', 'first'), proporcao_core=('core', 'mean'), peso_medio=('peso', 'mean'))
+
+    if nivel is not None:
+        areas = arquivos['area'].map(_por_area(arquivos['area'], lambda area: area_no_nivel(area, nivel)))
+        proporcoes = pd.crosstab([arquivos['repo'], arquivos['pr_number']], areas, normalize='index')
+        proporcoes.columns = [f'proporcao_{area}' for area in proporcoes.columns]
+        por_pr = por_pr.join(proporcoes.drop(columns=[f'proporcao_{AREA_CORE}'], errors='ignore'))
+
+    return por_pr.reset_index().drop(columns=['repo'])
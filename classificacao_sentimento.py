@@ -0,0 +1,184 @@
+# Classificação do sentimento dos comentários dos PRs (ideia 4).
+# Gera o 'analise_sentimento.csv' (faixa_autor, resultado_pr, categoria_sentimento) usado
+# por ideia4_llm.py, agora para o corpus inteiro:
+#   1. os corpos de reviews, review_comments e issue_comments são lidos em fluxo;
+#   2. cada texto é identificado pelo hash do conteúdo (e do classificador usado); textos já
+#      classificados vêm do cache e nunca são reclassificados;
+#   3. os textos novos são enviados em lotes a um classificador plugável, em paralelo.
+# O classificador padrão é local, baseado em regras (palavras-chave), sem rede nem GPU.
+# Qualquer função de nível de módulo que receba uma lista de textos e devolva a lista de
+# categorias ('A' a 'E') pode substituí-lo, ex.: um modelo local carregado no processo.
+
+import os
+import hashlib
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from carregador_prs import (BASE_DIR, FAIXA_DESCONHECIDA, carregar_faixas_desenvolvedores,
+                            iterar_pull_requests, dividir_em_lotes, executar_em_lotes)
+from instrumentacao import instrumentado
+
+CAMINHO_SAIDA = 'analise_sentimento.csv'
+CAMINHO_CACHE = 'cache_sentimento.feather'
+TEXTOS_POR_LOTE = 2000
+TIPOS_DE_COMENTARIO = ('reviews', 'review_comments', 'issue_comments')
+CAMPOS_SENTIMENTO = ['state', 'merged_at'] + [
+    f'{tipo}[].{campo}' for tipo in TIPOS_DE_COMENTARIO for campo in ('body', 'user')
+]
+
+CATEGORIAS = {
+    'A': 'A. Construtivo/Diretivo',
+    'B': 'B. Positivo/Encorajador',
+    'C': 'C. Crítico/Negativo',
+    'D': 'D. Questionador/Exploratório',
+    'E': 'E. Informativo/Contextual'
+}
+
+# Regras do classificador padrão, em ordem de prioridade: a primeira que casa define a categoria.
+# Textos que não casam com nenhuma regra são 'E' (Informativo/Contextual).
+REGRAS_SENTIMENTO = [
+    ('A', r"```suggestion|^\s*nit\b"),
+    ('C', r"\b(wrong|broken|incorrect|doesn'?t work|does not work|won'?t work|regression|unnecessary"
+          r"|confusing|hacky|don'?t like|not a good idea|makes no sense)\b|^\s*-1\b"),
+    ('A', r"\b(please|can you|could you|would you mind)\b"),
+    ('D', r"\?|^\s*(why|what|how|when|where|which|is|are|do|does|did|should we|would it)\b"),
+    ('B', r"\b(lgtm|thanks|thank you|great|nice|awesome|excellent|looks good|love|congrats)\b"
+          r"|:tada:|:heart:|\+1|👍|🎉|❤"),
+    ('A', r"\b(should|must|need to|needs to|consider|suggest|instead|let'?s|prefer)\b"),
+]
+
+
+def classificar_por_regras(textos):
+    """
+    Classificador padrão: aplica REGRAS_SENTIMENTO a todos os textos do lote de uma vez
+    (pyarrow.compute, sem laço Python por texto). Retorna a lista de categorias.
+    """
+    if not textos:
+        return []
+    coluna = pa.array(textos, type=pa.string())
+    condicoes = [
+        pc.match_substring_regex(coluna, padrao, ignore_case=True).to_numpy(zero_copy_only=False)
+        for _, padrao in REGRAS_SENTIMENTO
+    ]
+    categorias = [categoria for categoria, _ in REGRAS_SENTIMENTO]
+    return np.select(condicoes, categorias, default='E').tolist()
+
+
+def nome_do_classificador(classificador):
+    return f"{classificador.__module__}.{classificador.__qualname__}"
+
+
+def hash_do_texto(texto, nome_classificador):
+    """
+    Chave do cache: o mesmo texto classificado por outro classificador gera outra chave.
+    """
+    return hashlib.sha1(f"{nome_classificador}\0{texto}".encode('utf-8')).hexdigest()
+
+
+def carregar_cache(caminho_cache=CAMINHO_CACHE):
+    if not os.path.isfile(caminho_cache):
+        return {}
+    df = pd.read_feather(caminho_cache)
+    return dict(zip(df['hash'], df['categoria']))
+
+
+def salvar_cache(cache, caminho_cache=CAMINHO_CACHE):
+    temporario = caminho_cache + '.tmp'
+    pd.DataFrame({'hash': list(cache), 'categoria': list(cache.values())}).to_feather(temporario)
+    os.replace(temporario, caminho_cache)
+
+
+def _eh_bot(usuario):
+    login = usuario.get('login') if isinstance(usuario, dict) else usuario
+    return isinstance(login, str) and login.endswith('[bot]')
+
+
+def extrair_comentarios(pr):
+    """
+    Lista os textos dos comentários de um PR encerrado como (faixa, resultado do PR, texto).
+    Comentários vazios e de bots são ignorados; PRs ainda abertos não entram na análise.
+    """
+    if pr.get('state') == 'open' and not pr.get('merged_at'):
+        return []
+    resultado = 'Aceito' if pr.get('merged_at') else 'Recusado'
+    comentarios = []
+    for tipo in TIPOS_DE_COMENTARIO:
+        for comentario in pr.get(tipo) or []:
+            texto = (comentario.get('body') or '').strip()
+            if texto and not _eh_bot(comentario.get('user')):
+                comentarios.append((pr['faixa'], resultado, texto))
+    return comentarios
+
+
+@instrumentado('coleta_comentarios')
+def coletar_comentarios(base_path=BASE_DIR, mapa_devs=None, workers=None):
+    """
+    Lê em fluxo os comentários dos PRs dos autores da amostra (faixa conhecida).
+    """
+    if mapa_devs is None:
+        mapa_devs = carregar_faixas_desenvolvedores(base_path)
+    linhas = []
+    for pr in iterar_pull_requests(base_path, CAMPOS_SENTIMENTO, mapa_devs, workers, apenas_amostra=True):
+        if pr['faixa'] != FAIXA_DESCONHECIDA:
+            linhas.extend(extrair_comentarios(pr))
+    return pd.DataFrame.from_records(linhas, columns=['faixa_autor', 'resultado_pr', 'texto'])
+
+
+def _classificar_lote(textos, classificador):
+    return classificador(textos)
+
+
+@instrumentado('sentimento')
+def classificar_textos(textos, classificador=classificar_por_regras, cache=None, workers=None,
+                       tamanho_lote=TEXTOS_POR_LOTE):
+    """
+    Classifica uma lista de textos, consultando e atualizando o cache (hash -> categoria).
+    Apenas os textos distintos ainda não vistos são enviados ao classificador, em lotes
+    distribuídos pelo pool de processos. Retorna (categorias, quantidade de textos novos).
+    """
+    cache = {} if cache is None else cache
+    nome = nome_do_classificador(classificador)
+    chaves = [hash_do_texto(texto, nome) for texto in textos]
+
+    pendentes = {}
+    for chave, texto in zip(chaves, textos):
+        if chave not in cache and chave not in pendentes:
+            pendentes[chave] = texto
+
+    chaves_pendentes = list(pendentes)
+    funcao = partial(_classificar_lote, classificador=classificador)
+    lotes = dividir_em_lotes(list(pendentes.values()), tamanho_lote)
+    inicio = 0
+    for categorias in executar_em_lotes(funcao, lotes, workers, True):
+        cache.update(zip(chaves_pendentes[inicio:inicio + len(categorias)], categorias))
+        inicio += len(categorias)
+
+    return [cache[chave] for chave in chaves], len(chaves_pendentes)
+
+
+def gerar_analise_sentimento(base_path=BASE_DIR, caminho_saida=CAMINHO_SAIDA, caminho_cache=CAMINHO_CACHE,
+                             classificador=classificar_por_regras, workers=None):
+    """
+    Executa a etapa completa e grava o CSV consumido por ideia4_llm.py.
+    """
+    print(f"Iniciando varredura em: {base_path}")
+    comentarios = coletar_comentarios(base_path, workers=workers)
+    print(f"-> {len(comentarios)} comentários coletados.")
+
+    cache = carregar_cache(caminho_cache)
+    categorias, novos = classificar_textos(comentarios['texto'].tolist(), classificador, cache, workers)
+    salvar_cache(cache, caminho_cache)
+    print(f"-> {novos} textos classificados ({len(comentarios) - novos} vieram do cache ou se repetem).")
+
+    comentarios['categoria_sentimento'] = categorias
+    comentarios[['faixa_autor', 'resultado_pr', 'categoria_sentimento']].to_csv(caminho_saida, index=False)
+    print(f"-> '{caminho_saida}' gravado com {len(comentarios)} comentários classificados.")
+    return comentarios
+
+
+if __name__ == "__main__":
+    gerar_analise_sentimento()
@@ -0,0 +1,134 @@
+# Conformidade das mensagens de commit com convenções (ideia 5).
+# Várias convenções (Conventional Commits, Angular, gitmoji, prefixos de subsistema do
+# nodejs-node, ...) ficam registradas em REGRAS_PADRAO. A coluna plana de mensagens é dividida
+# em lotes avaliados em paralelo; cada lote vira um array Arrow e todas as regras são aplicadas
+# a ele com pyarrow.compute (RE2, em C++), sem laço Python por mensagem. O resultado é uma
+# matriz commits x regras, agregada por PR com operações do pandas.
+
+import re
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from carregador_prs import FAIXA_DESCONHECIDA, dividir_em_lotes, executar_em_lotes
+from instrumentacao import instrumentado
+
+MENSAGENS_POR_LOTE = 50000
+REGRA_PRINCIPAL = 'conventional'
+
+# nome -> {'padrao': expressão aplicada ao início da mensagem, 'repos': repositórios em que
+# a regra vale (None = todos)}. Nos demais repositórios a regra fica sem valor (NaN).
+# Os padrões precisam ser compatíveis com o RE2 (sem lookarounds nem referências anteriores).
+REGRAS_PADRAO = {
+    # Mesmo padrão usado originalmente no notebook da ideia 5
+    'conventional': {
+        'padrao': r"(feat|fix|docs|refactor|test|chore|style|ci|build|perf)(\(.*\))?!?: .*",
+        'repos': None,
+    },
+    # Convenção do Angular: tipos fixos, escopo opcional e assunto sem inicial maiúscula
+    'angular': {
+        'padrao': r"(?:build|ci|docs|feat|fix|perf|refactor|test)(?:\([\w$.*/ -]+\))?: [^A-Z\s]",
+        'repos': None,
+    },
+    # gitmoji: código ':sparkles:' ou o próprio emoji no início da mensagem
+    'gitmoji': {
+        'padrao': r"(?::[a-z0-9_+-]+:|" + "[\U0001F300-\U0001FAFF\u2600-\u27BF\u2B50\u2705])",
+        'repos': None,
+    },
+    # nodejs-node: 'subsistema: descrição', ex.: 'lib: ...', 'src,test: ...', 'deps/v8: ...'
+    'subsistema': {
+        'padrao': r"[a-z0-9_.-]+(?:/[a-z0-9_.-]+)*(?:, ?[a-z0-9_.-]+(?:/[a-z0-9_.-]+)*)*: \S",
+        'repos': ['nodejs-node'],
+    },
+}
+
+
+def compilar_regras(regras):
+    """
+    Valida as regras e devolve a lista de (nome, padrão ancorado no início da mensagem).
+    """
+    compiladas = []
+    for nome, regra in regras.items():
+        re.compile(regra['padrao'])  # erro de sintaxe aparece já no registro, com o nome da regra
+        compiladas.append((nome, f"^(?:{regra['padrao']})"))
+    return compiladas
+
+
+def _avaliar_lote(mensagens, regras_compiladas):
+    """
+    Executado nos processos do pool: aplica todas as regras a um lote de mensagens.
+    Retorna uma matriz booleana (mensagens x regras).
+    """
+    textos = pa.array(mensagens, type=pa.string())
+    colunas = [
+        pc.match_substring_regex(textos, padrao).to_numpy(zero_copy_only=False)
+        for _, padrao in regras_compiladas
+    ]
+    return np.column_stack(colunas) if colunas else np.zeros((len(mensagens), 0), dtype=bool)
+
+
+def avaliar_mensagens(mensagens, regras=REGRAS_PADRAO, workers=None, tamanho_lote=MENSAGENS_POR_LOTE):
+    """
+    Avalia todas as regras sobre uma coluna de mensagens, lote a lote, em uma única passada.
+    Retorna um DataFrame booleano com uma coluna por regra, alinhado com 'mensagens'.
+    """
+    regras_compiladas = compilar_regras(regras)
+    nomes = [nome for nome, _ in regras_compiladas]
+    textos = pd.Series(mensagens).fillna('').astype(str).tolist()
+    funcao = partial(_avaliar_lote, regras_compiladas=regras_compiladas)
+    blocos = list(executar_em_lotes(funcao, dividir_em_lotes(textos, tamanho_lote), workers, True))
+    acertos = np.vstack(blocos) if blocos else np.zeros((0, len(nomes)), dtype=bool)
+    return pd.DataFrame(acertos, columns=nomes, index=getattr(mensagens, 'index', None))
+
+
+def tabela_de_commits(prs):
+    """
+    Explode os PRs (dicionários) em uma tabela de commits (repo, pr_number, author, faixa, message).
+    """
+    linhas = [
+        (pr.get('repo'), pr.get('pr_number'), pr.get('author'), pr.get('faixa'), commit.get('message', ''))
+        for pr in prs for commit in pr.get('commits') or []
+    ]
+    return pd.DataFrame.from_records(linhas, columns=['repo', 'pr_number', 'author', 'faixa', 'message'])
+
+
+def tabela_de_commits_do_parquet(diretorio, repos=None):
+    """
+    Lê a mesma tabela diretamente do armazenamento Parquet (ver armazenamento_colunar).
+    """
+    from armazenamento_colunar import ler_tabela, CHAVE_PR
+
+    commits = ler_tabela('commits', diretorio, CHAVE_PR + ['message'], repos)
+    prs = ler_tabela('prs', diretorio, CHAVE_PR + ['author', 'faixa'], repos)
+    commits = commits.merge(prs, on=CHAVE_PR, how='left')
+    return commits[['repo', 'pr_number', 'author', 'faixa', 'message']]
+
+
+@instrumentado('conformidade')
+def analisar_conformidade_commits(commits, regras=REGRAS_PADRAO, workers=None):
+    """
+    Calcula as taxas de conformidade por PR para todas as regras de uma só vez.
+
+    'commits' é a tabela de tabela_de_commits (ou do Parquet). Retorna (por_commit, por_pr):
+    - por_commit: a tabela de commits com uma coluna booleana por regra (NaN onde a regra
+      não se aplica ao repositório);
+    - por_pr: pr_number, author, faixa, taxa_conformidade (regra principal) e taxa_<regra>.
+    Commits de faixa desconhecida são ignorados.
+    """
+    commits = commits[commits['faixa'] != FAIXA_DESCONHECIDA].reset_index(drop=True)
+    acertos = avaliar_mensagens(commits['message'], regras, workers).astype('float64')
+    for nome, regra in regras.items():
+        if regra.get('repos') is not None:
+            acertos.loc[~commits['repo'].isin(regra['repos']), nome] = np.nan
+    por_commit = pd.concat([commits, acertos], axis=1)
+
+    taxas = acertos.groupby([commits['repo'], commits['pr_number']], sort=False).mean()
+    taxas.columns = [f'taxa_{nome}' for nome in taxas.columns]
+    dados_pr = commits.groupby(['repo', 'pr_number'], sort=False)[['author', 'faixa']].first()
+    por_pr = dados_pr.join(taxas).reset_index()
+    if f'taxa_{REGRA_PRINCIPAL}' in por_pr:
+        por_pr.insert(4, 'taxa_conformidade', por_pr[f'taxa_{REGRA_PRINCIPAL}'])
+    return por_commit, por_pr.drop(columns=['repo'])
@@ -0,0 +1,197 @@
+# Backend SQL das métricas, com o DuckDB (embutido, sem servidor) sobre o armazenamento
+# Parquet do corpus (ver armazenamento_colunar). As consultas rodam em paralelo em todos os
+# núcleos e fora da memória: o DuckDB lê só as colunas usadas de cada tabela, e agregações
+# maiores que o limite de memória vão para o disco ('diretorio_temporario'). Assim o corpus
+# pode crescer além do que cabe num DataFrame.
+# As consultas reproduzem as colunas de ideia_2.analisar_eficiencia e de
+# ideia_3.analisar_qualidade_e_revisao; resumo_por_faixa agrega tudo por faixa no próprio SQL.
+
+import os
+
+import duckdb
+
+from armazenamento_colunar import DIRETORIO_PARQUET, TABELAS_FILHAS
+from carregador_prs import FAIXA_DESCONHECIDA
+
+ORDEM_FAIXAS = ['E', 'D', 'C', 'B', 'A']
+
+# Colunas usadas pelas consultas em cada tabela. Colunas ausentes no Parquet (ex.: 'date' dos
+# commits, que nem todo corpus tem) viram NULL nas views, para que as consultas não mudem.
+COLUNAS = {
+    'prs': ['repo', 'pr_number', 'author', 'faixa', 'created_at', 'merged_at', 'ci_status_on_head',
+            'counts.review_comments', 'counts.reviews', 'counts.files', 'counts.commits'],
+    'files': ['repo', 'pr_number', 'additions', 'deletions'],
+    'commits': ['repo', 'pr_number', 'date'],
+    'reviews': ['repo', 'pr_number', 'state'],
+    'review_comments': ['repo', 'pr_number', 'created_at'],
+}
+
+# Regra de faixa por contagem de PRs do autor (a mesma de indice_autores.faixa_pela_contagem)
+SQL_FAIXA_CONTAGEM = """
+    CASE WHEN total <= 1 THEN 'E' WHEN total <= 10 THEN 'D' WHEN total <= 30 THEN 'C'
+         WHEN total <= 50 THEN 'B' ELSE 'A' END
+"""
+
+SQL_EFICIENCIA = f"""
+WITH datas AS (
+    SELECT repo, pr_number, author, faixa,
+           coalesce(ci_status_on_head, 'unknown') AS ci_status,
+           try_cast(created_at AS TIMESTAMPTZ) AS criado,
+           try_cast(merged_at AS TIMESTAMPTZ) AS mesclado
+    FROM prs
+    WHERE faixa IS NOT NULL AND faixa <> '{FAIXA_DESCONHECIDA}'
+)
+SELECT faixa,
+       date_diff('microsecond', criado, mesclado) / 3.6e9 AS tempo_merge_horas,
+       ci_status,
+       (ci_status = 'success')::BIGINT AS ci_sucesso,
+       ci_status IN ('success', 'failure', 'pending') AS ci_valido,
+       hour(criado)::BIGINT AS hora_criacao,
+       (isodow(criado) - 1)::BIGINT AS dia_semana_criacao
+FROM datas
+WHERE criado IS NOT NULL
+ORDER BY repo, author, pr_number
+"""
+
+SQL_QUALIDADE = f"""
+WITH base AS (
+    SELECT repo, pr_number, author,
+           {{faixa}} AS faixa,
+           coalesce("counts.review_comments", 0)::BIGINT AS num_review_comments,
+           ("counts.review_comments" IS NOT NULL OR "counts.reviews" IS NOT NULL
+            OR "counts.files" IS NOT NULL OR "counts.commits" IS NOT NULL) AS tem_counts
+    FROM (SELECT *, count(*) OVER (PARTITION BY lower(author)) AS total FROM prs)
+),
+tamanho AS (
+    SELECT repo, pr_number, sum(coalesce(additions, 0) + coalesce(deletions, 0)) AS tamanho_pr
+    FROM files GROUP BY repo, pr_number
+),
+estados AS (
+    SELECT repo, pr_number,
+           count(*) FILTER (WHERE state = 'APPROVED') AS aprovados,
+           count(*) FILTER (WHERE state = 'CHANGES_REQUESTED') AS mudancas
+    FROM reviews GROUP BY repo, pr_number
+),
+primeiro_comentario AS (
+    SELECT repo, pr_number, min(try_cast(created_at AS TIMESTAMPTZ)) AS instante
+    FROM review_comments GROUP BY repo, pr_number
+),
+rework AS (
+    SELECT c.repo, c.pr_number, count(*) AS rework_commits
+    FROM commits c JOIN primeiro_comentario p USING (repo, pr_number)
+    WHERE try_cast(c.date AS TIMESTAMPTZ) > p.instante
+    GROUP BY c.repo, c.pr_number
+)
+SELECT b.pr_number,
+       b.author AS autor,
+       b.faixa,
+       b.num_review_comments,
+       coalesce(t.tamanho_pr, 0)::BIGINT AS tamanho_pr,
+       CASE WHEN coalesce(t.tamanho_pr, 0) > 0 THEN b.num_review_comments / t.tamanho_pr ELSE 0.0 END
+           AS densidade_comentarios,
+       coalesce(r.rework_commits, 0)::BIGINT AS rework_commits,
+       CASE WHEN coalesce(e.aprovados + e.mudancas, 0) > 0 THEN e.mudancas / (e.aprovados + e.mudancas) ELSE 0.0 END
+           AS proporcao_changes_requested,
+       coalesce(e.aprovados, 0)::BIGINT AS aprovados,
+       coalesce(e.mudancas, 0)::BIGINT AS mudancas
+FROM base b
+LEFT JOIN tamanho t USING (repo, pr_number)
+LEFT JOIN estados e USING (repo, pr_number)
+LEFT JOIN rework r USING (repo, pr_number)
+WHERE b.tem_counts AND b.faixa IS NOT NULL AND b.faixa <> '{FAIXA_DESCONHECIDA}'
+ORDER BY b.repo, b.author, b.pr_number
+"""
+
+FAIXAS_DA_QUALIDADE = {
+    # Faixa pela contagem de PRs do autor no corpus (regra da ideia 3)
+    'contagem': SQL_FAIXA_CONTAGEM,
+    # Faixa do sample-devs.jsonl gravada no Parquet
+    'amostra': 'faixa',
+}
+
+
+def conectar(diretorio=DIRETORIO_PARQUET, threads=None, limite_memoria=None, diretorio_temporario=None):
+    """
+    Abre uma conexão DuckDB em memória com uma view por tabela do Parquet ('prs', 'files', ...).
+    - threads: número de threads (padrão: todos os núcleos);
+    - limite_memoria: ex.: '4GB'; acima dele, junções e agregações usam o disco;
+    - diretorio_temporario: onde ficam os dados despejados em disco.
+    """
+    con = duckdb.connect()
+    # Horas e dias da semana em UTC, como em metricas_vetorizadas
+    con.execute("SET TimeZone = 'UTC'")
+    if threads is not None:
+        con.execute(f"SET threads = {int(threads)}")
+    if limite_memoria is not None:
+        con.execute(f"SET memory_limit = '{limite_memoria}'")
+    if diretorio_temporario is not None:
+        con.execute(f"SET temp_directory = '{diretorio_temporario}'")
+
+    for nome in ('prs',) + TABELAS_FILHAS:
+        caminho = os.path.join(diretorio, nome)
+        if not os.path.isdir(caminho):
+            if nome in COLUNAS:
+                _criar_view_vazia(con, nome)
+            continue
+        origem = (f"read_parquet('{caminho}/**/*.parquet', hive_partitioning = true, union_by_name = true)")
+        existentes = {linha[0] for linha in con.execute(f"DESCRIBE SELECT * FROM {origem}").fetchall()}
+        if nome not in COLUNAS:
+            con.execute(f"CREATE VIEW {nome} AS SELECT * FROM {origem}")
+            continue
+        selecao = ', '.join(f'"{coluna}"' if coluna in existentes else f'NULL AS "{coluna}"'
+                            for coluna in COLUNAS[nome])
+        con.execute(f"CREATE VIEW {nome} AS SELECT {selecao} FROM {origem}")
+    return con
+
+
+def _criar_view_vazia(con, nome):
+    selecao = ', '.join(f'NULL::VARCHAR AS "{coluna}"' for coluna in COLUNAS[nome])
+    con.execute(f"CREATE VIEW {nome} AS SELECT {selecao} WHERE false")
+
+
+def analisar_eficiencia_sql(con):
+    """
+    Mesmas colunas de ideia_2.analisar_eficiencia, para os PRs dos autores da amostra
+    (faixa conhecida) com created_at válido.
+    """
+    return con.execute(SQL_EFICIENCIA).df()
+
+
+def analisar_qualidade_sql(con, faixas='contagem'):
+    """
+    Mesmas colunas de ideia_3.analisar_qualidade_e_revisao. A faixa vem da contagem de PRs do
+    autor ('contagem', como em ideia_3.analisar_qualidade_em_fluxo) ou da amostra ('amostra').
+    """
+    df = con.execute(SQL_QUALIDADE.format(faixa=FAIXAS_DA_QUALIDADE[faixas])).df()
+    return df.drop(columns=['aprovados', 'mudancas'])
+
+
+def resumo_por_faixa(con, faixas_qualidade='contagem'):
+    """
+    Agregados por faixa calculados inteiramente no DuckDB: média e desvio do tempo para merge,
+    taxa de sucesso da CI (entre os status válidos), densidade média de comentários e a
+    proporção de aprovações entre as reviews com estado. Retorna um DataFrame indexado por faixa.
+    """
+    eficiencia = con.execute(f"""
+        SELECT faixa,
+               count(*) AS prs,
+               avg(tempo_merge_horas) AS tempo_merge_medio,
+               stddev_samp(tempo_merge_horas) AS tempo_merge_desvio,
+               avg(ci_sucesso) FILTER (WHERE ci_valido) AS taxa_sucesso_ci
+        FROM ({SQL_EFICIENCIA}) GROUP BY faixa
+    """).df().set_index('faixa')
+    consulta_qualidade = SQL_QUALIDADE.format(faixa=FAIXAS_DA_QUALIDADE[faixas_qualidade])
+    qualidade = con.execute(f"""
+        SELECT faixa,
+               avg(densidade_comentarios) AS densidade_media,
+               avg(num_review_comments) AS comentarios_medios,
+               sum(aprovados) / nullif(sum(aprovados + mudancas), 0) AS proporcao_aprovacao
+        FROM ({consulta_qualidade}) GROUP BY faixa
+    """).df().set_index('faixa')
+    return eficiencia.join(qualidade, how='outer').reindex(ORDEM_FAIXAS)
+
+
+if __name__ == "__main__":
+    import sys
+    con = conectar(sys.argv[1] if len(sys.argv) > 1 else DIRETORIO_PARQUET)
+    print(resumo_por_faixa(con).to_string())
@@ -0,0 +1,233 @@
+# Gerador de árvores 'repositories-mined' sintéticas, com o mesmo layout e formato do corpus real:
+#   <dono>-<repo>/sample-devs.jsonl                      (repo, author, faixa)
+#   <dono>-<repo>/developer/<dev>/results/<número>.json  (um PR por arquivo)
+# Os PRs têm os campos lidos pelas análises (files, commits, reviews, review_comments,
+# issue_comments, timeline, counts, ...) com tamanhos de listas de cauda longa, parecidos com
+# os do corpus real: a maioria dos PRs é pequena e alguns têm centenas de arquivos ou eventos.
+# A quantidade de PRs por autor depende da faixa (faixa A contribui muito mais que a E).
+# A geração é determinística para uma mesma semente e é dividida por autor no pool
+# compartilhado, de modo que corpora de 10k, 100k ou 1M PRs são gerados em paralelo.
+#   python corpus_sintetico.py <destino> <quantidade_de_prs> [repositorios]
+
+import os
+import sys
+import json
+import random
+import hashlib
+from functools import partial
+from datetime import datetime, timedelta, timezone
+
+from carregador_prs import executar_em_lotes
+
+SEMENTE_PADRAO = 42
+REPOSITORIOS_PADRAO = 10
+AUTORES_POR_FAIXA = 15
+FAIXAS = ['A', 'B', 'C', 'D', 'E']
+# Peso relativo da quantidade de PRs de um autor de cada faixa
+PESO_POR_FAIXA = {'A': 60, 'B': 30, 'C': 15, 'D': 5, 'E': 1}
+FRACAO_CORROMPIDOS = 0.0005
+INICIO_DA_COLETA = datetime(2020, 1, 1, tzinfo=timezone.utc)
+DIAS_DE_COLETA = 5 * 365
+
+AREAS = ['src/', 'lib/', 'core/', 'crates/', 'docs/', 'test/', 'tests/', 'tools/', 'deps/', '.github/']
+EXTENSOES = ['.py', '.js', '.ts', '.rs', '.c', '.cc', '.h', '.md', '.json', '.yml']
+TIPOS_DE_COMMIT = ['feat', 'fix', 'docs', 'refactor', 'test', 'chore', 'ci', 'build', 'perf']
+SUBSISTEMAS = ['lib', 'src', 'test', 'doc', 'deps', 'build', 'tools', 'http', 'fs', 'stream']
+FRASES = [
+    'Thanks for the contribution!', 'LGTM', 'Could you add a test for this?', 'Why is this needed?',
+    'nit: trailing whitespace', 'This breaks the build on Windows.', 'Please rebase on main.',
+    'I think we should use the existing helper instead.', 'Looks good to me, thanks!',
+    'Is this covered by the docs?', 'This is a regression from the previous release.',
+    'Nice work :tada:', 'Can you split this into two commits?', 'See the discussion in the linked issue.',
+]
+REVISORES = ['maintainer-1', 'maintainer-2', 'maintainer-3', 'reviewer-a', 'reviewer-b']
+BOTS = ['github-actions[bot]', 'dosubot[bot]', 'pull-request-size[bot]', 'codecov[bot]']
+LABELS = ['needs-testing', 'bug', 'enhancement', 'documentation', 'size/S', 'size/L', 'dependencies']
+EVENTOS_EXTRAS = ['commented', 'labeled', 'referenced', 'mentioned', 'subscribed', 'head_ref_force_pushed']
+
+
+def _cauda_longa(gerador, media, maximo, minimo=0):
+    # Distribuição geométrica truncada: muitos valores pequenos e poucos grandes
+    valor = minimo + int(gerador.expovariate(1.0 / max(media - minimo, 1e-9)))
+    return min(valor, maximo)
+
+
+def _data(instante):
+    return instante.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _mensagem_de_commit(gerador, repo):
+    sorteio = gerador.random()
+    assunto = gerador.choice(['update handling of edge cases', 'add option to skip cache', 'remove unused import',
+                              'Fix typo in README', 'WIP', 'address review comments', 'bump version'])
+    if sorteio < 0.35:
+        escopo = f"({gerador.choice(SUBSISTEMAS)})" if gerador.random() < 0.5 else ''
+        return f"{gerador.choice(TIPOS_DE_COMMIT)}{escopo}: {assunto}"
+    if sorteio < 0.55 or repo == 'nodejs-node':
+        return f"{gerador.choice(SUBSISTEMAS)}: {assunto}"
+    if sorteio < 0.6:
+        return f":sparkles: {assunto}"
+    return assunto.capitalize()
+
+
+def _comentario(gerador, instante, autor, campo_data='created_at'):
+    usuario = gerador.choice(BOTS) if gerador.random() < 0.1 else gerador.choice(REVISORES + [autor])
+    texto = ' '.join(gerador.choice(FRASES) for _ in range(1 + _cauda_longa(gerador, 1.5, 12)))
+    return {'user': usuario, campo_data: _data(instante), 'body': texto}
+
+
+def gerar_pull_request(gerador, repo, autor, numero):
+    """
+    Gera um PR no formato do corpus real. 'gerador' é um random.Random.
+    """
+    criado = INICIO_DA_COLETA + timedelta(seconds=gerador.randrange(DIAS_DE_COLETA * 86400))
+    duracao = timedelta(hours=gerador.lognormvariate(2.5, 1.8))
+    mesclado = gerador.random() < 0.7
+    aberto = not mesclado and gerador.random() < 0.3
+    fim = criado + duracao
+
+    def instante():
+        return criado + timedelta(seconds=gerador.random() * duracao.total_seconds())
+
+    area = gerador.choice(AREAS)
+    files = [
+        {'filename': f"{area if gerador.random() < 0.7 else gerador.choice(AREAS)}"
+                     f"m{gerador.randrange(200)}/f{gerador.randrange(1000)}{gerador.choice(EXTENSOES)}",
+         'additions': _cauda_longa(gerador, 40, 20000), 'deletions': _cauda_longa(gerador, 15, 10000)}
+        for _ in range(_cauda_longa(gerador, 5, 300, minimo=1))
+    ]
+    commits = [
+        {'sha': hashlib.sha1(f"{repo}{numero}{i}".encode()).hexdigest(),
+         'message': _mensagem_de_commit(gerador, repo), 'date': _data(instante())}
+        for i in range(_cauda_longa(gerador, 3, 250, minimo=1))
+    ]
+    reviews = []
+    for _ in range(_cauda_longa(gerador, 2, 60)):
+        review = _comentario(gerador, instante(), autor, 'submitted_at')
+        review['state'] = gerador.choice(['APPROVED', 'COMMENTED', 'COMMENTED', 'CHANGES_REQUESTED', 'DISMISSED'])
+        reviews.append(review)
+    review_comments = [_comentario(gerador, instante(), autor) for _ in range(_cauda_longa(gerador, 2, 200))]
+    for comentario in review_comments:
+        comentario['path'] = gerador.choice(files)['filename']
+    issue_comments = [_comentario(gerador, instante(), autor) for _ in range(_cauda_longa(gerador, 2, 150))]
+
+    timeline = [
+        # Como no corpus real, boa parte dos eventos 'committed'/'reviewed' vem sem ator e sem data
+        {'event': 'committed', 'actor': autor, 'created_at': commit['date']} if gerador.random() < 0.5
+        else {'event': 'committed', 'actor': None, 'created_at': None}
+        for commit in commits
+    ]
+    for review in reviews:
+        timeline.append({'event': 'reviewed', 'actor': review['user'], 'created_at': review['submitted_at']}
+                        if gerador.random() < 0.5 else {'event': 'reviewed', 'actor': None, 'created_at': None})
+    for _ in range(_cauda_longa(gerador, 3, 100)):
+        evento = {'event': gerador.choice(EVENTOS_EXTRAS), 'actor': gerador.choice(REVISORES + BOTS),
+                  'created_at': _data(instante())}
+        if evento['event'] == 'labeled':
+            evento['label'] = gerador.choice(LABELS)
+        timeline.append(evento)
+    if mesclado:
+        merger = gerador.choice(REVISORES)
+        timeline += [{'event': 'merged', 'actor': merger, 'created_at': _data(fim)},
+                     {'event': 'closed', 'actor': merger, 'created_at': _data(fim)}]
+    elif not aberto:
+        timeline.append({'event': 'closed', 'actor': gerador.choice(REVISORES + [autor]), 'created_at': _data(fim)})
+
+    return {
+        'pr_number': numero, 'repo': repo, 'title': _mensagem_de_commit(gerador, repo), 'author': autor,
+        'state': 'open' if aberto else 'closed', 'merged_at': _data(fim) if mesclado else None,
+        'created_at': _data(criado), 'head_sha': commits[-1]['sha'],
+        'ci_status_on_head': gerador.choice(['success', 'success', 'success', 'failure', 'pending', 'unknown']),
+        'counts': {'files': len(files), 'commits': len(commits), 'reviews': len(reviews),
+                   'review_comments': len(review_comments), 'issue_comments': len(issue_comments),
+                   'timeline_events': len(timeline)},
+        'files': files, 'commits': commits, 'reviews': reviews, 'review_comments': review_comments,
+        'issue_comments': issue_comments, 'timeline': timeline,
+    }
+
+
+def _gerar_autores(lote, destino, semente):
+    """
+    Executado nos processos do pool: grava os PRs de um lote de autores. Retorna os PRs gravados.
+    """
+    gravados = 0
+    for repo, autor, primeiro_numero, quantidade in lote:
+        gerador = random.Random(f"{semente}/{repo}/{autor}")
+        pasta = os.path.join(destino, repo, 'developer', autor, 'results')
+        os.makedirs(pasta, exist_ok=True)
+        for i in range(quantidade):
+            numero = primeiro_numero + i
+            caminho = os.path.join(pasta, f"{numero}.json")
+            if gerador.random() < FRACAO_CORROMPIDOS:
+                conteudo = '{"pr_number": ' + str(numero) + ', "repo": '  # JSON truncado
+            else:
+                conteudo = json.dumps(gerar_pull_request(gerador, repo, autor, numero))
+            with open(caminho, 'w', encoding='utf-8') as f:
+                f.write(conteudo)
+            gravados += 1
+    return gravados
+
+
+def distribuir_prs(quantidade_prs, repositorios=REPOSITORIOS_PADRAO, semente=SEMENTE_PADRAO):
+    """
+    Distribui 'quantidade_prs' entre os autores de todos os repositórios, com peso pela faixa.
+    Retorna a lista de (repo, autor, faixa, quantidade), somando exatamente 'quantidade_prs'.
+    """
+    gerador = random.Random(semente)
+    autores = []
+    for r in range(repositorios):
+        repo = f"org{r}-projeto{r}"
+        for faixa in FAIXAS:
+            for a in range(AUTORES_POR_FAIXA):
+                peso = PESO_POR_FAIXA[faixa] * gerador.lognormvariate(0, 0.5)
+                autores.append((repo, f"dev{faixa}{a}-{r}", faixa, peso))
+
+    total_pesos = sum(peso for *_, peso in autores)
+    quantidades = [int(quantidade_prs * peso / total_pesos) for *_, peso in autores]
+    # O resto do arredondamento vai para os autores de maior peso
+    ordem = sorted(range(len(autores)), key=lambda i: -autores[i][3])
+    for i in ordem[:quantidade_prs - sum(quantidades)]:
+        quantidades[i] += 1
+    return [(repo, autor, faixa, quantidade) for (repo, autor, faixa, _), quantidade in zip(autores, quantidades)]
+
+
+def gerar_corpus(destino, quantidade_prs, repositorios=REPOSITORIOS_PADRAO, semente=SEMENTE_PADRAO,
+                 workers=None):
+    """
+    Gera em 'destino' uma árvore repositories-mined com 'quantidade_prs' PRs.
+    Retorna a quantidade de arquivos de PR gravados.
+    """
+    distribuicao = distribuir_prs(quantidade_prs, repositorios, semente)
+    for repo in sorted({repo for repo, *_ in distribuicao}):
+        os.makedirs(os.path.join(destino, repo), exist_ok=True)
+        dono, nome = repo.split('-', 1)
+        with open(os.path.join(destino, repo, 'sample-devs.jsonl'), 'w', encoding='utf-8') as f:
+            for repo_autor, autor, faixa, _ in distribuicao:
+                if repo_autor == repo:
+                    f.write(json.dumps({'repo': f"{dono}/{nome}", 'author': autor, 'faixa': faixa}) + '\n')
+
+    tarefas, numero = [], 1
+    for repo, autor, _, quantidade in distribuicao:
+        if quantidade:
+            tarefas.append((repo, autor, numero, quantidade))
+            numero += quantidade
+    # Lotes de autores com aproximadamente o mesmo número de PRs
+    lotes, atual, tamanho = [], [], 0
+    alvo = max(quantidade_prs // (4 * (workers or os.cpu_count() or 1)), 1000)
+    for tarefa in tarefas:
+        atual.append(tarefa)
+        tamanho += tarefa[3]
+        if tamanho >= alvo:
+            lotes.append(atual)
+            atual, tamanho = [], 0
+    if atual:
+        lotes.append(atual)
+
+    total = sum(executar_em_lotes(partial(_gerar_autores, destino=destino, semente=semente), lotes, workers, False))
+    print(f"-> Corpus sintético gerado em '{destino}': {total} PRs de {len(tarefas)} autores "
+          f"em {repositorios} repositórios.")
+    return total
+
+
+if __name__ == "__main__":
+    gerar_corpus(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]) if len(sys.argv) > 3 else REPOSITORIOS_PADRAO)
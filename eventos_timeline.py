@@ -0,0 +1,154 @@
+# Tabela de eventos da timeline dos PRs (ideia 5).
+# Cada evento de pr['timeline'] vira uma linha (repo, pr_number, event, actor_login,
+# created_at, label), com as datas já convertidas. O ator e a label aparecem no corpus
+# tanto como texto ('actor': 'login') quanto como objeto ('actor': {'login': ...}).
+# As consultas sobre a timeline (auto-revisão, labels como 'needs-testing', ...) são feitas
+# com filtros, merges e agregações por PR sobre essa tabela, sem percorrer as listas de
+# eventos em Python.
+
+import pandas as pd
+
+from carregador_prs import FAIXA_DESCONHECIDA
+from metricas_vetorizadas import converter_datas
+from instrumentacao import instrumentado
+
+CHAVE_PR = ['repo', 'pr_number']
+COLUNAS_EVENTOS = CHAVE_PR + ['event', 'actor_login', 'created_at', 'label']
+COLUNAS_PRS = CHAVE_PR + ['author', 'faixa', 'created_at', 'tem_timeline']
+
+# Limite superior da janela de auto-revisão para PRs sem revisão externa.
+# None deixa a janela aberta (todos os commits posteriores à criação contam); um timestamp
+# fixo (ex.: '2025-06-30T00:00:00Z', a data da coleta) torna o corte explícito.
+DATA_DE_CORTE = None
+
+
+def _nome(valor, campo):
+    """
+    Extrai o identificador de um ator/label que pode vir como texto ou como dicionário.
+    """
+    if isinstance(valor, dict):
+        return valor.get(campo)
+    return valor
+
+
+def tabelas_da_timeline(prs):
+    """
+    Monta, a partir dos PRs (dicionários), a tabela de PRs e a tabela de eventos da timeline.
+    """
+    linhas_prs, linhas_eventos = [], []
+    for pr in prs:
+        chave = (pr.get('repo'), pr.get('pr_number'))
+        timeline = pr.get('timeline') or []
+        linhas_prs.append(chave + (pr.get('author'), pr.get('faixa'), pr.get('created_at'), bool(timeline)))
+        for evento in timeline:
+            linhas_eventos.append(chave + (evento.get('event'), _nome(evento.get('actor'), 'login'),
+                                           evento.get('created_at'), _nome(evento.get('label'), 'name')))
+
+    df_prs = pd.DataFrame.from_records(linhas_prs, columns=COLUNAS_PRS)
+    eventos = pd.DataFrame.from_records(linhas_eventos, columns=COLUNAS_EVENTOS)
+    return _converter(df_prs, eventos)
+
+
+def tabelas_da_timeline_do_parquet(diretorio, repos=None):
+    """
+    Monta as mesmas tabelas diretamente do armazenamento Parquet (ver armazenamento_colunar),
+    lendo apenas as colunas usadas pelas consultas.
+    """
+    from armazenamento_colunar import ler_tabela
+
+    df_prs = ler_tabela('prs', diretorio, CHAVE_PR + ['author', 'faixa', 'created_at'], repos)
+    eventos = ler_tabela('timeline', diretorio, CHAVE_PR + ['event', 'created_at', 'actor', 'actor.login',
+                                                            'label', 'label.name'], repos)
+    # Ator e label gravados como texto ficam em 'actor'/'label'; como objeto, em 'actor.login'/'label.name'
+    for coluna, aninhada in (('actor', 'actor.login'), ('label', 'label.name')):
+        texto = eventos[coluna] if coluna in eventos else pd.Series(None, index=eventos.index, dtype=object)
+        if aninhada in eventos:
+            texto = texto.where(texto.notna(), eventos[aninhada])
+        eventos[coluna] = texto
+    eventos = eventos.rename(columns={'actor': 'actor_login'})
+    for coluna in COLUNAS_EVENTOS:
+        if coluna not in eventos:
+            eventos[coluna] = None
+    for coluna in COLUNAS_PRS[:-1]:
+        if coluna not in df_prs:
+            df_prs[coluna] = None
+    chaves_com_timeline = pd.MultiIndex.from_frame(eventos[CHAVE_PR].drop_duplicates())
+    df_prs['tem_timeline'] = pd.MultiIndex.from_frame(df_prs[CHAVE_PR]).isin(chaves_com_timeline)
+    return _converter(df_prs[COLUNAS_PRS], eventos[COLUNAS_EVENTOS])
+
+
+def _converter(df_prs, eventos):
+    df_prs['created_at'] = converter_datas(df_prs['created_at'])
+    eventos['created_at'] = converter_datas(eventos['created_at'])
+    return df_prs, eventos
+
+
+def primeira_revisao_externa(df_prs, eventos):
+    """
+    Instante do primeiro evento 'reviewed' feito por alguém diferente do autor, por PR.
+    Retorna uma Series indexada por (repo, pr_number); PRs sem revisão externa ficam de fora.
+    """
+    revisoes = eventos[(eventos['event'] == 'reviewed') & eventos['actor_login'].notna()
+                       & eventos['created_at'].notna()]
+    revisoes = revisoes.merge(df_prs[CHAVE_PR + ['author']], on=CHAVE_PR)
+    externas = revisoes[revisoes['actor_login'] != revisoes['author']]
+    return externas.sort_values('created_at').groupby(CHAVE_PR)['created_at'].first()
+
+
+@instrumentado('auto_revisao')
+def analisar_auto_revisao(df_prs, eventos, data_de_corte=DATA_DE_CORTE):
+    """
+    Conta, por PR, os commits do próprio autor feitos depois da criação do PR e antes da
+    primeira revisão externa (ou antes de 'data_de_corte', se não houve revisão externa).
+    Considera apenas PRs com faixa conhecida, autor, data de criação e timeline não vazia.
+    """
+    prs_validos = df_prs[(df_prs['faixa'] != FAIXA_DESCONHECIDA) & df_prs['author'].notna()
+                         & df_prs['created_at'].notna() & df_prs['tem_timeline']]
+
+    limite = primeira_revisao_externa(prs_validos, eventos).rename('limite')
+    janelas = prs_validos.merge(limite, left_on=CHAVE_PR, right_index=True, how='left')
+    corte = pd.Timestamp(data_de_corte) if data_de_corte is not None else pd.Timestamp.max
+    if corte.tzinfo is None:
+        corte = corte.tz_localize('UTC')
+    janelas['limite'] = janelas['limite'].fillna(corte)
+
+    commits = eventos[(eventos['event'] == 'committed') & eventos['actor_login'].notna()
+                      & eventos['created_at'].notna()]
+    commits = commits.merge(janelas[CHAVE_PR + ['author', 'created_at', 'limite']], on=CHAVE_PR,
+                            suffixes=('', '_pr'))
+    na_janela = commits[(commits['actor_login'] == commits['author'])
+                        & (commits['created_at'] > commits['created_at_pr'])
+                        & (commits['created_at'] < commits['limite'])]
+    contagem = na_janela.groupby(CHAVE_PR).size().rename('self_review_commits')
+
+    resultado = janelas.merge(contagem, left_on=CHAVE_PR, right_index=True, how='left')
+    resultado['self_review_commits'] = resultado['self_review_commits'].fillna(0).astype('int64')
+    return resultado[['pr_number', 'faixa', 'self_review_commits']].reset_index(drop=True)
+
+
+def contar_eventos_por_pr(df_prs, eventos, evento, label=None):
+    """
+    Quantidade de eventos do tipo 'evento' em cada PR (opcionalmente só os de uma label,
+    ex.: contar_eventos_por_pr(df_prs, eventos, 'labeled', 'needs-testing')).
+    Retorna uma Series alinhada com as linhas de df_prs.
+    """
+    filtro = eventos['event'] == evento
+    if label is not None:
+        filtro &= eventos['label'] == label
+    contagem = eventos[filtro].groupby(CHAVE_PR).size()
+    indice = pd.MultiIndex.from_frame(df_prs[CHAVE_PR])
+    return pd.Series(contagem.reindex(indice, fill_value=0).to_numpy(), index=df_prs.index)
+
+
+@instrumentado('labels')
+def analisar_labels(df_prs, eventos, label):
+    """
+    Indica, para cada PR de faixa conhecida, se ele recebeu a label informada em algum momento.
+    """
+    prs_validos = df_prs[df_prs['faixa'] != FAIXA_DESCONHECIDA]
+    marcado = contar_eventos_por_pr(prs_validos, eventos, 'labeled', label) > 0
+    return pd.DataFrame({
+        'pr_number': prs_validos['pr_number'].to_numpy(),
+        'faixa': prs_validos['faixa'].to_numpy(),
+        'marcado': marcado.to_numpy(),
+    })
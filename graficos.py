@@ -0,0 +1,264 @@
+# Renderização dos gráficos em lote, sem tela.
+# Cada análise agrega os dados por faixa uma única vez (médias, desvios, quartis: tabelas de
+# poucas linhas) e descreve seus gráficos como especificações, dicionários com o tipo do
+# gráfico, a tabela agregada, o arquivo de saída e os textos. As especificações são desenhadas
+# em paralelo no pool compartilhado (ver carregador_prs.executar_em_lotes) com
+# matplotlib.figure.Figure, que grava o PNG pelo canvas Agg: nada passa pelo pyplot, nenhuma
+# janela é aberta e o backend do processo principal (ex.: um notebook) não é alterado.
+
+import os
+
+import matplotlib as mpl
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.cbook import boxplot_stats
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+from matplotlib.ticker import PercentFormatter
+
+from carregador_prs import dividir_em_lotes, executar_em_lotes
+from instrumentacao import instrumentado
+
+ORDEM_FAIXAS = ['E', 'D', 'C', 'B', 'A']
+TAMANHO_PADRAO = (10, 6)
+CAIXAS_POR_EIXO = 40
+
+
+def paleta_por_faixa(nome='husl', invertida=False):
+    """
+    Cores por faixa no mesmo esquema dos notebooks: a paleta é gerada na ordem A..E.
+    """
+    cores = sns.color_palette(nome, len(ORDEM_FAIXAS))
+    faixas = ORDEM_FAIXAS if invertida else ORDEM_FAIXAS[::-1]
+    return dict(zip(faixas, cores))
+
+
+# --------------------------
+# Agregações por faixa
+# --------------------------
+
+def agregar_media_e_desvio(df, coluna, ordem=ORDEM_FAIXAS):
+    """
+    Média, desvio padrão e contagem de 'coluna' por faixa (as barras com errorbar='sd').
+    """
+    grupos = df.groupby('faixa')[coluna]
+    return pd.DataFrame({'valor': grupos.mean(), 'erro': grupos.std(), 'n': grupos.count()}).reindex(ordem)
+
+
+def agregar_boxplot(df, coluna, ordem=ORDEM_FAIXAS):
+    """
+    Estatísticas de box plot de 'coluna' por faixa (quartis, bigodes a 1,5 IQR e outliers),
+    no formato de Axes.bxp. Os outliers são guardados sem repetição, o que não muda o
+    desenho e mantém a tabela pequena.
+    """
+    estatisticas = []
+    for faixa in ordem:
+        valores = df.loc[df['faixa'] == faixa, coluna].dropna().to_numpy(dtype='float64')
+        if len(valores) == 0:
+            continue
+        caixa = boxplot_stats(valores, labels=[faixa])[0]
+        caixa['fliers'] = np.unique(caixa['fliers'])
+        estatisticas.append(caixa)
+    return estatisticas
+
+
+def bordas_logaritmicas(maximo, caixas=CAIXAS_POR_EIXO, inteiros=False):
+    """
+    Bordas de caixas para valores >= 0 em escala logarítmica: a primeira caixa é [0, 1) e as
+    demais são igualmente espaçadas em log de 1 até o máximo (eixo 'symlog' com limiar 1).
+    Com 'inteiros', as bordas são arredondadas para inteiros distintos, para que nenhuma
+    caixa estreita demais fique sem valor possível (contagens, linhas alteradas).
+    """
+    topo = max(float(maximo), 1.0) * (1 + 1e-9)
+    bordas = np.geomspace(1.0, topo, caixas)
+    if inteiros:
+        bordas = np.unique(np.ceil(np.append(bordas, np.floor(topo) + 1)))
+    return np.concatenate([[0.0], bordas])
+
+
+def agregar_histograma_2d(df, x, y, ordem=ORDEM_FAIXAS, caixas=CAIXAS_POR_EIXO):
+    """
+    Histograma 2-D de (x, y) por faixa sobre todas as linhas, sem amostragem, com caixas
+    logarítmicas (ver bordas_logaritmicas). As linhas são distribuídas nas caixas de uma só
+    vez (searchsorted + bincount), então o custo é linear no número de PRs e o tamanho do
+    resultado é fixo: faixas x caixas x caixas. Valores negativos ou nulos são ignorados.
+    Retorna um dicionário com 'faixas', 'bordas_x', 'bordas_y', 'contagens' e 'totais'.
+    """
+    validos = df[df['faixa'].isin(ordem) & (df[x] >= 0) & (df[y] >= 0)]
+    valores_x = validos[x].to_numpy(dtype='float64')
+    valores_y = validos[y].to_numpy(dtype='float64')
+    bordas_x, bordas_y = [
+        bordas_logaritmicas(valores.max() if len(valores) else 1.0, caixas, np.array_equal(valores, np.floor(valores)))
+        for valores in (valores_x, valores_y)
+    ]
+
+    nx, ny = len(bordas_x) - 1, len(bordas_y) - 1
+    codigo_faixa = pd.Categorical(validos['faixa'], categories=ordem).codes.astype('int64')
+    caixa_x = np.clip(np.searchsorted(bordas_x, valores_x, side='right') - 1, 0, nx - 1)
+    caixa_y = np.clip(np.searchsorted(bordas_y, valores_y, side='right') - 1, 0, ny - 1)
+    contagens = np.bincount((codigo_faixa * nx + caixa_x) * ny + caixa_y, minlength=len(ordem) * nx * ny)
+    contagens = contagens.reshape(len(ordem), nx, ny)
+    return {'faixas': list(ordem), 'bordas_x': bordas_x, 'bordas_y': bordas_y,
+            'contagens': contagens, 'totais': contagens.sum(axis=(1, 2))}
+
+
+# --------------------------
+# Desenho (executado nos processos do pool)
+# --------------------------
+
+def _desenhar_barras(ax, tabela, cores, rotulos_valor=None):
+    """
+    Barras a partir de uma tabela indexada por faixa com a coluna 'valor' e, opcionalmente, 'erro'.
+    """
+    posicoes = np.arange(len(tabela))
+    erro = tabela['erro'].to_numpy() if 'erro' in tabela else None
+    barras = ax.bar(posicoes, tabela['valor'].to_numpy(), width=0.8, color=[cores[f] for f in tabela.index],
+                    yerr=erro, error_kw={'ecolor': '.26', 'elinewidth': 2.4})
+    ax.set_xticks(posicoes, tabela.index)
+    if rotulos_valor is not None:
+        for barra in barras:
+            ax.annotate(format(barra.get_height(), rotulos_valor),
+                        (barra.get_x() + barra.get_width() / 2., barra.get_height()),
+                        ha='center', va='center', xytext=(0, 9), textcoords='offset points')
+
+
+def _desenhar_barras_agrupadas(ax, tabela, cores, titulo_legenda='Faixa'):
+    """
+    Barras lado a lado: uma linha da tabela por grupo no eixo X e uma coluna por faixa (como
+    sns.barplot com hue='faixa').
+    """
+    posicoes = np.arange(len(tabela))
+    largura = 0.8 / max(len(tabela.columns), 1)
+    for i, faixa in enumerate(tabela.columns):
+        ax.bar(posicoes - 0.4 + largura * (i + 0.5), tabela[faixa].to_numpy(dtype='float64'), width=largura,
+               color=cores[faixa], label=faixa)
+    ax.set_xticks(posicoes, [str(rotulo) for rotulo in tabela.index])
+    ax.legend(title=titulo_legenda)
+
+
+def _desenhar_boxplot(ax, tabela, cores):
+    if not tabela:
+        # Nenhuma faixa com valores (ex.: repositórios fora do mapeamento): eixo vazio
+        return
+    caixas = ax.bxp(tabela, patch_artist=True, widths=0.8)
+    for caixa, estatistica in zip(caixas['boxes'], tabela):
+        caixa.set_facecolor(cores[estatistica['label']])
+
+
+def _desenhar_histograma_2d(paineis, tabela, mapa_de_cores='viridis'):
+    """
+    Um painel por faixa com a proporção dos PRs da faixa em cada caixa (cor em escala log,
+    comum a todos os painéis). Caixas vazias ficam em branco. Sem nenhuma faixa, nada é desenhado.
+    """
+    if not tabela['faixas']:
+        return
+    totais = np.maximum(tabela['totais'], 1)[:, None, None]
+    proporcoes = np.ma.masked_equal(tabela['contagens'] / totais, 0)
+    positivas = proporcoes.compressed()
+    normalizacao = LogNorm(positivas.min(), positivas.max()) if len(positivas) else None
+    for ax, faixa, proporcao, total in zip(paineis, tabela['faixas'], proporcoes, tabela['totais']):
+        malha = ax.pcolormesh(tabela['bordas_x'], tabela['bordas_y'], proporcao.T, cmap=mapa_de_cores,
+                              norm=normalizacao)
+        ax.set_xscale('symlog', linthresh=1)
+        ax.set_yscale('symlog', linthresh=1)
+        ax.set_title(f"Faixa {faixa} (n={total})")
+    paineis[0].figure.colorbar(malha, ax=list(paineis), label='Proporção dos PRs da faixa')
+
+
+def _desenhar_barras_empilhadas(ax, tabela, mapa_de_cores='viridis_r', rotulos_legenda=None, titulo_legenda=None):
+    """
+    Barras empilhadas 100% (uma coluna da tabela por segmento), com o eixo Y em porcentagem.
+    """
+    tabela.plot(kind='bar', stacked=True, ax=ax, colormap=mapa_de_cores, width=0.8)
+    ax.tick_params(axis='x', labelrotation=45)
+    for rotulo in ax.get_xticklabels():
+        rotulo.set_horizontalalignment('right')
+    ax.yaxis.set_major_formatter(PercentFormatter())
+    handles, labels = ax.get_legend_handles_labels()
+    if rotulos_legenda is not None:
+        labels = [rotulos_legenda.get(label, label) for label in labels]
+    ax.legend(handles, labels, title=titulo_legenda, bbox_to_anchor=(1.02, 1), loc='upper left')
+
+
+DESENHOS = {
+    'barras': _desenhar_barras,
+    'barras_agrupadas': _desenhar_barras_agrupadas,
+    'boxplot': _desenhar_boxplot,
+    'barras_empilhadas': _desenhar_barras_empilhadas,
+    'histograma_2d': _desenhar_histograma_2d,
+}
+
+
+def desenhar(especificacao):
+    """
+    Desenha e grava um gráfico descrito por uma especificação:
+      tipo, tabela, caminho           -> obrigatórios ('tipo' é uma chave de DESENHOS)
+      opcoes                          -> argumentos extras da função de desenho (ex.: cores)
+      titulo, xlabel, ylabel, tamanho,
+      xlim, ylim, yticks, yscale,
+      rotacao_x, layout               -> opcionais; 'layout' é o retângulo do tight_layout
+      opcoes_titulo, opcoes_rotulos   -> argumentos de texto (ex.: {'fontsize': 18, 'pad': 20})
+      paineis                         -> número de painéis lado a lado; a função de desenho
+                                         recebe então a lista de eixos em vez de um só
+      estilo                          -> estilo do seaborn (padrão: 'whitegrid', fonte em escala 1.1)
+    Retorna o caminho gravado.
+    """
+    rc = dict(sns.axes_style(especificacao.get('estilo', 'whitegrid')))
+    rc.update(sns.plotting_context('notebook', font_scale=1.1))
+
+    with mpl.rc_context(rc):
+        tamanho = especificacao.get('tamanho', TAMANHO_PADRAO)
+        paineis = especificacao.get('paineis')
+        if paineis:
+            # Vários painéis lado a lado, com eixos compartilhados e textos na figura
+            figura = Figure(figsize=tamanho, layout='constrained')
+            ax = figura.subplots(1, paineis, sharex=True, sharey=True, squeeze=False)[0]
+            alvo = {'titulo': figura.suptitle, 'xlabel': figura.supxlabel, 'ylabel': figura.supylabel}
+        else:
+            figura = Figure(figsize=tamanho)
+            ax = figura.add_subplot()
+            alvo = {'titulo': ax.set_title, 'xlabel': ax.set_xlabel, 'ylabel': ax.set_ylabel}
+        DESENHOS[especificacao['tipo']](ax, especificacao['tabela'], **especificacao.get('opcoes', {}))
+
+        alvo['titulo'](especificacao.get('titulo', ''), **especificacao.get('opcoes_titulo', {}))
+        for eixo in ('xlabel', 'ylabel'):
+            alvo[eixo](especificacao.get(eixo, ''), **especificacao.get('opcoes_rotulos', {}))
+        ax = ax[0] if paineis else ax
+        if 'xlim' in especificacao:
+            ax.set_xlim(*especificacao['xlim'])
+        if 'ylim' in especificacao:
+            ax.set_ylim(*especificacao['ylim'])
+        if 'yticks' in especificacao:
+            ax.set_yticks(*especificacao['yticks'])
+        if 'yscale' in especificacao:
+            ax.set_yscale(especificacao['yscale'])
+        if 'rotacao_x' in especificacao:
+            ax.tick_params(axis='x', labelrotation=especificacao['rotacao_x'])
+        if 'layout' in especificacao:
+            figura.tight_layout(rect=especificacao['layout'])
+
+        os.makedirs(os.path.dirname(especificacao['caminho']) or '.', exist_ok=True)
+        figura.savefig(especificacao['caminho'])
+    return especificacao['caminho']
+
+
+def _desenhar_lote(lote):
+    return [desenhar(especificacao) for especificacao in lote]
+
+
+@instrumentado('graficos')
+def renderizar_graficos(especificacoes, workers=None, diretorio_saida=None):
+    """
+    Desenha todas as especificações no pool de processos (uma figura por tarefa) e grava os PNGs.
+    Com 'diretorio_saida', os caminhos relativos das especificações são gravados dentro dele.
+    Retorna a lista de caminhos gravados.
+    """
+    if diretorio_saida is not None:
+        especificacoes = [dict(e, caminho=os.path.join(diretorio_saida, e['caminho'])) for e in especificacoes]
+    gravados = []
+    for caminhos in executar_em_lotes(_desenhar_lote, dividir_em_lotes(especificacoes, 1), workers, False):
+        for caminho in caminhos:
+            print(f"Salvo: {caminho}")
+        gravados.extend(caminhos)
+    return gravados
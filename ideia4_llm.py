@@ -1,15 +1,9 @@
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from matplotlib.ticker import PercentFormatter
 
-# --- 1. Carregar e Preparar os Dados ---
-print("1. Lendo os dados de sentimento classificados do arquivo CSV...")
-try:
-    df = pd.read_csv('analise_sentimento.csv')
-except FileNotFoundError:
-    print("ERRO: O arquivo 'analise_sentimento.csv' não foi encontrado. Por favor, crie-o primeiro.")
-    exit()
+from graficos import renderizar_graficos
+
+CAMINHO_ENTRADA = 'analise_sentimento.csv'
+CAMINHO_GRAFICO = 'analise_sentimento.png'
 
 # Definir a ordem correta para as faixas e categorias para o gráfico
 FAIXA_ORDER = ['E', 'D', 'C', 'B', 'A']
@@ -21,51 +15,50 @@ CATEGORIA_LABELS = {
     'D': 'D. Questionador/Exploratório',
     'E': 'E. Informativo/Contextual'
 }
-# Criar uma coluna combinada para o eixo X para facilitar a plotagem
-df['estrato'] = df['faixa_autor'] + ' | ' + df['resultado_pr']
 
-# --- 2. Calcular as Proporções ---
-print("2. Calculando as proporções de cada categoria de sentimento...")
-# Contar o número de ocorrências de cada categoria dentro de cada estrato
-counts = df.groupby(['estrato', 'categoria_sentimento']).size().unstack(fill_value=0)
+def calcular_proporcoes(df):
+    """
+    Proporção (%) de cada categoria de sentimento em cada estrato (faixa do autor | resultado do PR).
+    """
+    # Criar uma coluna combinada para o eixo X para facilitar a plotagem
+    estrato = df['faixa_autor'] + ' | ' + df['resultado_pr']
+    # Contar o número de ocorrências de cada categoria dentro de cada estrato
+    counts = df.groupby([estrato.rename('estrato'), 'categoria_sentimento']).size().unstack(fill_value=0)
 
-# Normalizar para obter porcentagens (somar cada linha para 100%)
-counts_pct = counts.div(counts.sum(axis=1), axis=0) * 100
+    # Normalizar para obter porcentagens (somar cada linha para 100%)
+    counts_pct = counts.div(counts.sum(axis=1), axis=0) * 100
 
-# Ordenar o índice e as colunas para o gráfico
-ordem_estratos = [f'{faixa} | {res}' for res in ['Aceito', 'Recusado'] for faixa in FAIXA_ORDER]
-counts_pct = counts_pct.reindex(index=ordem_estratos, columns=CATEGORIA_ORDER)
+    # Ordenar o índice e as colunas para o gráfico
+    ordem_estratos = [f'{faixa} | {res}' for res in ['Aceito', 'Recusado'] for faixa in FAIXA_ORDER]
+    return counts_pct.reindex(index=ordem_estratos, columns=CATEGORIA_ORDER)
 
-# --- 3. Gerar o Gráfico ---
-print("3. Gerando o gráfico de barras empilhadas 100%...")
-sns.set_theme(style="whitegrid")
-ordem_faixas = ["A", "B", "C", "D", "E"]
-cores_husl = sns.color_palette("husl", len(ordem_faixas))
-paleta_consistente = dict(zip(ordem_faixas, cores_husl))
-ax = counts_pct.plot(
-    kind='bar',
-    stacked=True,
-    figsize=(20, 10),
-    colormap='viridis_r', # Uma paleta de cores agradável
-    width=0.8
-)
+def especificacoes_sentimento(counts_pct, caminho=CAMINHO_GRAFICO):
+    """
+    Descreve o gráfico de barras empilhadas 100% a partir da tabela de proporções.
+    """
+    return [{
+        'tipo': 'barras_empilhadas', 'tabela': counts_pct, 'caminho': caminho, 'tamanho': (20, 10),
+        'estilo': 'whitegrid', 'layout': [0, 0, 0.85, 1],  # Ajusta o layout para a legenda caber
+        'opcoes': {'mapa_de_cores': 'viridis_r', 'rotulos_legenda': CATEGORIA_LABELS,
+                   'titulo_legenda': 'Categoria do Sentimento'},
+        'titulo': 'Distribuição Proporcional do Sentimento dos Comentários por Faixa e Resultado do PR',
+        'opcoes_titulo': {'fontsize': 20, 'pad': 20}, 'opcoes_rotulos': {'fontsize': 14},
+        'xlabel': 'Estrato (Faixa do Autor | Resultado do PR)', 'ylabel': 'Proporção de Comentários (%)',
+    }]
 
-# --- 4. Adicionar Rótulos e Títulos ---
-plt.title('Distribuição Proporcional do Sentimento dos Comentários por Faixa e Resultado do PR', fontsize=20, pad=20)
-plt.xlabel('Estrato (Faixa do Autor | Resultado do PR)', fontsize=14)
-plt.ylabel('Proporção de Comentários (%)', fontsize=14)
-plt.xticks(rotation=45, ha='right') # Rotaciona os labels do eixo X para melhor legibilidade
-ax.yaxis.set_major_formatter(PercentFormatter()) # Formata o eixo Y como porcentagem
+if __name__ == "__main__":
+    # --- 1. Carregar e Preparar os Dados ---
+    print("1. Lendo os dados de sentimento classificados do arquivo CSV...")
+    try:
+        df = pd.read_csv(CAMINHO_ENTRADA)
+    except FileNotFoundError:
+        print(f"ERRO: O arquivo '{CAMINHO_ENTRADA}' não foi encontrado. Gere-o com: python classificacao_sentimento.py")
+        exit()
 
-# Adicionar a legenda
-handles, labels = ax.get_legend_handles_labels()
-ax.legend(
-    handles,
-    [CATEGORIA_LABELS[label] for label in labels], # Usa os nomes completos na legenda
-    title='Categoria do Sentimento',
-    bbox_to_anchor=(1.02, 1),
-    loc='upper left'
-)
+    # --- 2. Calcular as Proporções ---
+    print("2. Calculando as proporções de cada categoria de sentimento...")
+    counts_pct = calcular_proporcoes(df)
 
-plt.tight_layout(rect=[0, 0, 0.85, 1]) # Ajusta o layout para a legenda caber
-plt.show()
\ No newline at end of file
+    # --- 3. Gerar o Gráfico ---
+    print("3. Gerando o gráfico de barras empilhadas 100%...")
+    renderizar_graficos(especificacoes_sentimento(counts_pct))
@@ -0,0 +1,180 @@
+# 1. Análise de Tamanho e Complexidade dos PRs
+# Desenvolvedores experientes submetem PRs menores? O tamanho do PR influencia a aceitação?
+# Métricas a extrair (ver ideia_1.ipynb):
+# Tamanho do PR: linhas alteradas (soma de additions + deletions dos arquivos) e número de arquivos (counts.files).
+# Aceitação: entre os PRs fechados, a proporção dos que foram mesclados (merged_at), por faixa e por tamanho.
+# Visualizações sugeridas:
+# Box plots do tamanho por faixa (escala log), barras 100% empilhadas de PRs aceitos vs. recusados/fechados
+# e a taxa de aceitação por faixa de tamanho (número de arquivos e quintis de linhas alteradas).
+
+import pandas as pd
+import seaborn as sns
+from matplotlib.colors import ListedColormap
+
+from carregador_prs import FAIXA_DESCONHECIDA, carregar_faixas_desenvolvedores, iterar_pull_requests
+from graficos import paleta_por_faixa, agregar_boxplot, renderizar_graficos
+
+# Caminho base
+base_path = "repositories-mined"
+ordem_faixas = ["E", "D", "C", "B", "A"]
+
+# Campos do JSON usados pela análise (o restante do PR não é mantido em memória)
+CAMPOS_TAMANHO = ['pr_number', 'state', 'merged_at', 'counts', 'files[].additions', 'files[].deletions']
+
+# Faixas de número de arquivos e quantidade de quantis de linhas da análise de aceitação
+BORDAS_ARQUIVOS = [0, 1, 5, 10, 20, 50, float('inf')]
+ROTULOS_ARQUIVOS = ['1', '2-5', '6-10', '11-20', '21-50', '51+']
+QUANTIS_LINHAS = 5
+
+# --------------------------
+# Extração
+# --------------------------
+def tabela_de_tamanho(prs):
+    """
+    Uma linha por PR: faixa, linhas e arquivos alterados, se o PR está fechado e se foi mesclado.
+    """
+    linhas = []
+    for pr in prs:
+        arquivos = pr.get('files') or []
+        linhas.append((
+            pr.get('faixa'),
+            sum(f.get('additions', 0) + f.get('deletions', 0) for f in arquivos),
+            (pr.get('counts') or {}).get('files', 0),
+            pr.get('state') == 'closed',
+            pr.get('merged_at') is not None,
+        ))
+    return pd.DataFrame.from_records(linhas, columns=['faixa', 'linhas_alteradas', 'arquivos_alterados',
+                                                      'fechado', 'aceito'])
+
+def analisar_tamanho(base_path, mapa_devs, workers=None):
+    """
+    Lê os PRs dos autores da amostra em fluxo, projetados em CAMPOS_TAMANHO.
+    """
+    prs = iterar_pull_requests(base_path, CAMPOS_TAMANHO, mapa_devs, workers, apenas_amostra=True)
+    return tabela_de_tamanho(prs)
+
+def tabela_de_tamanho_do_parquet(diretorio, repos=None):
+    """
+    Mesma tabela de tabela_de_tamanho lida do armazenamento Parquet (ver armazenamento_colunar),
+    apenas para os PRs de faixa conhecida (os autores da amostra).
+    """
+    from armazenamento_colunar import ler_tabela, CHAVE_PR
+
+    prs = ler_tabela('prs', diretorio, CHAVE_PR + ['faixa', 'state', 'merged_at', 'counts.files'], repos)
+    for coluna in ('faixa', 'state', 'merged_at', 'counts.files'):
+        if coluna not in prs:
+            prs[coluna] = None
+    prs = prs[prs['faixa'].notna() & (prs['faixa'] != FAIXA_DESCONHECIDA)]
+    arquivos = ler_tabela('files', diretorio, CHAVE_PR + ['additions', 'deletions'], repos)
+    for coluna in ('additions', 'deletions'):
+        if coluna not in arquivos:
+            arquivos[coluna] = 0
+    linhas = (arquivos['additions'].fillna(0) + arquivos['deletions'].fillna(0)).groupby(
+        [arquivos['repo'], arquivos['pr_number']]).sum()
+    linhas = linhas.reindex(pd.MultiIndex.from_frame(prs[CHAVE_PR]), fill_value=0)
+    return pd.DataFrame({
+        'faixa': prs['faixa'].to_numpy(),
+        'linhas_alteradas': linhas.to_numpy().astype('int64'),
+        'arquivos_alterados': pd.to_numeric(prs['counts.files']).fillna(0).astype('int64').to_numpy(),
+        'fechado': (prs['state'] == 'closed').to_numpy(),
+        'aceito': prs['merged_at'].notna().to_numpy(),
+    })
+
+# --------------------------
+# Agregação
+# --------------------------
+def _aceitacao_por_quantis_de_linhas(fechados):
+    """
+    Taxa de aceitação por quintil de linhas alteradas (PRs com alguma linha), com os quintis
+    rotulados pelo menor e pelo maior valor de cada um.
+    """
+    com_linhas = fechados[fechados['linhas_alteradas'] > 0]
+    if com_linhas.empty:
+        return pd.DataFrame(columns=ordem_faixas)
+    codigos = pd.qcut(com_linhas['linhas_alteradas'], QUANTIS_LINHAS, labels=False, duplicates='drop')
+    limites = com_linhas.groupby(codigos)['linhas_alteradas'].agg(['min', 'max'])
+    rotulos = {codigo: f"{int(linha['min'])}-{int(linha['max'])}" for codigo, linha in limites.iterrows()}
+    taxas = com_linhas.groupby([codigos, 'faixa'])['aceito'].mean().unstack()
+    return taxas.rename(index=rotulos).reindex(columns=ordem_faixas)
+
+def agregar_tamanho(df):
+    """
+    Calcula uma única vez as tabelas usadas no resumo e nos gráficos: box plots do tamanho,
+    proporção de aceitos por faixa e taxas de aceitação por faixa de tamanho.
+    """
+    com_mudanca = df[(df['linhas_alteradas'] > 0) | (df['arquivos_alterados'] > 0)]
+    fechados = df[df['fechado']]
+
+    status = fechados.groupby('faixa')['aceito'].value_counts(normalize=True).unstack(fill_value=0) * 100
+    status = status.rename(columns={True: 'Aceitos', False: 'Recusados/Fechados'})
+    status = status.reindex(index=ordem_faixas, columns=['Aceitos', 'Recusados/Fechados'], fill_value=0)
+
+    faixa_arquivos = pd.cut(fechados['arquivos_alterados'], BORDAS_ARQUIVOS, labels=ROTULOS_ARQUIVOS, right=True)
+    por_arquivos = fechados.groupby([faixa_arquivos, 'faixa'], observed=False)['aceito'].mean().unstack()
+
+    resumo = com_mudanca.groupby('faixa').agg(
+        media_linhas_alteradas=('linhas_alteradas', 'mean'), mediana_linhas_alteradas=('linhas_alteradas', 'median'),
+        media_arquivos_alterados=('arquivos_alterados', 'mean'),
+        mediana_arquivos_alterados=('arquivos_alterados', 'median'), total_prs=('faixa', 'size'),
+    ).reindex(ordem_faixas)
+    return {
+        "resumo": resumo,
+        "linhas_alteradas": agregar_boxplot(com_mudanca, "linhas_alteradas", ordem_faixas),
+        "arquivos_alterados": agregar_boxplot(com_mudanca, "arquivos_alterados", ordem_faixas),
+        "status": status,
+        "aceitacao_por_arquivos": por_arquivos.reindex(columns=ordem_faixas),
+        "aceitacao_por_linhas": _aceitacao_por_quantis_de_linhas(fechados),
+    }
+
+# --------------------------
+# Gráficos
+# --------------------------
+def especificacoes_tamanho(agregados):
+    """
+    Descreve os gráficos da ideia 1 a partir das tabelas de agregar_tamanho.
+    """
+    cores = paleta_por_faixa("husl")
+    husl = sns.color_palette("husl", 8)
+    return [
+        {"tipo": "boxplot", "tabela": agregados["linhas_alteradas"], "opcoes": {"cores": cores},
+         "caminho": "analise_faixas_prs_linhas_alteradas.png", "tamanho": (9, 8), "yscale": "log",
+         "titulo": "Distribuição de Linhas de Código Alteradas por PR",
+         "xlabel": "Faixa do Desenvolvedor", "ylabel": "Total de Linhas Alteradas (Escala Log)"},
+        {"tipo": "boxplot", "tabela": agregados["arquivos_alterados"], "opcoes": {"cores": cores},
+         "caminho": "analise_faixas_prs_arquivos_alterados.png", "tamanho": (9, 8), "yscale": "log",
+         "titulo": "Distribuição de Arquivos Alterados por PR",
+         "xlabel": "Faixa do Desenvolvedor", "ylabel": "Número de Arquivos Alterados (Escala Log)"},
+        {"tipo": "barras_empilhadas", "tabela": agregados["status"], "tamanho": (14, 8), "layout": (0, 0, 1, 1),
+         "opcoes": {"mapa_de_cores": ListedColormap([husl[3], husl[0]]), "titulo_legenda": "Status do PR"},
+         "caminho": "analise_prs_status_percentual.png", "opcoes_titulo": {"fontsize": 16},
+         "titulo": "Proporção Percentual de PRs Aceitos vs. Recusados/Fechados por Faixa",
+         "xlabel": "Faixa do Desenvolvedor", "ylabel": "Porcentagem de Pull Requests", "rotacao_x": 0},
+        {"tipo": "barras_agrupadas", "tabela": agregados["aceitacao_por_arquivos"], "tamanho": (15, 8),
+         "opcoes": {"cores": cores, "titulo_legenda": "Faixa Dev"}, "ylim": (0, 1.05),
+         "caminho": "grafico_aceitacao_por_arquivos.png", "opcoes_titulo": {"fontsize": 16},
+         "titulo": "Taxa de Aceitação de PRs vs. Número de Arquivos Modificados",
+         "xlabel": "Número de Arquivos Modificados (em faixas)", "ylabel": "Taxa de Aceitação (Média)"},
+        {"tipo": "barras_agrupadas", "tabela": agregados["aceitacao_por_linhas"], "tamanho": (15, 8),
+         "opcoes": {"cores": cores, "titulo_legenda": "Faixa Dev"}, "ylim": (0, 1.05), "rotacao_x": 45,
+         "layout": (0, 0, 1, 1), "caminho": "grafico_aceitacao_por_linhas.png", "opcoes_titulo": {"fontsize": 16},
+         "titulo": "Taxa de Aceitação de PRs vs. Total de Linhas Modificadas",
+         "xlabel": "Total de Linhas Modificadas (em faixas)", "ylabel": "Taxa de Aceitação (Média)"},
+    ]
+
+# --------------------------
+# Execução
+# --------------------------
+if __name__ == "__main__":
+    mapa_devs = carregar_faixas_desenvolvedores(base_path)
+    df = analisar_tamanho(base_path, mapa_devs)
+    print(f"\nTotal de PRs coletados: {len(df)}")
+
+    agregados = agregar_tamanho(df)
+    print("\n--- Análise Estatística por Faixa ---")
+    print(agregados["resumo"].round(2))
+
+    print("\n--- Proporção de PRs por Faixa e Status (%) ---")
+    print(agregados["status"].round(2))
+
+    renderizar_graficos(especificacoes_tamanho(agregados))
+    print("Finalizado")
@@ -8,186 +8,242 @@
 # Gráficos de barras com a média do "tempo para o merge" para cada faixa, com barras de erro para indicar a variância.
 # Um gráfico de pizza ou barras empilhadas mostrando a proporção de status de CI (success, failure, pending) por faixa de desenvolvedor.
 
-import os
-import json
-import random
+import sys
 from datetime import datetime
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from carregador_prs import carregar_faixas_desenvolvedores, iterar_pull_requests, chave_dev
+from ingestao_incremental import atualizar_incremental, carregar_manifesto, COLUNA_ARQUIVO
+from metricas_vetorizadas import explodir_prs, calcular_eficiencia, CI_VALIDOS
+from graficos import paleta_por_faixa, agregar_media_e_desvio, agregar_boxplot, renderizar_graficos
+from testes_estatisticos import analisar_metrica, imprimir_resultado, replicas_pedidas
+from instrumentacao import instrumentado, contar
+from amostragem import sortear, arquivos_da_amostra, variancia_entre_subamostras, AUTORES_POR_ESTRATO, SEMENTE_PADRAO
+from agregados import (media_e_desvio, medias, proporcoes, caixas, resumir_por_repositorio, tabela_eficiencia,
+                       resumir_tabela_eficiencia)
 
 # Caminho base
 base_path = "repositories-mined"
 
-# Armazenamento dos dados de PRs
-todos_os_prs = []
-
-print(f"Iniciando varredura em '{base_path}'...\n")
-
-# Percorre cada repositório
-for repo in os.listdir(base_path):
-    repo_path = os.path.join(base_path, repo)
-    if not os.path.isdir(repo_path):
-        continue
-
-    # Lê os 75 autores
-    sample_path = os.path.join(repo_path, "sample-devs.jsonl")
-    if not os.path.isfile(sample_path):
-        continue
-
-    with open(sample_path, 'r', encoding='utf-8') as f:
-        devs = [json.loads(line) for line in f]
-
-    # Escolhe 15 autores aleatórios
-    autores_escolhidos = random.sample(devs, min(15, len(devs)))
-
-    for autor in autores_escolhidos:
-        nome = autor['author']
-        faixa = autor['faixa']
-        caminho_results = os.path.join(repo_path, "developer", nome, "results")
-
-        if not os.path.isdir(caminho_results):
-            continue
-
-        for arquivo_json in os.listdir(caminho_results):
-            if not arquivo_json.endswith(".json"):
-                continue
-
-            caminho_arquivo = os.path.join(caminho_results, arquivo_json)
-
-            try:
-                with open(caminho_arquivo, 'r', encoding='utf-8') as f:
-                    pr = json.load(f)
-
-                pr['author'] = nome
-                pr['faixa'] = faixa
-                pr['repo'] = repo
-                todos_os_prs.append(pr)
-            except Exception as e:
-                print(f"Erro ao ler {caminho_arquivo}: {e}")
-
-print(f"\nTotal de PRs coletados: {len(todos_os_prs)}")
+def sortear_autores(base_path, n=AUTORES_POR_ESTRATO, semente=SEMENTE_PADRAO):
+    """
+    Sorteia n autores por faixa em cada repositório (3 x 5 faixas = 15 por repositório) e
+    devolve o mapa (repo, autor) -> faixa dos escolhidos. Com a mesma semente, a amostra
+    é sempre a mesma (ver amostragem).
+    """
+    return sortear(carregar_faixas_desenvolvedores(base_path), n, semente)
 
 # --------------------------
 # Análise de Eficiência
 # --------------------------
-def analisar_eficiencia(prs):
-    registros = []
+# Campos do JSON usados pela análise (o restante do PR não é mantido em memória)
+CAMPOS_EFICIENCIA = ['created_at', 'merged_at', 'ci_status_on_head']
 
-    for pr in prs:
+def extrair_metricas_eficiencia(pr):
+    """
+    Extrai as métricas de eficiência de um único PR (None se a data de criação for inválida).
+    """
+    try:
+        created_at = datetime.fromisoformat(pr['created_at'].replace("Z", "+00:00"))
+    except (KeyError, AttributeError, ValueError):
+        return None
+
+    merged_at = pr.get("merged_at")
+    tempo_merge = None
+    if merged_at:
         try:
-            created_at = datetime.fromisoformat(pr['created_at'].replace("Z", "+00:00"))
-        except:
-            continue
-
-        merged_at = pr.get("merged_at")
-        tempo_merge = None
-        if merged_at:
-            try:
-                merged = datetime.fromisoformat(merged_at.replace("Z", "+00:00"))
-                tempo_merge = (merged - created_at).total_seconds() / 3600
-            except:
-                pass
-
-        ci = pr.get("ci_status_on_head", "unknown")
-        ci_sucesso = 1 if ci == "success" else 0
-        ci_valido = ci in ["success", "failure", "pending"]
-
-        registros.append({
-            "faixa": pr["faixa"],
-            "tempo_merge_horas": tempo_merge,
-            "ci_status": ci,
-            "ci_sucesso": ci_sucesso,
-            "ci_valido": ci_valido,
-            "hora_criacao": created_at.hour,
-            "dia_semana_criacao": created_at.weekday(),
-        })
-
-    return pd.DataFrame(registros)
-
-df = analisar_eficiencia(todos_os_prs)
+            merged = datetime.fromisoformat(merged_at.replace("Z", "+00:00"))
+            tempo_merge = (merged - created_at).total_seconds() / 3600
+        except (AttributeError, ValueError):
+            pass
+
+    ci = pr.get("ci_status_on_head", "unknown")
+    ci_sucesso = 1 if ci == "success" else 0
+    ci_valido = ci in ["success", "failure", "pending"]
+
+    return {
+        "faixa": pr["faixa"],
+        "tempo_merge_horas": tempo_merge,
+        "ci_status": ci,
+        "ci_sucesso": ci_sucesso,
+        "ci_valido": ci_valido,
+        "hora_criacao": created_at.hour,
+        "dia_semana_criacao": created_at.weekday(),
+    }
+
+@instrumentado('eficiencia')
+def analisar_eficiencia(prs):
+    """
+    Calcula as métricas de eficiência de todos os PRs de uma vez: os PRs são explodidos em
+    tabelas planas e as datas convertidas coluna a coluna (ver metricas_vetorizadas).
+    O resultado é o mesmo de aplicar extrair_metricas_eficiencia a cada PR.
+    PRs sem data de criação válida são descartados e contados na instrumentação.
+    """
+    tabelas = explodir_prs(prs)
+    df = calcular_eficiencia(tabelas)
+    contar('eficiencia_prs_descartados', len(tabelas['prs']) - len(df))
+    return df
+
+@instrumentado('eficiencia_incremental')
+def atualizar_dados_eficiencia(base_path, caminho_saida="dados_eficiencia_processados.feather", workers=None):
+    """
+    Mantém o dataset de eficiência de todos os autores da amostra, relendo a cada execução
+    apenas os JSONs novos ou modificados (ver ingestao_incremental).
+    """
+    mapa_devs = carregar_faixas_desenvolvedores(base_path)
+    return atualizar_incremental(caminho_saida, extrair_metricas_eficiencia, base_path,
+                                 mapa_devs=mapa_devs, workers=workers, campos=CAMPOS_EFICIENCIA)
+
+@instrumentado('eficiencia_em_fluxo')
+def analisar_eficiencia_em_fluxo(base_path, mapa_devs, workers=None):
+    """
+    Calcula as métricas de eficiência lendo os PRs em fluxo, projetados em CAMPOS_EFICIENCIA,
+    sem manter o corpus inteiro em memória.
+    """
+    prs = iterar_pull_requests(base_path, CAMPOS_EFICIENCIA, mapa_devs, workers, apenas_amostra=True)
+    return analisar_eficiencia(prs)
+
+def anexar_autores(df, caminho_saida):
+    """
+    Adiciona as colunas 'repo' e 'author' (normalizadas) às linhas do dataset, a partir do
+    repo/autor de cada arquivo no manifesto.
+    """
+    manifesto = carregar_manifesto(caminho_saida)
+    origem = {caminho: chave_dev(entrada['repo'], entrada['author']) for caminho, entrada in manifesto.items()}
+    chaves = df[COLUNA_ARQUIVO].map(origem)
+    return df.assign(repo=chaves.str[0], author=chaves.str[1])
 
 # --------------------------
 # Paleta de cores consistente (husl)
 # --------------------------
 ordem_faixas = ["A", "B", "C", "D", "E"]
-cores_husl = sns.color_palette("husl", len(ordem_faixas))
-paleta_consistente = dict(zip(ordem_faixas, cores_husl))
+paleta_consistente = paleta_por_faixa("husl")
 
 # --------------------------
 # Gráficos e Tabelas
 # --------------------------
-sns.set(style="whitegrid", font_scale=1.1)
+DIAS_DA_SEMANA = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo"]
 
-def gerar_graficos(df):
+def agregar_eficiencia(df):
     """
-    Gera e salva os gráficos da análise de eficiência sem exibi-los na tela.
+    Calcula uma única vez as tabelas por faixa usadas no resumo e nos gráficos:
+    média e desvio do tempo para merge, taxa de sucesso da CI e box plots de hora e dia.
     """
     ordem = ["E", "D", "C", "B", "A"]
-
-    # --- Tempo médio para merge ---
-    plt.figure(figsize=(10,6))
-    sns.barplot(data=df, x='faixa', y='tempo_merge_horas',
-                order=ordem, errorbar='sd', palette=paleta_consistente)
-    plt.title("Tempo Médio para Merge por Faixa")
-    plt.xlabel("Faixa")
-    plt.ylabel("Tempo (quantidade de horas)")
-    plt.savefig("grafico_tempo_para_merge.png")
-    print("Salvo: grafico_tempo_para_merge.png")
-    plt.close()
-
-    # --- Taxa de sucesso CI ---
-    plt.figure(figsize=(10,6))
     ci = df[df["ci_valido"]].groupby("faixa")["ci_sucesso"].mean().reindex(ordem)
-    sns.barplot(x=ci.index, y=ci.values, palette=paleta_consistente)
-    plt.title("Taxa de Sucesso da CI por Faixa")
-    plt.xlabel("Faixa")
-    plt.ylabel("Taxa de Sucesso (%)")
-    plt.ylim(0, 1)
-    plt.yticks([i/10 for i in range(0, 11)], [f"{i*10}" for i in range(0, 11)])
-    plt.savefig("grafico_ci_sucesso.png")
-    print("Salvo: grafico_ci_sucesso.png")
-    plt.close()
-
-    # --- Hora de criação ---
-    plt.figure(figsize=(10,6))
-    sns.boxplot(data=df, x='faixa', y='hora_criacao', order=ordem, palette=paleta_consistente)
-    plt.title("Hora do Dia de Criação dos PRs")
-    plt.xlabel("Faixa")
-    plt.ylabel("Hora do Dia (h)")
-    plt.savefig("grafico_hora_criacao.png")
-    print("Salvo: grafico_hora_criacao.png")
-    plt.close()
-
-    # --- Dia da semana ---
-    plt.figure(figsize=(10,6))
-    sns.boxplot(data=df, x='faixa', y='dia_semana_criacao', order=ordem, palette=paleta_consistente)
-    plt.title("Dia da Semana de Criação dos PRs")
-    plt.xlabel("Faixa")
-    plt.ylabel("Dia da Semana")
-    plt.yticks(ticks=range(7), labels=["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo"])
-    plt.savefig("grafico_dia_criacao.png")
-    print("Salvo: grafico_dia_criacao.png")
-    plt.close()
-
-    return
+    return {
+        "tempo_merge": agregar_media_e_desvio(df, "tempo_merge_horas", ordem),
+        "ci_sucesso": ci.to_frame("valor"),
+        "hora_criacao": agregar_boxplot(df, "hora_criacao", ordem),
+        "dia_semana_criacao": agregar_boxplot(df, "dia_semana_criacao", ordem),
+    }
+
+def agregar_eficiencia_do_estado(estado):
+    """
+    Mesmas tabelas de agregar_eficiencia a partir de um estado de agregados.resumir_eficiencia
+    (ex.: combinado por repositório em paralelo): os box plots saem dos esboços de quantis,
+    sem manter as colunas inteiras.
+    """
+    ordem = ["E", "D", "C", "B", "A"]
+    ci = proporcoes(estado, "ci_status", CI_VALIDOS, ordem)["success"]
+    return {
+        "tempo_merge": media_e_desvio(estado, "tempo_merge_horas", ordem),
+        "ci_sucesso": ci.to_frame("valor"),
+        "hora_criacao": caixas(estado, "hora_criacao", ordem),
+        "dia_semana_criacao": caixas(estado, "dia_semana_criacao", ordem),
+    }
+
+def especificacoes_eficiencia(agregados):
+    """
+    Descreve os gráficos da análise de eficiência a partir das tabelas de agregar_eficiencia.
+    """
+    opcoes = {"cores": paleta_consistente}
+    return [
+        {"tipo": "barras", "tabela": agregados["tempo_merge"], "opcoes": opcoes,
+         "caminho": "grafico_tempo_para_merge.png", "titulo": "Tempo Médio para Merge por Faixa",
+         "xlabel": "Faixa", "ylabel": "Tempo (quantidade de horas)"},
+        {"tipo": "barras", "tabela": agregados["ci_sucesso"], "opcoes": opcoes,
+         "caminho": "grafico_ci_sucesso.png", "titulo": "Taxa de Sucesso da CI por Faixa",
+         "xlabel": "Faixa", "ylabel": "Taxa de Sucesso (%)", "ylim": (0, 1),
+         "yticks": ([i/10 for i in range(0, 11)], [f"{i*10}" for i in range(0, 11)])},
+        {"tipo": "boxplot", "tabela": agregados["hora_criacao"], "opcoes": opcoes,
+         "caminho": "grafico_hora_criacao.png", "titulo": "Hora do Dia de Criação dos PRs",
+         "xlabel": "Faixa", "ylabel": "Hora do Dia (h)"},
+        {"tipo": "boxplot", "tabela": agregados["dia_semana_criacao"], "opcoes": opcoes,
+         "caminho": "grafico_dia_criacao.png", "titulo": "Dia da Semana de Criação dos PRs",
+         "xlabel": "Faixa", "ylabel": "Dia da Semana", "yticks": (range(7), DIAS_DA_SEMANA)},
+    ]
+
+def gerar_graficos(df, workers=None, agregados=None):
+    """
+    Gera e salva os gráficos da análise de eficiência sem exibi-los na tela, desenhados em
+    paralelo a partir das tabelas agregadas (ver graficos.renderizar_graficos).
+    """
+    if agregados is None:
+        agregados = agregar_eficiencia(df)
+    return renderizar_graficos(especificacoes_eficiencia(agregados), workers)
 
 # --------------------------
-# Exibir resumo no console
+# Execução
 # --------------------------
-print("\n--- Tempo Médio para Merge por Faixa ---")
-print(df.groupby('faixa')['tempo_merge_horas'].mean().reindex(["E", "D", "C", "B", "A"]))
-
-print("\n--- Taxa de Sucesso da CI por Faixa ---")
-print(df[df["ci_valido"]].groupby('faixa')['ci_sucesso'].mean().reindex(["E", "D", "C", "B", "A"]))
-
-print("\n--- Hora Média de Criação ---")
-print(df.groupby('faixa')['hora_criacao'].mean().reindex(["E", "D", "C", "B", "A"]))
-
-print("\n--- Dia Médio de Criação (0=Segunda) ---")
-print(df.groupby('faixa')['dia_semana_criacao'].mean().reindex(["E", "D", "C", "B", "A"]))
-
-# Gerar gráficos
-gerar_graficos(df)
-
-print("Finalizado")
+if __name__ == "__main__":
+    #   python ideia_2.py [--reamostragem[=N]] [--erro-amostragem]
+    # Só os JSONs dos autores sorteados são lidos. Com --erro-amostragem, o dataset de todos os
+    # autores também é atualizado (relendo apenas os PRs novos ou modificados) para estimar o
+    # erro de amostragem; o seu manifesto, já atual, indica então os arquivos da amostra.
+    erro_amostragem = "--erro-amostragem" in sys.argv[1:]
+    caminho_saida = "dados_eficiencia_processados.feather"
+    df_completo = atualizar_dados_eficiencia(base_path, caminho_saida) if erro_amostragem else None
+    mapa_escolhidos = sortear_autores(base_path)
+    arquivos = arquivos_da_amostra(mapa_escolhidos, caminho_saida if erro_amostragem else None, base_path)
+
+    # Uma única leitura da amostra: cada repositório vira, em um processo do pool, a tabela
+    # por PR (para os testes) e o estado parcial (ver agregados). As tabelas por faixa, as
+    # médias e os box plots saem do estado combinado, com os quartis dos esboços de quantis
+    tabelas = []
+    estado, por_repo = resumir_por_repositorio(resumir_tabela_eficiencia, base_path, mapa_escolhidos,
+                                               CAMPOS_EFICIENCIA, arquivos=arquivos,
+                                               funcao_tabela=tabela_eficiencia, tabelas=tabelas)
+    df = pd.concat(tabelas, ignore_index=True) if tabelas else pd.DataFrame()
+
+    print(f"\nTotal de PRs coletados: {len(df)}")
+
+    # --------------------------
+    # Exibir resumo no console
+    # --------------------------
+    agregados = agregar_eficiencia_do_estado(estado)
+    medias_criacao = medias(estado, ["hora_criacao", "dia_semana_criacao"])
+
+    print("\n--- Tempo Médio para Merge por Faixa ---")
+    print(agregados["tempo_merge"]["valor"])
+
+    print("\n--- Taxa de Sucesso da CI por Faixa ---")
+    print(agregados["ci_sucesso"]["valor"])
+
+    print("\n--- Hora Média de Criação ---")
+    print(medias_criacao["hora_criacao"])
+
+    print("\n--- Dia Médio de Criação (0=Segunda) ---")
+    print(medias_criacao["dia_semana_criacao"])
+
+    print("\n--- Tempo Médio para Merge por Repositório e Faixa ---")
+    print(pd.DataFrame({repo: medias(parcial, ["tempo_merge_horas"])["tempo_merge_horas"]
+                        for repo, parcial in por_repo.items()}).T.to_string())
+
+    # Testes de significância das diferenças entre as faixas (permutações e bootstrap só
+    # com --reamostragem)
+    replicas = replicas_pedidas()
+    for coluna in ["tempo_merge_horas", "ci_sucesso", "hora_criacao", "dia_semana_criacao"]:
+        dados = df[df["ci_valido"]] if coluna == "ci_sucesso" else df
+        imprimir_resultado(coluna, analisar_metrica(dados, coluna, replicas=replicas))
+
+    # Erro de amostragem: o tempo médio para merge em subamostras repetidas dos autores,
+    # sorteadas sobre o dataset completo já processado (sem reler os PRs)
+    if erro_amostragem:
+        print("\n--- Tempo Médio para Merge entre Subamostras de Autores ---")
+        print(variancia_entre_subamostras(anexar_autores(df_completo, caminho_saida), "tempo_merge_horas"))
+
+    # Gerar gráficos
+    gerar_graficos(df, agregados=agregados)
+
+    print("Finalizado")
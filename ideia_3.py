@@ -8,263 +8,238 @@
 # Visualizações sugeridas:
 # Scatter plot (gráfico de dispersão) mostrando a relação entre o tamanho do PR e o número de comentários de revisão, com cores diferentes para cada faixa de desenvolvedor.
 # Gráfico de barras comparando a densidade média de comentários por faixa.
-import pandas as pd
 from datetime import datetime
-import os
-import json
 
-def carregar_dados_de_pull_requests(diretorio_base):
+from functools import partial
+
+from carregador_prs import carregar_pull_requests, iterar_pull_requests
+from ingestao_incremental import atualizar_incremental, COLUNA_ARQUIVO
+from indice_autores import obter_indice, consultar
+from metricas_vetorizadas import explodir_prs, calcular_qualidade
+from graficos import paleta_por_faixa, agregar_histograma_2d, renderizar_graficos
+from testes_estatisticos import analisar_metrica, imprimir_resultado, replicas_pedidas
+from instrumentacao import instrumentado, contar
+
+# Campos do JSON usados pela análise de qualidade (o restante do PR não é mantido em memória)
+CAMPOS_QUALIDADE = [
+    'pr_number', 'counts',
+    'files[].additions', 'files[].deletions',
+    'review_comments[].created_at', 'reviews[].state', 'commits[].date',
+]
+
+def carregar_dados_de_pull_requests(diretorio_base, workers=None, campos=None):
     """
-    Percorre a estrutura de pastas especificada, carrega os JSONs dos PRs
+    Carrega os JSONs dos PRs com o carregador compartilhado (leitura em paralelo)
     e enriquece os dados com informações do repositório e autor extraídas do caminho.
+    Com 'campos' (ex.: CAMPOS_QUALIDADE), apenas esses campos de cada PR são mantidos.
     """
-    lista_de_prs = []
-    print(f"Iniciando varredura em: {diretorio_base}")
+    return carregar_pull_requests(diretorio_base, workers=workers, campos=campos)
 
-    # os.walk é ideal para navegar na árvore de diretórios
-    for root, dirs, files in os.walk(diretorio_base):
-        # A pasta 'results' é o nosso alvo
-        if root.endswith('/results') or root.endswith('\\results'):
-            for nome_arquivo in files:
-                if nome_arquivo.endswith('.json'):
-                    caminho_completo = os.path.join(root, nome_arquivo)
-                    try:
-                        # Extrai metadados do caminho do arquivo
-                        # Ex: .../repo-legal/developer/dev-joao/results/123.json
-                        partes_caminho = caminho_completo.replace('\\', '/').split('/')
-                        
-                        # Ajuste os índices negativos se a profundidade do seu diretorio_base variar
-                        repo_nome = partes_caminho[-5]
-                        dev_nome = partes_caminho[-3]
-                        
-                        with open(caminho_completo, 'r', encoding='utf-8') as f:
-                            pr_data = json.load(f)
-                        
-                        # Adiciona os metadados extraídos diretamente no dicionário do PR
-                        # Isso garante que a informação não se perca
-                        pr_data['repo'] = repo_nome
-                        pr_data['author'] = dev_nome
-                        
-                        lista_de_prs.append(pr_data)
-
-                    except (IOError, json.JSONDecodeError, IndexError) as e:
-                        print(f"Erro ao processar o arquivo {caminho_completo}: {e}")
-                        
-    print(f"Carregamento concluído. Total de {len(lista_de_prs)} PRs encontrados.")
-    return lista_de_prs
+def extrair_metricas_qualidade(pr):
+    """
+    Extrai as métricas de qualidade e revisão de um único PR.
+    Retorna None para PRs sem o campo 'counts'.
+    """
+    if not pr.get('counts'):
+        return None
 
+    # 1. Quantidade de feedback
+    num_reviews = pr['counts'].get('reviews', 0)
+    num_review_comments = pr['counts'].get('review_comments', 0)
+    
+    # 2. Densidade de comentários
+    total_changes = sum(file.get('additions', 0) + file.get('deletions', 0) for file in pr.get('files', []))
+    densidade_comentarios = 0
+    if total_changes > 0:
+        densidade_comentarios = num_review_comments / total_changes
+        
+    # 3. Ciclos de revisão (Rework)
+    # Encontrar a data do primeiro comentário de revisão
+    primeiro_comentario_dt = None
+    if pr.get('review_comments'):
+        datas_comentarios = [
+            datetime.fromisoformat(c['created_at'].replace('Z', '+00:00')) 
+            for c in pr['review_comments'] if c.get('created_at')
+        ]
+        if datas_comentarios:
+            primeiro_comentario_dt = min(datas_comentarios)
+
+    rework_commits = 0
+    if primeiro_comentario_dt and pr.get('commits'):
+        # Contar commits feitos APÓS o primeiro comentário
+        for commit in pr['commits']:
+            # O formato do timestamp do commit pode variar. Ajuste se necessário.
+            # Assumindo que o JSON do commit tem um timestamp. Se não tiver, essa métrica não pode ser calculada.
+            # Vamos supor que esteja em commit['commit']['author']['date'] ou similar.
+            # Para este exemplo, vamos assumir que o seu JSON de commit tem um campo 'date'.
+            if 'date' in commit: # Você precisará confirmar este campo no seu JSON
+                commit_dt = datetime.fromisoformat(commit['date'].replace('Z', '+00:00'))
+                if commit_dt > primeiro_comentario_dt:
+                    rework_commits += 1
+
+    # 4. Tipo de feedback
+    num_approved = 0
+    num_changes_requested = 0
+    if pr.get('reviews'):
+        for review in pr['reviews']:
+            if review.get('state') == 'APPROVED':
+                num_approved += 1
+            elif review.get('state') == 'CHANGES_REQUESTED':
+                num_changes_requested += 1
+    
+    total_reviews_com_estado = num_approved + num_changes_requested
+    proporcao_changes_requested = 0
+    if total_reviews_com_estado > 0:
+        proporcao_changes_requested = num_changes_requested / total_reviews_com_estado
+
+    return {
+        'pr_number': pr['pr_number'],
+        'autor': pr['author'],
+        'faixa': pr.get('faixa'),
+        'num_review_comments': num_review_comments,
+        'tamanho_pr': total_changes,
+        'densidade_comentarios': densidade_comentarios,
+        'rework_commits': rework_commits,
+        'proporcao_changes_requested': proporcao_changes_requested
+    }
+
+def _calcular_e_contar(tabelas):
+    # PRs sem 'counts' não geram linha; a quantidade vai para a instrumentação
+    df = calcular_qualidade(tabelas)
+    contar('qualidade_prs_descartados', len(tabelas['prs']) - len(df))
+    return df
+
+@instrumentado('qualidade')
 def analisar_qualidade_e_revisao(meus_dados_json):
     """
     Processa uma lista de PRs para extrair métricas de qualidade e revisão.
+    Os PRs são explodidos em tabelas planas e as métricas calculadas por coluna
+    (ver metricas_vetorizadas), com o mesmo resultado de extrair_metricas_qualidade por PR.
     """
-    resultados = []
-    
-    for pr in meus_dados_json:
-        if pr['faixa'] == 'Desconhecida' or not pr.get('counts'):
-            continue
-            
-        # 1. Quantidade de feedback
-        num_reviews = pr['counts'].get('reviews', 0)
-        num_review_comments = pr['counts'].get('review_comments', 0)
-        
-        # 2. Densidade de comentários
-        total_changes = sum(file.get('additions', 0) + file.get('deletions', 0) for file in pr.get('files', []))
-        densidade_comentarios = 0
-        if total_changes > 0:
-            densidade_comentarios = num_review_comments / total_changes
-            
-        # 3. Ciclos de revisão (Rework)
-        # Encontrar a data do primeiro comentário de revisão
-        primeiro_comentario_dt = None
-        if pr.get('review_comments'):
-            datas_comentarios = [
-                datetime.fromisoformat(c['created_at'].replace('Z', '+00:00')) 
-                for c in pr['review_comments'] if c.get('created_at')
-            ]
-            if datas_comentarios:
-                primeiro_comentario_dt = min(datas_comentarios)
-
-        rework_commits = 0
-        if primeiro_comentario_dt and pr.get('commits'):
-            # Contar commits feitos APÓS o primeiro comentário
-            for commit in pr['commits']:
-                # O formato do timestamp do commit pode variar. Ajuste se necessário.
-                # Assumindo que o JSON do commit tem um timestamp. Se não tiver, essa métrica não pode ser calculada.
-                # Vamos supor que esteja em commit['commit']['author']['date'] ou similar.
-                # Para este exemplo, vamos assumir que o seu JSON de commit tem um campo 'date'.
-                if 'date' in commit: # Você precisará confirmar este campo no seu JSON
-                    commit_dt = datetime.fromisoformat(commit['date'].replace('Z', '+00:00'))
-                    if commit_dt > primeiro_comentario_dt:
-                        rework_commits += 1
-
-        # 4. Tipo de feedback
-        num_approved = 0
-        num_changes_requested = 0
-        if pr.get('reviews'):
-            for review in pr['reviews']:
-                if review.get('state') == 'APPROVED':
-                    num_approved += 1
-                elif review.get('state') == 'CHANGES_REQUESTED':
-                    num_changes_requested += 1
-        
-        total_reviews_com_estado = num_approved + num_changes_requested
-        proporcao_changes_requested = 0
-        if total_reviews_com_estado > 0:
-            proporcao_changes_requested = num_changes_requested / total_reviews_com_estado
-
-        resultados.append({
-            'pr_number': pr['pr_number'],
-            'autor': pr['author'],
-            'faixa': pr['faixa'],
-            'num_review_comments': num_review_comments,
-            'tamanho_pr': total_changes,
-            'densidade_comentarios': densidade_comentarios,
-            'rework_commits': rework_commits,
-            'proporcao_changes_requested': proporcao_changes_requested
-        })
-        
-    return pd.DataFrame(resultados)
-
-# Execute a análise nos seus dados
-meus_dados_json = carregar_dados_de_pull_requests("repositories-mined")
-# Supondo que seus dados já foram carregados na variável 'meus_dados_json'
-# (Se você já converteu para DataFrame, use-o. Se não, esta é uma boa hora.)
-
-if not meus_dados_json:
-    print("Nenhum PR para analisar. Encerrando o script.")
-    exit()
-
-df_prs = pd.DataFrame(meus_dados_json)
-
-# --- INÍCIO DO BLOCO DE CÓDIGO FALTANTE ---
-
-# 1. Contar quantos PRs cada autor tem no nosso conjunto de dados
-contagem_de_prs_por_autor = df_prs['author'].value_counts()
-
-# 2. Definir uma função para atribuir a faixa baseada na contagem de PRs
-def atribuir_faixa(contagem):
-    if contagem == 1:
-        return 'E'
-    elif 2 <= contagem <= 10:  # Exemplo de regra para Faixa D - ajuste se necessário
-        return 'D'
-    elif 11 <= contagem <= 30: # Exemplo de regra para Faixa C - ajuste se necessário
-        return 'C'
-    elif 31 <= contagem <= 50: # Exemplo de regra para Faixa B - ajuste se necessário
-        return 'B'
-    elif contagem > 50:
-        return 'A'
-    return 'Desconhecida' # Para casos não previstos
-
-# 3. Criar o mapa de autor para faixa
-#    Isso cria um dicionário como {'nome_autor': 'Faixa A', 'outro_autor': 'Faixa C'}
-dev_para_faixa = contagem_de_prs_por_autor.apply(atribuir_faixa).to_dict()
-
-# 4. Adicionar a chave 'faixa' a cada PR na lista original 'meus_dados_json'
-#    Este é o passo que corrige o erro 'KeyError'
-for pr in meus_dados_json:
-    autor = pr.get('author')
-    if autor:
-        pr['faixa'] = dev_para_faixa.get(autor, 'Desconhecida')
-    else:
-        pr['faixa'] = 'Desconhecida'
-
-print("Enriquecimento concluído. A chave 'faixa' foi adicionada a cada PR.")
-# Verificação rápida
-# print("Exemplo de PR após enriquecimento:", meus_dados_json[0]['author'], meus_dados_json[0]['faixa'])
-
-# --- FIM DO BLOCO DE CÓDIGO FALTANTE ---
-
-
-# Agora você pode chamar a função de análise sem erro
-# A variável 'meus_dados_json' agora se chama 'meus_dados_json' no seu código, use o nome correto
-df_qualidade = analisar_qualidade_e_revisao(meus_dados_json) # ou analisar_qualidade_e_revisao(meus_dados_json)
-
-# O resto do seu código...
-print("\nMétricas médias de Qualidade e Revisão por Faixa de Experiência:")
-# ...etc
-df_qualidade = analisar_qualidade_e_revisao(meus_dados_json)
-print("Amostra do DataFrame resultante:")
-print(df_qualidade.head())
-
-# Supondo que 'df_qualidade' já foi criado como no seu output
-# E que 'media_por_faixa' também já foi calculado (se não, aqui está o código novamente)
-
-# --- 1. AGREGAÇÃO DOS DADOS POR FAIXA ---
-
-# Agrupar por faixa e calcular a média para cada métrica de interesse
-media_por_faixa = df_qualidade.groupby('faixa')[[
-    'num_review_comments',
-    'densidade_comentarios',
-    'rework_commits',
-    'proporcao_changes_requested'
-]].mean().reindex(['E', 'D', 'C', 'B', 'A']) # Ordenar da menor para a maior experiência
-
-print("\n--- Análise Agregada ---")
-print("Métricas médias de Qualidade e Revisão por Faixa de Experiência:")
-print(media_por_faixa)
+    return _calcular_e_contar(explodir_prs(meus_dados_json))
 
+@instrumentado('qualidade_em_fluxo')
+def analisar_qualidade_em_fluxo(diretorio_base, workers=None, indice=None):
+    """
+    Calcula as métricas de qualidade lendo os PRs em fluxo, projetados em CAMPOS_QUALIDADE,
+    sem manter o corpus inteiro em memória. A faixa vem da contagem de PRs por autor já
+    guardada no índice de autores (ver indice_autores), com uma junção sobre a tabela de PRs.
+    """
+    if indice is None:
+        indice = obter_indice(diretorio_base, workers=workers)
+    tabelas = explodir_prs(iterar_pull_requests(diretorio_base, CAMPOS_QUALIDADE, workers=workers))
+    tabelas['prs']['faixa'] = consultar(indice, tabelas['prs']['author'], coluna='faixa_contagem')
+    return _calcular_e_contar(tabelas)
 
-# --- 2. VISUALIZAÇÃO DOS RESULTADOS ---
+def _atribuir_faixas_pela_contagem(df, _manifesto, indice):
+    """
+    Recalcula a faixa de todas as linhas a partir da contagem de PRs por autor no índice,
+    que cobre o corpus inteiro (inclusive PRs que não geram linha de métricas).
+    """
+    if df.empty:
+        return df
+    df['faixa'] = consultar(indice, df['autor'], coluna='faixa_contagem')
+    return df
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+@instrumentado('qualidade_incremental')
+def atualizar_dados_qualidade(diretorio_base, caminho_saida='dados_qualidade_incremental.feather', workers=None):
+    """
+    Atualiza o dataset de qualidade de forma incremental: apenas os JSONs novos ou modificados
+    desde a última execução são lidos, os removidos saem do dataset e as faixas são recalculadas
+    a partir do índice de autores (aberto por memory-map se ainda estiver atual; senão,
+    também atualizado de forma incremental).
+    O dataset fica em um arquivo próprio: dados_qualidade_processados.feather, versionado no
+    repositório e lido pelo notebook ideia_3.ipynb, não é sobrescrito.
+    """
+    indice = obter_indice(diretorio_base, workers=workers)
+    return atualizar_incremental(caminho_saida, extrair_metricas_qualidade, diretorio_base, workers=workers,
+                                 pos_processar=partial(_atribuir_faixas_pela_contagem, indice=indice),
+                                 campos=CAMPOS_QUALIDADE)
 
-# Configurações de estilo para os gráficos
-sns.set(style="whitegrid", palette="viridis", font_scale=1.1)
+# Métricas comparadas por faixa (ordenadas da menor para a maior experiência)
+METRICAS_POR_FAIXA = ['num_review_comments', 'densidade_comentarios', 'rework_commits', 'proporcao_changes_requested']
+ORDEM_FAIXAS = ['E', 'D', 'C', 'B', 'A']
 
-# ----- VISUALIZAÇÃO 1: Gráfico de Barras (Densidade de Comentários) -----
-# Esta é a visualização mais importante para a sua hipótese.
+def agregar_qualidade(df_qualidade):
+    """
+    Calcula uma única vez as tabelas usadas no resumo e nos gráficos: a média das métricas
+    por faixa e o histograma 2-D (tamanho do PR x comentários) de cada faixa.
+    """
+    return {
+        'media_por_faixa': df_qualidade.groupby('faixa')[METRICAS_POR_FAIXA].mean().reindex(ORDEM_FAIXAS),
+        # Todos os PRs entram no gráfico de densidade: com dezenas de milhares de pontos, uma
+        # dispersão ficaria ilegível (overplotting), mas as caixas têm tamanho fixo
+        'tamanho_vs_comentarios': agregar_histograma_2d(df_qualidade, 'tamanho_pr', 'num_review_comments',
+                                                        ORDEM_FAIXAS),
+    }
+
+def especificacao_tamanho_vs_comentarios(histogramas, caminho='grafico_tamanho_vs_comentarios.png'):
+    """
+    Gráfico de densidade do tamanho do PR vs. comentários de revisão: um painel por faixa,
+    eixos em escala logarítmica e cor pela proporção dos PRs da faixa em cada caixa.
+    """
+    return {
+        'tipo': 'histograma_2d', 'tabela': histogramas, 'caminho': caminho,
+        'paineis': len(histogramas['faixas']), 'tamanho': (22, 6),
+        'titulo': 'Tamanho do PR vs. Quantidade de Comentários', 'opcoes_titulo': {'fontsize': 18},
+        'xlabel': 'Tamanho do PR (Adições + Deleções)', 'ylabel': 'Número de Comentários de Revisão',
+        'opcoes_rotulos': {'fontsize': 14},
+    }
+
+def especificacoes_qualidade(agregados):
+    """
+    Descreve os gráficos da análise de qualidade a partir das tabelas de agregar_qualidade.
+    """
+    densidade = agregados['media_por_faixa']['densidade_comentarios'].to_frame('valor')
+    return [
+        {'tipo': 'barras', 'tabela': densidade, 'caminho': 'grafico_densidade_comentarios.png',
+         'opcoes': {'cores': paleta_por_faixa('husl'), 'rotulos_valor': '.4f'}, 'tamanho': (12, 7),
+         'titulo': 'Densidade Média de Comentários por Faixa de Experiência',
+         'opcoes_titulo': {'fontsize': 18, 'pad': 20}, 'opcoes_rotulos': {'fontsize': 14},
+         'xlabel': 'Faixa de Experiência do Desenvolvedor', 'ylabel': 'Média de Comentários por Linha de Código'},
+        especificacao_tamanho_vs_comentarios(agregados['tamanho_vs_comentarios']),
+    ]
+
+def gerar_graficos(df_qualidade, workers=None, agregados=None):
+    """
+    Gera e salva os gráficos da análise de qualidade sem exibi-los na tela, desenhados em
+    paralelo a partir das tabelas agregadas (ver graficos.renderizar_graficos).
+    """
+    if agregados is None:
+        agregados = agregar_qualidade(df_qualidade)
+    return renderizar_graficos(especificacoes_qualidade(agregados), workers)
 
-plt.figure(figsize=(12, 7))
-barplot = sns.barplot(
-    x=media_por_faixa.index,
-    y=media_por_faixa['densidade_comentarios']
-)
-plt.title('Densidade Média de Comentários por Faixa de Experiência', fontsize=18, pad=20)
-plt.xlabel('Faixa de Experiência do Desenvolvedor', fontsize=14)
-plt.ylabel('Média de Comentários por Linha de Código', fontsize=14)
+if __name__ == "__main__":
+    # Atualiza o dataset processado relendo apenas os PRs novos ou modificados
+    df_qualidade = atualizar_dados_qualidade("repositories-mined")
 
-# Adicionar os valores exatos no topo de cada barra
-for p in barplot.patches:
-    barplot.annotate(format(p.get_height(), '.4f'), 
-                   (p.get_x() + p.get_width() / 2., p.get_height()), 
-                   ha = 'center', va = 'center', 
-                   xytext = (0, 9), 
-                   textcoords = 'offset points')
+    if df_qualidade.empty:
+        print("Nenhum PR para analisar. Encerrando o script.")
+        exit()
 
-plt.savefig('grafico_densidade_comentarios.png') # Salva o gráfico como imagem
-print("\nGráfico 'densidade_comentarios.png' foi salvo.")
+    df_qualidade = df_qualidade[df_qualidade['faixa'] != 'Desconhecida'].drop(columns=[COLUNA_ARQUIVO])
 
+    print("Amostra do DataFrame resultante:")
+    print(df_qualidade.head())
 
-# ----- VISUALIZAÇÃO 2: Gráfico de Dispersão (Tamanho do PR vs. Comentários) -----
-# Este gráfico mostra a relação bruta, com as faixas separadas por cores.
+    # --- 1. AGREGAÇÃO DOS DADOS POR FAIXA ---
 
-plt.figure(figsize=(14, 9))
+    # Médias e histogramas por faixa, calculados uma única vez para o resumo e os gráficos
+    agregados = agregar_qualidade(df_qualidade)
 
-# Com 73k pontos, o gráfico ficaria ilegível (overplotting).
-# É essencial usar uma amostra aleatória para a visualização.
-amostra_df = df_qualidade.sample(n=min(len(df_qualidade), 5000), random_state=42)
+    print("\n--- Análise Agregada ---")
+    print("Métricas médias de Qualidade e Revisão por Faixa de Experiência:")
+    print(agregados['media_por_faixa'])
 
-scatterplot = sns.scatterplot(
-    data=amostra_df,
-    x='tamanho_pr',
-    y='num_review_comments',
-    hue='faixa',
-    hue_order=['E', 'D', 'C', 'B', 'A'],
-    palette='viridis_r', # Invertido para A ser escuro
-    alpha=0.6,
-    s=60
-)
-plt.title('Tamanho do PR vs. Quantidade de Comentários', fontsize=18, pad=20)
-plt.xlabel('Tamanho do PR (Adições + Deleções)', fontsize=14)
-plt.ylabel('Número de Comentários de Revisão', fontsize=14)
+    # Testes de significância das diferenças entre as faixas (permutações e bootstrap só
+    # com --reamostragem)
+    replicas = replicas_pedidas()
+    for coluna in METRICAS_POR_FAIXA:
+        imprimir_resultado(coluna, analisar_metrica(df_qualidade, coluna, replicas=replicas))
 
-# Limitar os eixos para focar na maior parte dos dados, ignorando outliers extremos
-plt.xlim(0, amostra_df['tamanho_pr'].quantile(0.95))
-plt.ylim(0, amostra_df['num_review_comments'].quantile(0.95))
 
-plt.legend(title='Faixa de Experiência')
-plt.savefig('grafico_tamanho_vs_comentarios.png')
-print("Gráfico 'tamanho_vs_comentarios.png' foi salvo.")
+    # --- 2. VISUALIZAÇÃO DOS RESULTADOS ---
 
-plt.show() # Mostra os gráficos na tela
\ No newline at end of file
+    # Densidade de comentários por faixa (a visualização mais importante para a hipótese) e
+    # densidade do tamanho do PR vs. comentários, gravadas em PNG sem abrir janela
+    gerar_graficos(df_qualidade, agregados=agregados)
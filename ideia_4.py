@@ -5,4 +5,92 @@
 # Análise de sentimento (avançado): Se tiver as ferramentas, pode rodar uma análise de sentimento nos textos dos comentários. A comunicação se torna mais neutra/positiva com a experiência?
 # Responsividade: Analise o tempo entre um comentário de revisão (review_comments[].created_at) e um novo commit ou um comentário de resposta pelo autor do PR.
 # Visualizações sugeridas:
-# Box plots para o comprimento dos títulos e descrições dos PRs por faixa.
\ No newline at end of file
+# Box plots para o comprimento dos títulos e descrições dos PRs por faixa.
+
+from carregador_prs import carregar_faixas_desenvolvedores, iterar_pull_requests
+from responsividade import (tabelas_de_responsividade, calcular_responsividade, responsividade_por_pr,
+                            responsividade_por_faixa)
+from metricas_texto import extrair_textos, tabela_por_pr, salvar_tabela, CAMINHO_TABELA
+from graficos import paleta_por_faixa, agregar_boxplot, renderizar_graficos
+
+base_path = "repositories-mined"
+
+# --------------------------
+# Responsividade
+# --------------------------
+# Campos do JSON usados pela análise (o restante do PR não é mantido em memória)
+CAMPOS_RESPONSIVIDADE = ['pr_number', 'commits[].date',
+                         'review_comments[].created_at', 'review_comments[].user',
+                         'issue_comments[].created_at', 'issue_comments[].user']
+
+def analisar_responsividade(base_path, mapa_devs, workers=None):
+    """
+    Latência entre cada comentário de revisão e a próxima reação do autor (commit ou
+    comentário), lendo os PRs dos autores da amostra em fluxo (ver responsividade).
+    Retorna as tabelas por comentário e por PR.
+    """
+    prs = iterar_pull_requests(base_path, CAMPOS_RESPONSIVIDADE, mapa_devs, workers, apenas_amostra=True)
+    por_comentario = calcular_responsividade(*tabelas_de_responsividade(prs))
+    return por_comentario, responsividade_por_pr(por_comentario)
+
+def especificacoes_responsividade(por_comentario):
+    """
+    Box plot da latência (horas até a próxima reação do autor) dos comentários respondidos, por faixa.
+    """
+    respondidos = por_comentario[por_comentario["latencia_horas"] > 0]
+    return [
+        {"tipo": "boxplot", "tabela": agregar_boxplot(respondidos, "latencia_horas"),
+         "opcoes": {"cores": paleta_por_faixa("husl")}, "caminho": "grafico_responsividade.png", "yscale": "log",
+         "titulo": "Tempo até a Reação do Autor a um Comentário de Revisão",
+         "xlabel": "Faixa", "ylabel": "Horas (Escala Log)"},
+    ]
+
+# --------------------------
+# Tamanho dos textos
+# --------------------------
+CAMPOS_TEXTO = ['pr_number', 'title', 'body',
+                'reviews[].body', 'reviews[].user',
+                'review_comments[].body', 'review_comments[].user',
+                'issue_comments[].body', 'issue_comments[].user']
+
+def analisar_textos(base_path, mapa_devs, workers=None, excluir_repetidos=False):
+    """
+    Tabela por PR com o tamanho (caracteres e palavras) do título, da descrição e dos
+    comentários, calculada sobre colunas Arrow (ver metricas_texto).
+    """
+    prs = iterar_pull_requests(base_path, CAMPOS_TEXTO, mapa_devs, workers, apenas_amostra=True)
+    return tabela_por_pr(*extrair_textos(prs), excluir_repetidos=excluir_repetidos)
+
+def especificacoes_textos(tabela):
+    """
+    Box plots do comprimento dos títulos e das descrições dos PRs por faixa.
+    """
+    opcoes = {"cores": paleta_por_faixa("husl")}
+    return [
+        {"tipo": "boxplot", "tabela": agregar_boxplot(tabela, "title_caracteres"), "opcoes": opcoes,
+         "caminho": "grafico_tamanho_titulo.png", "titulo": "Tamanho do Título do PR por Faixa",
+         "xlabel": "Faixa", "ylabel": "Caracteres"},
+        {"tipo": "boxplot", "tabela": agregar_boxplot(tabela, "body_palavras"), "opcoes": opcoes,
+         "caminho": "grafico_tamanho_descricao.png", "titulo": "Tamanho da Descrição do PR por Faixa",
+         "xlabel": "Faixa", "ylabel": "Palavras"},
+    ]
+
+# --------------------------
+# Execução
+# --------------------------
+if __name__ == "__main__":
+    mapa_devs = carregar_faixas_desenvolvedores(base_path)
+    por_comentario, por_pr = analisar_responsividade(base_path, mapa_devs)
+
+    print(f"\nComentários de revisão analisados: {len(por_comentario)} em {len(por_pr)} PRs")
+    print("\n--- Responsividade do Autor por Faixa (horas até o próximo commit ou resposta) ---")
+    print(responsividade_por_faixa(por_comentario).to_string())
+
+    # Textos: os comentários repetidos (bots, modelos) ficam fora das médias
+    tabela = analisar_textos(base_path, mapa_devs, excluir_repetidos=True)
+    salvar_tabela(tabela, CAMINHO_TABELA)
+    colunas = ["title_palavras", "body_palavras", "review_comments_palavras", "autor_palavras", "body_repetido"]
+    print("\n--- Tamanho Médio dos Textos por Faixa (palavras) ---")
+    print(tabela.groupby("faixa")[colunas].mean().reindex(["E", "D", "C", "B", "A"]).to_string())
+
+    renderizar_graficos(especificacoes_responsividade(por_comentario) + especificacoes_textos(tabela))
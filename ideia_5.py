@@ -12,4 +12,108 @@
 # Mostre as visualizações (gráficos).
 # Discuta os resultados. Lembre-se de usar testes de significância estatística (como teste t ou ANOVA) para confirmar se as diferenças que você observa entre as faixas são estatisticamente significativas.
 # Discussão: Junte todos os resultados. Crie um "perfil" do desenvolvedor de cada faixa. Por exemplo: "Os resultados sugerem que um desenvolvedor da Faixa E tende a submeter PRs grandes que levam 50% mais tempo para serem mesclados e recebem o dobro de comentários de revisão por linha de código em comparação com um desenvolvedor da Faixa A."
-# Ameaças à Validade: Discuta as limitações do seu estudo. Por exemplo, o número de PRs é um bom proxy para "experiência"? A análise se limita a projetos de código aberto?
\ No newline at end of file
+# Ameaças à Validade: Discuta as limitações do seu estudo. Por exemplo, o número de PRs é um bom proxy para "experiência"? A análise se limita a projetos de código aberto?
+
+import pandas as pd
+
+from carregador_prs import carregar_faixas_desenvolvedores, iterar_pull_requests
+from conformidade_commits import tabela_de_commits, analisar_conformidade_commits
+from classificacao_arquivos import tabela_de_arquivos, analisar_escopo_mudancas
+from graficos import paleta_por_faixa, agregar_boxplot, renderizar_graficos
+
+# Caminho base
+base_path = "repositories-mined"
+ordem_faixas = ["E", "D", "C", "B", "A"]
+
+# Diretórios "core" de cada repositório (o mesmo mapeamento do notebook ideia_5.ipynb)
+CORE_DIRS_POR_REPO = {
+    'apache-superset': ('superset/',),
+    'denoland-deno': ('cli/', 'runtime/'),
+    'facebook-react': ('packages/react/', 'packages/react-dom/'),
+    'langchain-ai-langchain': ('libs/core/', 'libs/langchain/'),
+    'microsoft-TypeScript': ('src/compiler/', 'src/services/'),
+    'mrdoob-three.js': ('src/',),
+    'netdata-netdata': ('src/',),
+    'nodejs-node': ('src/', 'lib/'),
+    'opencv-opencv': ('modules/core/',),
+    'scikit-learn-scikit-learn': ('sklearn/',),
+    'storybookjs-storybook': ('code/lib/', 'code/core/'),
+    'supabase-supabase': ('apps/studio/',),
+    'zed-industries-zed': ('crates/',),
+}
+
+# Campos do JSON usados pelas análises (o restante do PR não é mantido em memória)
+CAMPOS_CONFORMIDADE = ['pr_number', 'counts', 'commits[].message', 'files[].filename']
+
+# --------------------------
+# Análises
+# --------------------------
+def analisar_conformidade(base_path, mapa_devs, workers=None, core_dirs=CORE_DIRS_POR_REPO):
+    """
+    Lê uma vez os PRs dos autores da amostra, projetados em CAMPOS_CONFORMIDADE, e calcula por PR
+    a conformidade das mensagens de commit, a proporção de arquivos "core" e o número de
+    comentários de revisão. Retorna um dicionário com as três tabelas.
+    """
+    prs = list(iterar_pull_requests(base_path, CAMPOS_CONFORMIDADE, mapa_devs, workers, apenas_amostra=True))
+    _, conformidade = analisar_conformidade_commits(tabela_de_commits(prs), workers=workers)
+    revisao = pd.DataFrame({
+        'faixa': [pr.get('faixa') for pr in prs],
+        'num_review_comments': [(pr.get('counts') or {}).get('review_comments', 0) for pr in prs],
+    })
+    return {
+        'conformidade': conformidade,
+        'escopo': analisar_escopo_mudancas(tabela_de_arquivos(prs), core_dirs),
+        'revisao': revisao,
+    }
+
+def agregar_conformidade(tabelas):
+    """
+    Calcula uma única vez as tabelas por faixa usadas no resumo e nos gráficos.
+    """
+    return {
+        'conformidade': tabelas['conformidade'].groupby('faixa')['taxa_conformidade'].mean()
+                                               .reindex(ordem_faixas).to_frame('valor'),
+        'proporcao_core': agregar_boxplot(tabelas['escopo'], 'proporcao_core', ordem_faixas),
+        'comentarios_revisao': tabelas['revisao'].groupby('faixa')['num_review_comments'].mean()
+                                                 .reindex(ordem_faixas).to_frame('valor'),
+    }
+
+# --------------------------
+# Gráficos
+# --------------------------
+def especificacoes_conformidade(agregados):
+    """
+    Descreve os gráficos da ideia 5 a partir das tabelas de agregar_conformidade.
+    """
+    cores = paleta_por_faixa("husl")
+    return [
+        {"tipo": "barras", "tabela": agregados["conformidade"], "opcoes": {"cores": cores},
+         "caminho": "grafico_conformidade_commits.png", "ylim": (0, 1), "opcoes_titulo": {"fontsize": 16},
+         "titulo": "Conformidade com Padrões de Commit por Faixa de Experiência",
+         "xlabel": "Faixa de Experiência", "ylabel": "Taxa de Conformidade Média"},
+        {"tipo": "boxplot", "tabela": agregados["proporcao_core"], "opcoes": {"cores": cores},
+         "caminho": "grafico_proporcao_core.png", "tamanho": (12, 8), "ylim": (0, 1),
+         "opcoes_titulo": {"fontsize": 16}, "titulo": 'Proporção de Arquivos "Core" Modificados por Faixa',
+         "xlabel": "Faixa de Experiência", "ylabel": 'Proporção de Arquivos "Core" no PR'},
+        {"tipo": "barras", "tabela": agregados["comentarios_revisao"],
+         "opcoes": {"cores": cores, "rotulos_valor": ".2f"}, "tamanho": (12, 7), "layout": (0, 0, 1, 1),
+         "caminho": "grafico_comentarios_revisao.png", "opcoes_titulo": {"fontsize": 16, "pad": 20},
+         "titulo": "Número Médio de Comentários de Revisão por PR, por Faixa de Experiência",
+         "xlabel": "Faixa de Experiência (E=Novato, A=Experiente)", "ylabel": "Média de Comentários de Revisão por PR"},
+    ]
+
+# --------------------------
+# Execução
+# --------------------------
+if __name__ == "__main__":
+    mapa_devs = carregar_faixas_desenvolvedores(base_path)
+    agregados = agregar_conformidade(analisar_conformidade(base_path, mapa_devs))
+
+    print("\n--- Taxa Média de Conformidade de Commits por Faixa ---")
+    print(agregados["conformidade"]["valor"])
+
+    print("\n--- Média de Comentários de Revisão por Faixa ---")
+    print(agregados["comentarios_revisao"]["valor"])
+
+    renderizar_graficos(especificacoes_conformidade(agregados))
+    print("Finalizado")
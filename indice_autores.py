@@ -0,0 +1,225 @@
+# Índice persistente de autores: (repo, autor) -> faixa, número de PRs e datas do primeiro
+# e do último PR. Substitui as três formas de atribuir faixa usadas até aqui (mapa do
+# sample-devs.jsonl, dicionários por repositório e contagem de PRs sobre o DataFrame completo).
+#   - faixa: a faixa do sample-devs.jsonl (ou 'Desconhecida' para autores fora da amostra);
+#   - faixa_contagem: a faixa pela quantidade de PRs do autor no corpus (regra da ideia 3).
+# O índice é montado uma vez (e atualizado de forma incremental, ver ingestao_incremental) e
+# gravado em Arrow IPC sem compressão, com colunas categóricas e int32, para ser aberto por
+# memory-map. As consultas são junções vetorizadas por hash sobre as chaves normalizadas.
+# O arquivo guarda nos metadados um resumo da lista de PRs e do mapa de faixas de que foi
+# montado: enquanto nenhum dos dois muda, obter_indice só o abre, sem varrer os JSONs.
+
+import os
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from carregador_prs import BASE_DIR, FAIXA_DESCONHECIDA, carregar_faixas_desenvolvedores, listar_arquivos_de_prs
+from ingestao_incremental import atualizar_incremental, carregar_manifesto, resumir_faixas, COLUNA_ARQUIVO
+from metricas_vetorizadas import converter_datas
+from instrumentacao import instrumentado
+
+CAMINHO_INDICE = 'indice_autores.arrow'
+CAMINHO_DATAS = 'indice_autores.datas.feather'
+CHAVE_METADADOS = b'indice_autores'
+FAIXAS = ['A', 'B', 'C', 'D', 'E', FAIXA_DESCONHECIDA]
+
+# Regra da ideia 3: 1 PR -> E, 2-10 -> D, 11-30 -> C, 31-50 -> B, mais de 50 -> A
+LIMITES_CONTAGEM = [0, 1, 10, 30, 50, np.inf]
+FAIXAS_CONTAGEM = ['E', 'D', 'C', 'B', 'A']
+
+
+def atribuir_faixa(contagem):
+    """
+    Faixa de um autor pela quantidade de PRs (versão escalar de faixa_pela_contagem).
+    """
+    return faixa_pela_contagem(pd.Series([contagem])).iloc[0]
+
+
+def faixa_pela_contagem(contagens):
+    """
+    Aplica a regra de faixa por contagem de PRs a uma Series inteira de contagens.
+    Contagens nulas, zero ou negativas ficam como 'Desconhecida'.
+    """
+    faixas = pd.cut(contagens, LIMITES_CONTAGEM, labels=FAIXAS_CONTAGEM, right=True)
+    return faixas.cat.add_categories([FAIXA_DESCONHECIDA]).fillna(FAIXA_DESCONHECIDA).astype(str)
+
+
+def normalizar_chaves(repos, autores):
+    """
+    Versão vetorizada de carregador_prs.chave_dev para duas colunas.
+    """
+    repos = pd.Series(repos, dtype=object).astype(str).str.lower().str.replace('/', '-', regex=False)
+    autores = pd.Series(autores, dtype=object).astype(str).str.lower()
+    return repos.to_numpy(dtype=object), autores.to_numpy(dtype=object)
+
+
+def _extrair_data_de_criacao(pr):
+    return {'created_at': pr.get('created_at')}
+
+
+@instrumentado('indice_autores')
+def atualizar_indice(base_path=BASE_DIR, caminho_indice=CAMINHO_INDICE, caminho_datas=CAMINHO_DATAS, workers=None):
+    """
+    Monta (ou atualiza) o índice de autores. As datas de criação dos PRs ficam num dataset
+    incremental ('caminho_datas'): só os JSONs novos ou modificados são relidos.
+    Retorna o índice como DataFrame.
+    """
+    mapa_devs = carregar_faixas_desenvolvedores(base_path)
+    datas = atualizar_incremental(caminho_datas, _extrair_data_de_criacao, base_path, workers=workers,
+                                  campos=['created_at'])
+    manifesto = carregar_manifesto(caminho_datas)
+
+    origem = pd.DataFrame.from_records(
+        [(caminho, entrada['repo'], entrada['author']) for caminho, entrada in manifesto.items() if not entrada['erro']],
+        columns=[COLUNA_ARQUIVO, 'repo', 'author'])
+    if datas.empty:
+        datas = pd.DataFrame(columns=[COLUNA_ARQUIVO, 'created_at'])
+    prs = origem.merge(datas, on=COLUNA_ARQUIVO, how='left')
+
+    indice = montar_indice(prs, mapa_devs)
+    salvar_indice(indice, caminho_indice, resumir_origem(manifesto, mapa_devs))
+    print(f"-> Índice de autores atualizado: {len(indice)} autores em '{caminho_indice}'.")
+    return indice
+
+
+def montar_indice(prs, mapa_devs):
+    """
+    Monta o índice a partir de uma tabela com uma linha por PR (repo, author, created_at)
+    e do mapa (repo, autor) -> faixa da amostra.
+    """
+    prs = prs[['repo', 'author', 'created_at']].copy()
+    prs['repo'], prs['author'] = normalizar_chaves(prs['repo'], prs['author'])
+    prs['created_at'] = converter_datas(prs['created_at'])
+
+    por_autor = prs.groupby(['repo', 'author']).agg(
+        n_prs=('created_at', 'size'), primeiro_pr=('created_at', 'min'), ultimo_pr=('created_at', 'max'))
+    total_por_autor = por_autor.groupby(level='author')['n_prs'].transform('sum')
+    por_autor['faixa_contagem'] = faixa_pela_contagem(total_por_autor)
+
+    # Autores da amostra sem nenhum PR também entram no índice
+    amostra = pd.Series(mapa_devs, name='faixa', dtype=object)
+    if not amostra.empty:
+        amostra.index = amostra.index.set_names(['repo', 'author'])
+    indice = por_autor.join(amostra, how='outer').reset_index()
+    indice['faixa'] = indice['faixa'].fillna(FAIXA_DESCONHECIDA)
+    indice['faixa_contagem'] = indice['faixa_contagem'].fillna(FAIXA_DESCONHECIDA)
+    indice['n_prs'] = indice['n_prs'].fillna(0)
+    return _compactar(indice)
+
+
+def _compactar(indice):
+    """
+    Tipos compactos: chaves e faixas categóricas, contagem int32 e datas em segundos.
+    """
+    return pd.DataFrame({
+        'repo': pd.Categorical(indice['repo']),
+        'author': pd.Categorical(indice['author']),
+        'faixa': pd.Categorical(indice['faixa'], categories=FAIXAS),
+        'faixa_contagem': pd.Categorical(indice['faixa_contagem'], categories=FAIXAS),
+        'n_prs': indice['n_prs'].astype('int32'),
+        'primeiro_pr': pd.to_datetime(indice['primeiro_pr'], utc=True).astype('datetime64[s, UTC]'),
+        'ultimo_pr': pd.to_datetime(indice['ultimo_pr'], utc=True).astype('datetime64[s, UTC]'),
+    })
+
+
+def resumir_origem(arquivos, mapa_devs):
+    """
+    Resumo (hashes) daquilo de que o índice depende: os caminhos dos PRs e o mapa de faixas.
+    """
+    caminhos = '\n'.join(sorted(arquivos))
+    return {'arquivos': hashlib.sha1(caminhos.encode('utf-8')).hexdigest(), 'faixas': resumir_faixas(mapa_devs)}
+
+
+def salvar_indice(indice, caminho_indice=CAMINHO_INDICE, origem=None):
+    """
+    Grava o índice em Arrow IPC sem compressão (requisito para a leitura por memory-map),
+    com o resumo da origem (ver resumir_origem) nos metadados.
+    """
+    tabela = pa.Table.from_pandas(indice, preserve_index=False)
+    if origem is not None:
+        metadados = dict(tabela.schema.metadata or {})
+        metadados[CHAVE_METADADOS] = json.dumps(origem).encode('utf-8')
+        tabela = tabela.replace_schema_metadata(metadados)
+    temporario = caminho_indice + '.tmp'
+    with pa.OSFile(temporario, 'wb') as destino:
+        with pa.ipc.new_file(destino, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+    os.replace(temporario, caminho_indice)
+
+
+def _tipo_sem_copia(tipo):
+    # Colunas categóricas viram pd.Categorical (só os códigos são convertidos); as demais
+    # continuam como arrays Arrow apontando para o arquivo mapeado
+    return None if pa.types.is_dictionary(tipo) else pd.ArrowDtype(tipo)
+
+
+def carregar_indice(caminho_indice=CAMINHO_INDICE):
+    """
+    Abre o índice por memory-map: o arquivo não é lido inteiro para a memória, as páginas
+    são carregadas sob demanda pelo sistema operacional. Contagens e datas ficam como colunas
+    Arrow sobre o mapeamento (sem cópia); chaves e faixas, como categóricas.
+    """
+    fonte = pa.memory_map(caminho_indice, 'r')
+    return pa.ipc.open_file(fonte).read_all().to_pandas(types_mapper=_tipo_sem_copia)
+
+
+def origem_do_indice(caminho_indice=CAMINHO_INDICE):
+    """
+    Resumo da origem gravado no índice (None se o arquivo não existir ou não o tiver).
+    """
+    if not os.path.isfile(caminho_indice):
+        return None
+    metadados = pa.ipc.open_file(pa.memory_map(caminho_indice, 'r')).schema.metadata or {}
+    return json.loads(metadados[CHAVE_METADADOS]) if CHAVE_METADADOS in metadados else None
+
+
+def obter_indice(base_path=BASE_DIR, caminho_indice=CAMINHO_INDICE, caminho_datas=CAMINHO_DATAS, workers=None):
+    """
+    Abre o índice gravado se ele ainda corresponde ao corpus (mesma lista de PRs e mesmo mapa
+    de faixas); caso contrário, atualiza-o. Só a lista de arquivos e os sample-devs.jsonl são
+    lidos para a verificação. Um JSON editado no lugar (mesmo caminho) não é detectado: nesse
+    caso, chame atualizar_indice.
+    """
+    arquivos = [caminho for _, _, caminho in listar_arquivos_de_prs(base_path)]
+    if origem_do_indice(caminho_indice) == resumir_origem(arquivos, carregar_faixas_desenvolvedores(base_path)):
+        print(f"-> Índice de autores atual: aberto por memory-map de '{caminho_indice}'.")
+        return carregar_indice(caminho_indice)
+    return atualizar_indice(base_path, caminho_indice, caminho_datas, workers)
+
+
+def consultar(indice, autores, repos=None, coluna='faixa'):
+    """
+    Busca vetorizada no índice: devolve um array com o valor de 'coluna' para cada par
+    (repo, autor) consultado, ou para cada autor se 'repos' for None (útil para colunas que
+    só dependem do autor, como faixa_contagem). Pares ausentes recebem 'Desconhecida' nas
+    colunas de faixa e nulo nas demais.
+    """
+    valores = indice[coluna]
+    if repos is None:
+        _, chaves_autor = normalizar_chaves([''] * len(autores), autores)
+        chaves_indice = pd.Index(indice['author'].astype(str))
+        primeiras = ~chaves_indice.duplicated()
+        chaves_indice, valores = chaves_indice[primeiras], valores[primeiras]
+        posicoes = chaves_indice.get_indexer(chaves_autor)
+    else:
+        chaves_repo, chaves_autor = normalizar_chaves(repos, autores)
+        chaves_indice = pd.MultiIndex.from_arrays([indice['repo'].astype(str), indice['author'].astype(str)])
+        posicoes = chaves_indice.get_indexer(pd.MultiIndex.from_arrays([chaves_repo, chaves_autor]))
+
+    encontrados = posicoes >= 0
+    resultado = np.full(len(posicoes), FAIXA_DESCONHECIDA if coluna.startswith('faixa') else None, dtype=object)
+    resultado[encontrados] = np.asarray(valores, dtype=object)[posicoes[encontrados]]
+    return resultado
+
+
+def mapa_de_faixas(indice, apenas_amostra=True):
+    """
+    Dicionário (repo, autor) -> faixa no formato esperado por carregador_prs (mapa_devs).
+    """
+    if apenas_amostra:
+        indice = indice[indice['faixa'] != FAIXA_DESCONHECIDA]
+    return dict(zip(zip(indice['repo'].astype(str), indice['author'].astype(str)), indice['faixa'].astype(str)))
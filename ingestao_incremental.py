@@ -0,0 +1,213 @@
+# Ingestão incremental do corpus de Pull Requests.
+# Um manifesto (caminho, tamanho, mtime, hash do conteúdo) é gravado ao lado do dataset
+# processado. Na atualização, a árvore 'repositories-mined' é comparada com o manifesto:
+# somente arquivos novos ou modificados são lidos, os removidos saem do dataset e as
+# linhas novas são anexadas. O custo de uma atualização é proporcional ao delta.
+# Um arquivo com tamanho/mtime diferentes mas o mesmo hash (tocado sem mudança) não é
+# reprocessado. O manifesto guarda também um resumo do mapa de faixas (sample-devs.jsonl):
+# se ele mudar, a faixa das linhas já processadas é refeita a partir do repo/autor de cada arquivo.
+
+import os
+import json
+import time
+import hashlib
+from functools import partial
+
+import pandas as pd
+
+from carregador_prs import (BASE_DIR, TAMANHO_LOTE_PADRAO, FAIXA_DESCONHECIDA, chave_dev, compilar_projecao,
+                            projetar, listar_arquivos_de_prs, dividir_em_lotes, executar_em_lotes)
+from instrumentacao import instrumentado, contar, registrar_arquivos, registrar_erros
+
+COLUNA_ARQUIVO = 'arquivo'
+
+
+def caminho_do_manifesto(caminho_saida):
+    """
+    O manifesto fica ao lado do dataset: 'dados.feather' -> 'dados.manifesto.json'.
+    """
+    raiz, _ = os.path.splitext(caminho_saida)
+    return raiz + '.manifesto.json'
+
+
+def _ler_manifesto(caminho_saida):
+    """
+    Retorna (arquivos, resumo_faixas). Manifestos antigos (só o dicionário de arquivos) não
+    têm o resumo das faixas.
+    """
+    caminho = caminho_do_manifesto(caminho_saida)
+    if not os.path.isfile(caminho):
+        return {}, None
+    with open(caminho, 'r', encoding='utf-8') as f:
+        conteudo = json.load(f)
+    if 'arquivos' in conteudo and 'faixas' in conteudo:
+        return conteudo['arquivos'], conteudo['faixas']
+    return conteudo, None
+
+
+def carregar_manifesto(caminho_saida):
+    """
+    Dicionário caminho -> {tamanho, mtime, hash, repo, author, erro} do dataset.
+    """
+    return _ler_manifesto(caminho_saida)[0]
+
+
+def salvar_manifesto(manifesto, caminho_saida, resumo_faixas=None):
+    caminho = caminho_do_manifesto(caminho_saida)
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump({'faixas': resumo_faixas, 'arquivos': manifesto}, f)
+    os.replace(temporario, caminho)
+
+
+def resumir_faixas(mapa_devs):
+    """
+    Hash do mapa (repo, autor) -> faixa: muda sempre que um sample-devs.jsonl muda de conteúdo.
+    """
+    if mapa_devs is None:
+        return None
+    itens = sorted([list(chave), faixa] for chave, faixa in mapa_devs.items())
+    return hashlib.sha1(json.dumps(itens).encode('utf-8')).hexdigest()
+
+
+def refazer_faixas(df, manifesto, mapa_devs):
+    """
+    Reatribui a coluna 'faixa' das linhas já processadas pelo repo/autor do arquivo de origem.
+    """
+    origem = {caminho: mapa_devs.get(chave_dev(entrada['repo'], entrada['author']), FAIXA_DESCONHECIDA)
+              for caminho, entrada in manifesto.items()}
+    return df.assign(faixa=df[COLUNA_ARQUIVO].map(origem).fillna(FAIXA_DESCONHECIDA))
+
+
+def comparar_com_manifesto(arquivos, manifesto):
+    """
+    Compara a lista atual de arquivos (repo, autor, caminho) com o manifesto.
+    Retorna (candidatos, removidos, estados): arquivos novos ou com tamanho/mtime diferentes,
+    como (repo, autor, caminho, hash anterior), caminhos que não existem mais e o os.stat de
+    cada arquivo atual. O hash anterior só é informado quando o tamanho não mudou (só então o
+    conteúdo pode ser o mesmo); caso contrário é None.
+    """
+    candidatos, estados = [], {}
+    for repo_name, dev_name, caminho in arquivos:
+        estado = os.stat(caminho)
+        estados[caminho] = estado
+        anterior = manifesto.get(caminho)
+        if anterior is None or anterior['tamanho'] != estado.st_size:
+            candidatos.append((repo_name, dev_name, caminho, None))
+        elif anterior['mtime'] != estado.st_mtime_ns:
+            candidatos.append((repo_name, dev_name, caminho, anterior['hash']))
+    atuais = set(estados)
+    removidos = [caminho for caminho in manifesto if caminho not in atuais]
+    return candidatos, removidos, estados
+
+
+def _processar_lote(lote, extrair_registro, mapa_devs, projecao=None):
+    """
+    Executado nos processos do pool: lê, calcula o hash e extrai a linha de cada PR do lote.
+    Retorna uma lista de (caminho, hash, registro ou None, erro ou None, segundos de leitura,
+    inalterado). Arquivos com o mesmo hash do manifesto não são interpretados (inalterado=True).
+    """
+    saida = []
+    for repo_name, dev_name, caminho, hash_anterior in lote:
+        inicio = time.perf_counter()
+        try:
+            with open(caminho, 'rb') as f:
+                conteudo = f.read()
+            resumo = hashlib.sha1(conteudo).hexdigest()
+        except OSError as e:
+            saida.append((caminho, None, None, str(e), time.perf_counter() - inicio, False))
+            continue
+        if resumo == hash_anterior:
+            saida.append((caminho, resumo, None, None, time.perf_counter() - inicio, True))
+            continue
+        try:
+            pr = json.loads(conteudo)
+            if projecao is not None:
+                pr = projetar(pr, projecao)
+            pr['repo'] = repo_name
+            pr['author'] = dev_name
+            if mapa_devs is not None:
+                pr['faixa'] = mapa_devs.get(chave_dev(repo_name, dev_name), FAIXA_DESCONHECIDA)
+            saida.append((caminho, resumo, extrair_registro(pr), None, time.perf_counter() - inicio, False))
+        except (ValueError, KeyError, TypeError) as e:
+            saida.append((caminho, resumo, None, str(e), time.perf_counter() - inicio, False))
+    return saida
+
+
+@instrumentado('ingestao')
+def atualizar_incremental(caminho_saida, extrair_registro, base_path=BASE_DIR, mapa_devs=None,
+                          workers=None, tamanho_lote=TAMANHO_LOTE_PADRAO, pos_processar=None, campos=None):
+    """
+    Atualiza o dataset Feather em 'caminho_saida' relendo apenas os arquivos novos ou modificados.
+
+    extrair_registro(pr) recebe o PR enriquecido (repo, author e, com mapa_devs, faixa) e devolve
+    um dicionário (uma linha do dataset) ou None para PRs que não geram linha. A função precisa
+    ser definida no nível do módulo para poder ser enviada aos processos do pool. Com 'campos',
+    o PR é projetado apenas nos campos declarados pela análise antes da extração.
+
+    Cada linha recebe a coluna 'arquivo' com o caminho de origem, usada para substituir ou remover
+    linhas nas próximas atualizações. pos_processar(df, manifesto), se informado, é aplicado ao
+    dataset completo antes da gravação (ex.: recalcular faixas que dependem do corpus inteiro).
+    Com mapa_devs, a coluna 'faixa' das linhas é refeita quando o mapa muda (ver refazer_faixas).
+    Retorna o DataFrame completo atualizado.
+    """
+    manifesto, resumo_anterior = _ler_manifesto(caminho_saida)
+    if manifesto and os.path.isfile(caminho_saida):
+        df_existente = pd.read_feather(caminho_saida)
+    else:
+        # Sem manifesto (ou sem dataset) não há como saber a origem das linhas: reconstrói tudo
+        manifesto, df_existente = {}, pd.DataFrame()
+    if COLUNA_ARQUIVO not in df_existente.columns:
+        manifesto, df_existente = {}, pd.DataFrame()
+
+    arquivos = listar_arquivos_de_prs(base_path)
+    candidatos, removidos, estados = comparar_com_manifesto(arquivos, manifesto)
+    print(f"Manifesto: {len(arquivos)} arquivos, {len(candidatos)} novos ou modificados, {len(removidos)} removidos.")
+
+    origem = {caminho: (repo_name, dev_name) for repo_name, dev_name, caminho, _ in candidatos}
+    novos_registros, inalterados, erros = [], set(), 0
+    projecao = compilar_projecao(campos) if campos is not None else None
+    funcao = partial(_processar_lote, extrair_registro=extrair_registro, mapa_devs=mapa_devs, projecao=projecao)
+    for resultados in executar_em_lotes(funcao, dividir_em_lotes(candidatos, tamanho_lote), workers, True):
+        registrar_arquivos((segundos, caminho) for caminho, _, _, _, segundos, _ in resultados)
+        contar('arquivos_lidos', len(resultados))
+        for caminho, resumo, registro, erro, _, inalterado in resultados:
+            estado = estados[caminho]
+            if inalterado:
+                # Mesmo conteúdo: a linha atual continua valendo, só o mtime é atualizado
+                inalterados.add(caminho)
+                manifesto[caminho] = dict(manifesto[caminho], mtime=estado.st_mtime_ns)
+                continue
+            if erro is not None:
+                registrar_erros([(caminho, erro)])
+                erros += 1
+            if registro is not None:
+                registro[COLUNA_ARQUIVO] = caminho
+                novos_registros.append(registro)
+            elif erro is None:
+                contar('prs_sem_registro')
+            repo_name, dev_name = origem[caminho]
+            manifesto[caminho] = {'tamanho': estado.st_size, 'mtime': estado.st_mtime_ns, 'hash': resumo,
+                                  'repo': repo_name, 'author': dev_name, 'erro': erro is not None}
+
+    for caminho in removidos:
+        del manifesto[caminho]
+
+    descartar = set(removidos) | ({caminho for _, _, caminho, _ in candidatos} - inalterados)
+    if not df_existente.empty and descartar:
+        df_existente = df_existente[~df_existente[COLUNA_ARQUIVO].isin(descartar)]
+    resumo_faixas = resumir_faixas(mapa_devs)
+    if mapa_devs is not None and resumo_faixas != resumo_anterior and 'faixa' in df_existente.columns:
+        print("Mapa de faixas (sample-devs.jsonl) alterado: refazendo a faixa das linhas existentes.")
+        df_existente = refazer_faixas(df_existente, manifesto, mapa_devs)
+    df_novos = pd.DataFrame(novos_registros)
+    partes = [df for df in (df_existente, df_novos) if not df.empty]
+    df = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+    if pos_processar is not None:
+        df = pos_processar(df, manifesto)
+
+    df.reset_index(drop=True).to_feather(caminho_saida)
+    salvar_manifesto(manifesto, caminho_saida, resumo_faixas)
+    print(f"-> '{caminho_saida}' atualizado: {len(df_novos)} linhas novas, {len(df)} no total "
+          f"({len(inalterados)} arquivos tocados sem mudança de conteúdo, {erros} com erro).")
+    return df
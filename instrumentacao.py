@@ -0,0 +1,303 @@
+# Instrumentação das etapas do pipeline (varredura, leitura, ingestão, análises, gráficos).
+# Cada etapa registra o tempo de parede, o tempo de CPU (do processo e dos processos do pool),
+# o pico de memória (RSS) e a quantidade de itens processados. Os carregadores também
+# registram o tempo de leitura de cada arquivo (os mais lentos ficam no rastro) e contam os
+# arquivos mal formados e os PRs descartados, em vez de imprimir cada um deles.
+#
+# O rastro é gravado em JSON ao final da execução quando a variável de ambiente
+# ANALISE_RASTRO indica o arquivo, ex.:
+#   ANALISE_RASTRO=rastro.json python ideia_3.py
+# e a tabela das etapas e dos contadores (imprimir_resumo) é impressa no console.
+# Com ANALISE_PERFIL=<nome da etapa> (ex.: 'qualidade_em_fluxo'), essa etapa também é
+# perfilada com o cProfile (ou com o pyinstrument, se ANALISE_PERFILADOR=pyinstrument).
+# O mesmo pode ser configurado pelo código com configurar(...).
+
+import os
+import sys
+import json
+import time
+import atexit
+import heapq
+import resource
+import multiprocessing
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+
+ARQUIVOS_LENTOS = 20
+LIMITE_AVISOS = 5
+LIMITE_ERROS_NO_RASTRO = 200
+
+_estado = {
+    'inicio': time.perf_counter(),
+    'data': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+    'etapas': [],
+    'pilha': [],
+    'contadores': Counter(),
+    'acumulados': Counter(),
+    'lentos': [],
+    'avisos': 0,
+    'erros': {},
+    'pico': 0.0,
+    'pid': os.getpid(),
+    'caminho_rastro': None,
+    'etapa_perfil': None,
+    'perfilador': 'cprofile',
+}
+
+
+# --------------------------
+# Memória
+# --------------------------
+# No Linux o pico de RSS (VmHWM) pode ser zerado escrevendo '5' em /proc/self/clear_refs,
+# o que permite medir o pico de cada etapa. Sem isso, o valor é o pico do processo inteiro.
+
+def _pico_rss_mb():
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for linha in f:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss é dado em KiB no Linux e em bytes no macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _zerar_pico_rss():
+    # O pico do processo inteiro é preservado antes de zerar o contador do sistema
+    _estado['pico'] = max(_estado['pico'], _pico_rss_mb())
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _cpu():
+    proprio = resource.getrusage(resource.RUSAGE_SELF)
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return proprio.ru_utime + proprio.ru_stime, filhos.ru_utime + filhos.ru_stime
+
+
+# --------------------------
+# Etapas
+# --------------------------
+
+@contextmanager
+def etapa(nome, itens=None):
+    """
+    Mede um bloco como uma etapa do pipeline. Devolve o registro da etapa, onde o chamador
+    pode preencher 'itens' (ex.: registro['itens'] = len(df)). Etapas podem ser aninhadas;
+    o pico de memória de uma etapa inclui o das etapas internas.
+    """
+    pilha = _estado['pilha']
+    if pilha:
+        pilha[-1]['_pico'] = max(pilha[-1]['_pico'], _pico_rss_mb())
+    _zerar_pico_rss()
+    registro = {
+        'etapa': nome,
+        'caminho': '/'.join([anterior['etapa'] for anterior in pilha] + [nome]),
+        'inicio': round(time.perf_counter() - _estado['inicio'], 4),
+        'itens': itens,
+        '_pico': 0.0,
+    }
+    pilha.append(registro)
+    perfil = _iniciar_perfil() if nome == _estado['etapa_perfil'] else None
+    cpu_inicial, cpu_filhos_inicial = _cpu()
+    inicio = time.perf_counter()
+    try:
+        yield registro
+    finally:
+        segundos = time.perf_counter() - inicio
+        cpu_final, cpu_filhos_final = _cpu()
+        if perfil is not None:
+            registro['perfil'] = _encerrar_perfil(perfil, nome)
+        pilha.pop()
+        pico = max(registro.pop('_pico'), _pico_rss_mb())
+        if pilha:
+            pilha[-1]['_pico'] = max(pilha[-1]['_pico'], pico)
+        registro.update({
+            'segundos': round(segundos, 4),
+            'cpu_segundos': round(cpu_final - cpu_inicial, 4),
+            # CPU dos processos do pool já encerrados durante a etapa
+            'cpu_workers_segundos': round(cpu_filhos_final - cpu_filhos_inicial, 4),
+            'pico_rss_mb': round(pico, 1),
+        })
+        if registro['itens'] is not None and segundos > 0:
+            registro['itens_por_segundo'] = round(registro['itens'] / segundos, 2)
+        _estado['etapas'].append(registro)
+
+
+def instrumentado(nome):
+    """
+    Decorador que mede cada chamada da função como a etapa 'nome'. Se o resultado for uma
+    sequência de linhas (lista, DataFrame), o tamanho vira a quantidade de itens da etapa.
+    """
+    def decorador(funcao):
+        @wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            with etapa(nome) as registro:
+                resultado = funcao(*args, **kwargs)
+                if hasattr(resultado, '__len__') and not isinstance(resultado, (dict, tuple, str)):
+                    registro['itens'] = len(resultado)
+                return resultado
+        return envoltorio
+    return decorador
+
+
+# --------------------------
+# Contadores e arquivos lentos
+# --------------------------
+
+def contar(nome, quantidade=1):
+    """
+    Soma 'quantidade' ao contador 'nome' (ex.: 'arquivos_mal_formados', 'prs_descartados').
+    """
+    if quantidade:
+        _estado['contadores'][nome] += quantidade
+
+
+def acumular_tempo(nome, segundos):
+    """
+    Acumula um tempo medido em partes (ex.: a espera pelos lotes de leitura dentro de um gerador).
+    """
+    _estado['acumulados'][nome] += segundos
+
+
+def registrar_arquivos(tempos):
+    """
+    Recebe pares (segundos, caminho) de leitura de arquivos e mantém os ARQUIVOS_LENTOS mais lentos.
+    """
+    lentos = _estado['lentos']
+    for par in tempos:
+        if len(lentos) < ARQUIVOS_LENTOS:
+            heapq.heappush(lentos, par)
+        elif par[0] > lentos[0][0]:
+            heapq.heapreplace(lentos, par)
+
+
+def registrar_erros(erros, contador='arquivos_mal_formados'):
+    """
+    Conta os erros de leitura (pares (caminho, mensagem)); apenas os LIMITE_AVISOS primeiros
+    da execução são impressos. O rastro guarda a contagem e os arquivos distintos com erro.
+    """
+    for caminho, mensagem in erros:
+        if len(_estado['erros']) < LIMITE_ERROS_NO_RASTRO:
+            _estado['erros'].setdefault(caminho, mensagem)
+        _estado['avisos'] += 1
+        if _estado['avisos'] <= LIMITE_AVISOS:
+            print(f"Erro ao processar o arquivo {caminho}: {mensagem}")
+        elif _estado['avisos'] == LIMITE_AVISOS + 1:
+            print("(demais erros de leitura apenas contados; ver o rastro da execução)")
+    contar(contador, len(erros))
+
+
+# --------------------------
+# Perfilamento
+# --------------------------
+
+def _iniciar_perfil():
+    if _estado['perfilador'] == 'pyinstrument':
+        from pyinstrument import Profiler
+        perfil = Profiler()
+        perfil.start()
+        return perfil
+    import cProfile
+    perfil = cProfile.Profile()
+    perfil.enable()
+    return perfil
+
+
+def _encerrar_perfil(perfil, nome):
+    """
+    Encerra o perfilamento e grava o resultado ao lado do rastro; devolve o caminho gravado.
+    """
+    base = os.path.splitext(_estado['caminho_rastro'] or 'rastro')[0]
+    if _estado['perfilador'] == 'pyinstrument':
+        perfil.stop()
+        caminho = f'{base}.{nome}.html'
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write(perfil.output_html())
+    else:
+        perfil.disable()
+        caminho = f'{base}.{nome}.prof'
+        perfil.dump_stats(caminho)
+    print(f"-> Perfil da etapa '{nome}' salvo em '{caminho}'.")
+    return caminho
+
+
+# --------------------------
+# Rastro
+# --------------------------
+
+def configurar(caminho_rastro=None, etapa_perfil=None, perfilador='cprofile'):
+    """
+    Define o arquivo do rastro (gravado ao final da execução) e a etapa a perfilar.
+    """
+    if perfilador not in ('cprofile', 'pyinstrument'):
+        raise ValueError(f"Perfilador desconhecido: '{perfilador}'")
+    if caminho_rastro and not _estado['caminho_rastro'] and multiprocessing.parent_process() is None:
+        atexit.register(_salvar_ao_sair)
+    _estado.update(caminho_rastro=caminho_rastro, etapa_perfil=etapa_perfil, perfilador=perfilador)
+
+
+def rastro():
+    """
+    O rastro da execução até aqui, como dicionário serializável em JSON.
+    """
+    return {
+        'data': _estado['data'],
+        'comando': sys.argv,
+        'segundos': round(time.perf_counter() - _estado['inicio'], 4),
+        'pico_rss_mb': round(max(_estado['pico'], _pico_rss_mb()), 1),
+        'etapas': sorted(_estado['etapas'], key=lambda registro: registro['inicio']),
+        'contadores': dict(_estado['contadores']),
+        'tempos_acumulados': {nome: round(segundos, 4) for nome, segundos in _estado['acumulados'].items()},
+        'arquivos_mais_lentos': [
+            {'caminho': caminho, 'segundos': round(segundos, 6)}
+            for segundos, caminho in sorted(_estado['lentos'], reverse=True)
+        ],
+        'arquivos_com_erro': [
+            {'caminho': caminho, 'erro': mensagem} for caminho, mensagem in _estado['erros'].items()
+        ],
+    }
+
+
+def salvar_rastro(caminho):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(rastro(), f, indent=2, ensure_ascii=False)
+    print(f"-> Rastro da execução salvo em '{caminho}'.")
+
+
+def _salvar_ao_sair():
+    # Só o processo principal grava o rastro. Com fork, os processos do pool herdam o registro
+    # (e o PID do principal); com spawn (padrão no macOS e no Windows), reimportam este módulo
+    # com o próprio PID, mas ao sair já têm um processo pai
+    if (_estado['caminho_rastro'] and os.getpid() == _estado['pid']
+            and multiprocessing.parent_process() is None):
+        imprimir_resumo()
+        salvar_rastro(_estado['caminho_rastro'])
+
+
+def imprimir_resumo():
+    """
+    Tabela das etapas medidas e dos contadores, no console.
+    """
+    dados = rastro()
+    print("\n--- Etapas ---")
+    for registro in dados['etapas']:
+        recuo = '  ' * registro['caminho'].count('/')
+        itens = '' if registro['itens'] is None else f"  {registro['itens']} itens"
+        print(f"{recuo}{registro['etapa']}: {registro['segundos']:.2f} s, {registro['cpu_segundos']:.2f} s CPU "
+              f"(+{registro['cpu_workers_segundos']:.2f} s no pool), pico {registro['pico_rss_mb']:.1f} MB{itens}")
+    if dados['contadores']:
+        print("--- Contadores ---")
+        for nome, quantidade in dados['contadores'].items():
+            print(f"{nome}: {quantidade}")
+
+
+configurar(os.environ.get('ANALISE_RASTRO'), os.environ.get('ANALISE_PERFIL'),
+           os.environ.get('ANALISE_PERFILADOR', 'cprofile'))
@@ -0,0 +1,219 @@
+# Métricas de texto dos PRs (ideia 4): tamanho do título e da descrição do PR e dos comentários
+# (reviews, review_comments, issue_comments), em caracteres e palavras, por faixa.
+# Os textos são extraídos uma única vez para uma tabela Arrow (um texto por linha, com a
+# origem, o usuário e a posição do PR) e todas as medidas saem de kernels do pyarrow.compute
+# aplicados à coluna inteira: comprimento (utf8_length), palavras (count_substring_regex) e a
+# normalização usada para achar textos repetidos. Um texto que aparece, normalizado, em vários
+# PRs diferentes é marcado como repetido: respostas de bots, modelos de descrição e
+# comentários prontos, que podem distorcer as médias de tamanho.
+# O resultado final é uma tabela compacta com uma linha por PR (int32/float32), gravada em
+# Feather e pronta para graficos.agregar_boxplot.
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from carregador_prs import FAIXA_DESCONHECIDA
+from instrumentacao import instrumentado
+from responsividade import _login
+
+CHAVE_PR = ['repo', 'pr_number']
+ORIGENS_PR = ('title', 'body')
+ORIGENS_COMENTARIOS = ('reviews', 'review_comments', 'issue_comments')
+# Um texto (normalizado, não vazio) presente em pelo menos esta quantidade de PRs é repetido
+LIMITE_REPETICOES = 3
+CAMINHO_TABELA = 'metricas_texto.feather'
+
+
+def extrair_textos(prs):
+    """
+    Percorre os PRs (dicionários) uma única vez e devolve (df_prs, textos): a tabela de PRs
+    (repo, pr_number, author, faixa) e a tabela Arrow de textos (pr, origem, usuario, texto),
+    em que 'pr' é a posição do PR em df_prs.
+    """
+    linhas_prs = []
+    posicoes, origens, usuarios, corpos = [], [], [], []
+    for i, pr in enumerate(prs):
+        linhas_prs.append((pr.get('repo'), pr.get('pr_number'), pr.get('author'), pr.get('faixa')))
+        for origem in ORIGENS_PR:
+            posicoes.append(i)
+            origens.append(origem)
+            usuarios.append(pr.get('author'))
+            corpos.append(pr.get(origem))
+        for origem in ORIGENS_COMENTARIOS:
+            for comentario in pr.get(origem) or []:
+                posicoes.append(i)
+                origens.append(origem)
+                usuarios.append(_login(comentario.get('user')))
+                corpos.append(comentario.get('body'))
+
+    df_prs = pd.DataFrame.from_records(linhas_prs, columns=CHAVE_PR + ['author', 'faixa'])
+    textos = pa.table({
+        'pr': pa.array(posicoes, type=pa.int32()),
+        'origem': pa.array(origens, type=pa.string()).dictionary_encode(),
+        'usuario': pa.array([u if isinstance(u, str) else None for u in usuarios], type=pa.string()),
+        'texto': pa.array([t if isinstance(t, str) else None for t in corpos], type=pa.string()),
+    })
+    return df_prs, textos
+
+
+def extrair_textos_do_parquet(diretorio, repos=None):
+    """
+    Monta as mesmas tabelas diretamente do armazenamento Parquet (ver armazenamento_colunar),
+    sem passar os textos por objetos Python: as colunas são lidas e concatenadas como Arrow.
+    """
+    from armazenamento_colunar import abrir_tabela, ler_tabela
+    import pyarrow.dataset as ds
+
+    filtro = ds.field('repo').isin(list(repos)) if repos is not None else None
+    df_prs = ler_tabela('prs', diretorio, CHAVE_PR + ['author', 'faixa', 'title', 'body'], repos)
+    for coluna in ['author', 'faixa', 'title', 'body']:
+        if coluna not in df_prs:
+            df_prs[coluna] = None
+    posicao_pr = pd.MultiIndex.from_frame(df_prs[CHAVE_PR])
+
+    partes = [
+        pa.table({'pr': pa.array(np.arange(len(df_prs)), type=pa.int32()),
+                  'origem': pa.array([origem] * len(df_prs), type=pa.string()),
+                  'usuario': pa.array(df_prs['author'].to_numpy(dtype=object), type=pa.string(), from_pandas=True),
+                  'texto': pa.array(df_prs[origem].to_numpy(dtype=object), type=pa.string(), from_pandas=True)})
+        for origem in ORIGENS_PR
+    ]
+    for origem in ORIGENS_COMENTARIOS:
+        try:
+            dataset = abrir_tabela(origem, diretorio)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            continue
+        nomes = dataset.schema.names
+        colunas = [c for c in CHAVE_PR + ['body', 'user', 'user.login'] if c in nomes]
+        tabela = dataset.to_table(columns=colunas, filter=filtro)
+        chaves = pd.MultiIndex.from_arrays([tabela['repo'].to_pandas(), tabela['pr_number'].to_pandas()])
+        # Usuário gravado como texto fica em 'user'; como objeto, em 'user.login'
+        usuario = pa.nulls(len(tabela), pa.string())
+        for coluna in ('user.login', 'user'):
+            tipo = tabela.schema.field(coluna).type if coluna in nomes else None
+            if tipo is not None and (pa.types.is_string(tipo) or pa.types.is_large_string(tipo)):
+                usuario = pc.coalesce(tabela[coluna].combine_chunks().cast(pa.string()), usuario)
+        partes.append(pa.table({
+            'pr': pa.array(posicao_pr.get_indexer(chaves), type=pa.int32()),
+            'origem': pa.array([origem] * len(tabela), type=pa.string()),
+            'usuario': usuario,
+            'texto': (tabela['body'].combine_chunks().cast(pa.string()) if 'body' in nomes
+                      else pa.nulls(len(tabela), pa.string())),
+        }))
+
+    textos = pa.concat_tables(partes)
+    textos = textos.filter(pc.greater_equal(textos['pr'], 0))
+    textos = textos.set_column(1, 'origem', textos['origem'].combine_chunks().dictionary_encode())
+    return df_prs[CHAVE_PR + ['author', 'faixa']], textos
+
+
+def medir_textos(textos, limite_repeticoes=LIMITE_REPETICOES):
+    """
+    Acrescenta à tabela Arrow de textos as colunas 'caracteres', 'palavras' e 'repetido'.
+    Textos nulos contam como vazios. A normalização para achar repetições ignora maiúsculas
+    e diferenças de espaços; textos vazios nunca são repetidos.
+    """
+    texto = pc.fill_null(textos['texto'], '')
+    caracteres = pc.utf8_length(texto).cast(pa.int32())
+    palavras = pc.count_substring_regex(texto, r'\S+').cast(pa.int32())
+
+    normalizado = pc.utf8_trim_whitespace(pc.replace_substring_regex(pc.utf8_lower(texto), r'\s+', ' '))
+    codigos = pc.dictionary_encode(normalizado).combine_chunks().indices
+    # Quantidade de PRs distintos em que cada texto normalizado aparece
+    por_texto = pa.table({'codigo': codigos, 'pr': textos['pr']}).group_by('codigo').aggregate(
+        [('pr', 'count_distinct')])
+    prs_por_codigo = np.zeros(len(por_texto), dtype='int64')
+    prs_por_codigo[por_texto['codigo'].to_numpy()] = por_texto['pr_count_distinct'].to_numpy()
+    repetido = (prs_por_codigo[codigos.to_numpy()] >= limite_repeticoes) & (caracteres.to_numpy() > 0)
+
+    return (textos.append_column('caracteres', caracteres)
+                  .append_column('palavras', palavras)
+                  .append_column('repetido', pa.array(repetido)))
+
+
+@instrumentado('metricas_texto')
+def tabela_por_pr(df_prs, textos, excluir_repetidos=False, limite_repeticoes=LIMITE_REPETICOES):
+    """
+    Tabela compacta com uma linha por PR de faixa conhecida:
+    - <title|body>_caracteres, <title|body>_palavras e body_repetido (descrição de modelo);
+    - para cada origem de comentário: n_<origem>, <origem>_caracteres e <origem>_palavras
+      (médias por comentário) e <origem>_repetidos (proporção de textos repetidos);
+    - autor_comentarios e autor_palavras: comentários do próprio autor e a média de palavras.
+    Com excluir_repetidos=True, os comentários repetidos ficam fora das médias.
+    """
+    medidos = medir_textos(textos, limite_repeticoes)
+    df = pd.DataFrame({
+        'pr': medidos['pr'].to_numpy(),
+        'origem': medidos['origem'].combine_chunks().dictionary_decode().to_numpy(zero_copy_only=False),
+        'usuario': medidos['usuario'].to_pandas(),
+        'caracteres': medidos['caracteres'].to_numpy(),
+        'palavras': medidos['palavras'].to_numpy(),
+        'repetido': medidos['repetido'].to_numpy(zero_copy_only=False),
+    })
+    n = len(df_prs)
+    resultado = {}
+
+    do_pr = df[df['origem'].isin(ORIGENS_PR)]
+    for origem in ORIGENS_PR:
+        linhas = do_pr[do_pr['origem'] == origem]
+        for medida in ('caracteres', 'palavras'):
+            valores = np.full(n, np.nan, dtype='float32')
+            valores[linhas['pr'].to_numpy()] = linhas[medida].to_numpy()
+            resultado[f'{origem}_{medida}'] = valores
+    corpo = do_pr[do_pr['origem'] == 'body']
+    resultado['body_repetido'] = np.zeros(n, dtype=bool)
+    resultado['body_repetido'][corpo['pr'].to_numpy()] = corpo['repetido'].to_numpy()
+
+    comentarios = df[~df['origem'].isin(ORIGENS_PR)]
+    for origem in ORIGENS_COMENTARIOS:
+        linhas = comentarios[comentarios['origem'] == origem]
+        resultado[f'n_{origem}'] = np.bincount(linhas['pr'], minlength=n).astype('int32')
+        resultado[f'{origem}_repetidos'] = _media_por_pr(linhas['pr'], linhas['repetido'], n)
+        if excluir_repetidos:
+            linhas = linhas[~linhas['repetido']]
+        for medida in ('caracteres', 'palavras'):
+            resultado[f'{origem}_{medida}'] = _media_por_pr(linhas['pr'], linhas[medida], n)
+
+    autores = df_prs['author'].astype(str).str.lower().to_numpy(dtype=object)
+    do_autor = comentarios[comentarios['usuario'].str.lower().to_numpy(dtype=object) == autores[comentarios['pr']]]
+    if excluir_repetidos:
+        do_autor = do_autor[~do_autor['repetido']]
+    resultado['autor_comentarios'] = np.bincount(do_autor['pr'], minlength=n).astype('int32')
+    resultado['autor_palavras'] = _media_por_pr(do_autor['pr'], do_autor['palavras'], n)
+
+    tabela = pd.concat([df_prs[CHAVE_PR + ['faixa']].reset_index(drop=True), pd.DataFrame(resultado)], axis=1)
+    return tabela[tabela['faixa'] != FAIXA_DESCONHECIDA].reset_index(drop=True)
+
+
+def _media_por_pr(indices, valores, n):
+    """
+    Média de 'valores' agrupados pela posição do PR (NaN para PRs sem nenhum valor).
+    """
+    indices = np.asarray(indices, dtype='int64')
+    soma = np.bincount(indices, weights=np.asarray(valores, dtype='float64'), minlength=n)
+    contagem = np.bincount(indices, minlength=n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(contagem > 0, soma / contagem, np.nan).astype('float32')
+
+
+def textos_repetidos(textos, limite_repeticoes=LIMITE_REPETICOES, n=20):
+    """
+    Os n textos repetidos mais frequentes (normalmente bots e modelos), com a contagem.
+    """
+    medidos = medir_textos(textos, limite_repeticoes)
+    repetidos = medidos.filter(medidos['repetido'])['texto']
+    contagens = pc.value_counts(repetidos).to_pandas()
+    return pd.DataFrame({'texto': [c['values'] for c in contagens],
+                         'ocorrencias': [c['counts'] for c in contagens]}).nlargest(n, 'ocorrencias')
+
+
+def salvar_tabela(tabela, caminho=CAMINHO_TABELA):
+    """
+    Grava a tabela por PR em Feather (Arrow IPC), com repo e faixa categóricos.
+    """
+    tabela = tabela.assign(repo=tabela['repo'].astype('category'), faixa=tabela['faixa'].astype('category'))
+    tabela.to_feather(caminho)
+    print(f"-> Métricas de texto de {len(tabela)} PRs gravadas em '{caminho}'.")
+    return caminho
@@ -0,0 +1,240 @@
+# Cálculo vetorizado das métricas de eficiência (ideia 2) e de qualidade/revisão (ideia 3).
+# Em vez de converter cada timestamp com datetime.fromisoformat dentro de laços por PR,
+# os PRs são "explodidos" uma única vez em tabelas planas (prs, files, commits, reviews,
+# review_comments) e as métricas saem de operações por coluna do pandas/NumPy:
+# um único parse de datas por coluna, subtração de colunas e agregações por PR.
+# O resultado tem as mesmas colunas de analisar_eficiencia / analisar_qualidade_e_revisao.
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from carregador_prs import FAIXA_DESCONHECIDA
+
+CI_VALIDOS = ['success', 'failure', 'pending']
+
+
+def converter_datas(serie):
+    """
+    Converte uma coluna de timestamps ISO 8601 (ex.: '2024-01-01T10:00:00Z') para datetime UTC
+    de uma só vez. O parse é feito pelo Arrow (bem mais rápido que o do pandas para esse formato);
+    se algum valor não for um timestamp válido, cai no pandas, que transforma os inválidos em NaT.
+    """
+    if not pd.api.types.is_object_dtype(serie) and not pd.api.types.is_string_dtype(serie):
+        return pd.to_datetime(serie, utc=True, errors='coerce')
+    try:
+        texto = pa.array(serie.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+        datas = texto.cast(pa.timestamp('ns', tz='UTC'))
+        return datas.to_pandas().set_axis(serie.index)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pd.to_datetime(serie, utc=True, format='ISO8601', errors='coerce')
+
+
+def _em_nanossegundos(datas):
+    """
+    Datas UTC (sem NaT) como inteiros em nanossegundos, independentemente da resolução do pandas.
+    """
+    return datas.dt.tz_convert(None).to_numpy(dtype='datetime64[ns]').astype('int64')
+
+
+def explodir_prs(prs):
+    """
+    Percorre os PRs uma única vez e monta as tabelas planas usadas pelas métricas.
+    'prs' pode ser uma lista ou um gerador (ex.: carregador_prs.iterar_pull_requests).
+    Cada tabela filha é ligada à tabela 'prs' pela coluna 'pr' (posição do PR na entrada).
+    """
+    colunas_pr = {nome: [] for nome in (
+        'pr_number', 'author', 'repo', 'faixa', 'created_at', 'merged_at', 'ci_status_on_head',
+        'tem_counts', 'num_review_comments')}
+    files = {'pr': [], 'additions': [], 'deletions': []}
+    commits = {'pr': [], 'date': []}
+    review_comments = {'pr': [], 'created_at': []}
+    reviews = {'pr': [], 'state': []}
+
+    for i, pr in enumerate(prs):
+        counts = pr.get('counts')
+        colunas_pr['pr_number'].append(pr.get('pr_number'))
+        colunas_pr['author'].append(pr.get('author'))
+        colunas_pr['repo'].append(pr.get('repo'))
+        colunas_pr['faixa'].append(pr.get('faixa'))
+        colunas_pr['created_at'].append(pr.get('created_at'))
+        colunas_pr['merged_at'].append(pr.get('merged_at'))
+        colunas_pr['ci_status_on_head'].append(pr.get('ci_status_on_head', 'unknown'))
+        colunas_pr['tem_counts'].append(bool(counts))
+        colunas_pr['num_review_comments'].append(counts.get('review_comments', 0) if counts else 0)
+
+        for arquivo in pr.get('files') or []:
+            files['pr'].append(i)
+            files['additions'].append(arquivo.get('additions', 0))
+            files['deletions'].append(arquivo.get('deletions', 0))
+        for commit in pr.get('commits') or []:
+            if 'date' in commit:
+                commits['pr'].append(i)
+                commits['date'].append(commit['date'])
+        for comentario in pr.get('review_comments') or []:
+            if comentario.get('created_at'):
+                review_comments['pr'].append(i)
+                review_comments['created_at'].append(comentario['created_at'])
+        for review in pr.get('reviews') or []:
+            reviews['pr'].append(i)
+            reviews['state'].append(review.get('state'))
+
+    return {
+        'prs': pd.DataFrame(colunas_pr),
+        'files': pd.DataFrame(files),
+        'commits': pd.DataFrame(commits),
+        'review_comments': pd.DataFrame(review_comments),
+        'reviews': pd.DataFrame(reviews),
+    }
+
+
+def tabelas_do_parquet(diretorio, repos=None):
+    """
+    Monta as mesmas tabelas de explodir_prs diretamente do armazenamento Parquet
+    (ver armazenamento_colunar), lendo apenas as colunas necessárias.
+    """
+    from armazenamento_colunar import ler_tabela, CHAVE_PR
+
+    df_prs = ler_tabela('prs', diretorio, CHAVE_PR + [
+        'author', 'faixa', 'created_at', 'merged_at', 'ci_status_on_head',
+        'counts.review_comments', 'counts.reviews', 'counts.files', 'counts.commits'], repos)
+    colunas_counts = [c for c in df_prs.columns if c.startswith('counts.')]
+    df_prs['tem_counts'] = df_prs[colunas_counts].notna().any(axis=1) if colunas_counts else False
+    df_prs['num_review_comments'] = (df_prs['counts.review_comments'].fillna(0).astype('int64')
+                                     if 'counts.review_comments' in df_prs else 0)
+    if 'ci_status_on_head' not in df_prs:
+        df_prs['ci_status_on_head'] = None
+    df_prs['ci_status_on_head'] = df_prs['ci_status_on_head'].fillna('unknown')
+    for coluna in ('author', 'faixa', 'created_at', 'merged_at'):
+        if coluna not in df_prs:
+            df_prs[coluna] = None
+    df_prs = df_prs.drop(columns=colunas_counts)
+
+    posicao = pd.Series(np.arange(len(df_prs)), index=pd.MultiIndex.from_frame(df_prs[CHAVE_PR]))
+
+    def filha(nome, colunas):
+        df = ler_tabela(nome, diretorio, CHAVE_PR + colunas, repos)
+        for coluna in colunas:
+            if coluna not in df:
+                df[coluna] = pd.Series(dtype=object)
+        df['pr'] = posicao.reindex(pd.MultiIndex.from_frame(df[CHAVE_PR])).to_numpy()
+        return df[['pr'] + colunas]
+
+    files = filha('files', ['additions', 'deletions']).fillna({'additions': 0, 'deletions': 0})
+    commits = filha('commits', ['date']).dropna(subset=['date'])
+    review_comments = filha('review_comments', ['created_at']).dropna(subset=['created_at'])
+    reviews = filha('reviews', ['state'])
+    return {'prs': df_prs, 'files': files, 'commits': commits,
+            'review_comments': review_comments, 'reviews': reviews}
+
+
+def tamanho_do_parquet(diretorio, repos=None):
+    """
+    Métricas de tamanho da ideia 1 para os PRs dos autores da amostra, lidas do Parquet:
+    linhas alteradas (adições + deleções) e arquivos alterados (counts.files) por PR.
+    Como no notebook da ideia 1, ficam apenas os PRs com alguma mudança.
+    """
+    from armazenamento_colunar import ler_tabela, CHAVE_PR
+
+    prs = ler_tabela('prs', diretorio, CHAVE_PR + ['author', 'faixa', 'counts.files'], repos)
+    prs = prs[prs['faixa'].notna() & (prs['faixa'] != FAIXA_DESCONHECIDA)] if 'faixa' in prs else prs.iloc[:0]
+    arquivos = ler_tabela('files', diretorio, CHAVE_PR + ['additions', 'deletions'], repos)
+    for coluna in ('additions', 'deletions'):
+        if coluna not in arquivos:
+            arquivos[coluna] = 0
+    somas = arquivos.groupby(CHAVE_PR)[['additions', 'deletions']].sum()
+
+    df = prs.merge(somas, left_on=CHAVE_PR, right_index=True, how='left')
+    df[['additions', 'deletions']] = df[['additions', 'deletions']].fillna(0).astype('int64')
+    df['lines_changed'] = df['additions'] + df['deletions']
+    df['files_changed'] = (df['counts.files'].fillna(0).astype('int64') if 'counts.files' in df else 0)
+    df = df[(df['lines_changed'] > 0) | (df['files_changed'] > 0)]
+    return df[['author', 'faixa', 'repo', 'pr_number', 'lines_changed', 'files_changed',
+               'additions', 'deletions']].reset_index(drop=True)
+
+
+def calcular_eficiencia(tabelas):
+    """
+    Versão vetorizada de analisar_eficiencia: mesmas colunas, uma linha por PR com created_at válido.
+    """
+    df = tabelas['prs']
+    criado = converter_datas(df['created_at'])
+    validos = criado.notna().to_numpy()
+    df, criado = df[validos], criado[validos]
+    mesclado = converter_datas(df['merged_at'])
+    ci = df['ci_status_on_head']
+
+    return pd.DataFrame({
+        'faixa': df['faixa'].to_numpy(),
+        'tempo_merge_horas': ((mesclado - criado).dt.total_seconds() / 3600).to_numpy(),
+        'ci_status': ci.to_numpy(),
+        'ci_sucesso': (ci == 'success').astype('int64').to_numpy(),
+        'ci_valido': ci.isin(CI_VALIDOS).to_numpy(),
+        'hora_criacao': criado.dt.hour.astype('int64').to_numpy(),
+        'dia_semana_criacao': criado.dt.weekday.astype('int64').to_numpy(),
+    })
+
+
+def _somar_por_pr(indices, valores, n):
+    return np.bincount(indices, weights=valores, minlength=n) if len(indices) else np.zeros(n)
+
+
+def contar_commits_de_rework(tabelas):
+    """
+    Número de commits com data posterior ao primeiro comentário de revisão de cada PR.
+    O primeiro comentário de cada PR sai de um groupby-min; esse instante é replicado para os
+    commits do mesmo PR e a comparação (estritamente posterior) é feita de uma vez, em NumPy.
+    """
+    n = len(tabelas['prs'])
+    comentarios = tabelas['review_comments']
+    commits = tabelas['commits']
+    if comentarios.empty or commits.empty:
+        return np.zeros(n, dtype='int64')
+
+    primeiro = np.full(n, np.iinfo('int64').max, dtype='int64')
+    por_pr = converter_datas(comentarios['created_at']).groupby(comentarios['pr'].to_numpy()).min().dropna()
+    primeiro[por_pr.index.to_numpy(dtype='int64')] = _em_nanossegundos(por_pr)
+
+    datas = converter_datas(commits['date'])
+    validos = datas.notna().to_numpy()
+    pr_commit = commits['pr'].to_numpy(dtype='int64')[validos]
+    t_commit = _em_nanossegundos(datas[validos])
+    posteriores = t_commit > primeiro[pr_commit]
+    return np.bincount(pr_commit[posteriores], minlength=n).astype('int64')
+
+
+def calcular_qualidade(tabelas):
+    """
+    Versão vetorizada de analisar_qualidade_e_revisao: mesmas colunas, uma linha por PR
+    com faixa conhecida e com o campo 'counts'.
+    """
+    df = tabelas['prs']
+    n = len(df)
+    files = tabelas['files']
+    reviews = tabelas['reviews']
+
+    tamanho = _somar_por_pr(files['pr'].to_numpy(dtype='int64'),
+                            (files['additions'] + files['deletions']).to_numpy(dtype='float64'), n)
+    num_review_comments = df['num_review_comments'].to_numpy(dtype='int64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        densidade = np.where(tamanho > 0, num_review_comments / tamanho, 0.0)
+
+    indices_reviews = reviews['pr'].to_numpy(dtype='int64')
+    aprovados = _somar_por_pr(indices_reviews, (reviews['state'] == 'APPROVED').to_numpy(dtype='float64'), n)
+    mudancas = _somar_por_pr(indices_reviews, (reviews['state'] == 'CHANGES_REQUESTED').to_numpy(dtype='float64'), n)
+    total_com_estado = aprovados + mudancas
+    with np.errstate(divide='ignore', invalid='ignore'):
+        proporcao = np.where(total_com_estado > 0, mudancas / total_com_estado, 0.0)
+
+    resultado = pd.DataFrame({
+        'pr_number': df['pr_number'].to_numpy(),
+        'autor': df['author'].to_numpy(),
+        'faixa': df['faixa'].to_numpy(),
+        'num_review_comments': num_review_comments,
+        'tamanho_pr': tamanho.astype('int64'),
+        'densidade_comentarios': densidade,
+        'rework_commits': contar_commits_de_rework(tabelas),
+        'proporcao_changes_requested': proporcao,
+    })
+    manter = (df['faixa'] != FAIXA_DESCONHECIDA).to_numpy() & df['tem_counts'].to_numpy(dtype=bool)
+    return resultado[manter].reset_index(drop=True)
@@ -0,0 +1,476 @@
+# Ponto de entrada único das análises (ideias 1 a 5), executadas como um grafo de etapas:
+#   corpus -> índice de autores -> métricas de cada ideia -> agregados -> figuras
+# O corpus é lido uma única vez e gravado em Parquet (ver armazenamento_colunar); todas as
+# métricas saem dessas tabelas. O resultado de cada etapa fica em cache, sob uma chave
+# calculada a partir das entradas da etapa (a chave das etapas anteriores ou, para o corpus,
+# o tamanho e a data de modificação de cada JSON) e da versão do código (o fonte da etapa e
+# dos módulos que ela usa). Uma etapa só é executada quando a sua chave muda; etapas em
+# cache nem precisam das anteriores. As figuras têm cache próprio, pelo conteúdo de cada
+# especificação: alterar um gráfico redesenha apenas esse gráfico.
+#   python pipeline.py [diretorio_de_saida] [--alvos figuras,agregados_ideia_5] [--workers N]
+
+import os
+import ast
+import json
+import pickle
+import shutil
+import hashlib
+import argparse
+import inspect
+import textwrap
+
+import numpy as np
+import pandas as pd
+
+import instrumentacao
+from carregador_prs import (BASE_DIR, FAIXA_DESCONHECIDA, carregar_faixas_desenvolvedores, chave_dev,
+                            iterar_pull_requests, listar_arquivos_de_prs)
+from amostragem import AUTORES_POR_ESTRATO, SEMENTE_PADRAO
+
+DIRETORIO_CACHE = '.cache_pipeline'
+DIRETORIO_CODIGO = os.path.dirname(os.path.abspath(__file__))
+VERSAO_CACHE = 1
+ORDEM_FAIXAS = ['E', 'D', 'C', 'B', 'A']
+
+
+# --------------------------
+# Etapas
+# --------------------------
+# Cada etapa recebe o contexto da execução, o prefixo 'destino' no cache (para etapas que
+# gravam arquivos, como o Parquet do corpus) e os resultados das etapas de entrada.
+
+def _etapa_corpus(contexto, destino):
+    from armazenamento_colunar import exportar_para_parquet
+    diretorio = os.path.abspath(destino + '.parquet')
+    mapa_devs = carregar_faixas_desenvolvedores(contexto['base_path'])
+    exportar_para_parquet(iterar_pull_requests(contexto['base_path'], mapa_devs=mapa_devs,
+                                               workers=contexto['workers']), diretorio)
+    return diretorio
+
+
+def _etapa_indice(contexto, destino, corpus):
+    from armazenamento_colunar import ler_tabela
+    from indice_autores import montar_indice
+    prs = ler_tabela('prs', corpus, ['repo', 'author', 'created_at'])
+    return montar_indice(prs, carregar_faixas_desenvolvedores(contexto['base_path']))
+
+
+def _etapa_tamanho(contexto, destino, corpus):
+    from ideia_1 import tabela_de_tamanho_do_parquet
+    return tabela_de_tamanho_do_parquet(corpus)
+
+
+def _etapa_eficiencia(contexto, destino, corpus):
+    from metricas_vetorizadas import tabelas_do_parquet, calcular_eficiencia
+    from amostragem import sortear
+    tabelas = tabelas_do_parquet(corpus)
+    # Apenas os autores sorteados por estrato, com a mesma semente da ideia 2 (ver ideia_2.sortear_autores)
+    escolhidos = sortear(carregar_faixas_desenvolvedores(contexto['base_path']),
+                         contexto['autores_por_estrato'], contexto['semente'])
+    prs = tabelas['prs']
+    sorteados = [chave_dev(repo, autor) in escolhidos for repo, autor in zip(prs['repo'], prs['author'].astype(str))]
+    tabelas['prs'] = prs[np.array(sorteados, dtype=bool)]
+    return calcular_eficiencia(tabelas)
+
+
+def _etapa_qualidade(contexto, destino, corpus, indice):
+    from metricas_vetorizadas import tabelas_do_parquet, calcular_qualidade
+    from indice_autores import consultar
+    tabelas = tabelas_do_parquet(corpus)
+    # A faixa da ideia 3 vem da contagem de PRs do autor, como em ideia_3.analisar_qualidade_em_fluxo
+    tabelas['prs']['faixa'] = consultar(indice, tabelas['prs']['author'], coluna='faixa_contagem')
+    return calcular_qualidade(tabelas)
+
+
+def _etapa_sentimento(contexto, destino, corpus):
+    from armazenamento_colunar import reconstruir_prs
+    from classificacao_sentimento import (TIPOS_DE_COMENTARIO, CAMINHO_CACHE, extrair_comentarios,
+                                          classificar_textos, carregar_cache, salvar_cache)
+    prs = reconstruir_prs(corpus, colunas_prs=['state', 'merged_at', 'faixa'], tabelas=TIPOS_DE_COMENTARIO,
+                          colunas_filhas={tipo: ['body', 'user', 'user.login'] for tipo in TIPOS_DE_COMENTARIO})
+    linhas = [linha for pr in prs if pr.get('faixa', FAIXA_DESCONHECIDA) != FAIXA_DESCONHECIDA
+              for linha in extrair_comentarios(pr)]
+    comentarios = pd.DataFrame.from_records(linhas, columns=['faixa_autor', 'resultado_pr', 'texto'])
+    # O cache do classificador (hash do texto -> categoria) fica no diretório de cache do pipeline,
+    # junto dos resultados das etapas (e é apagado com eles)
+    caminho_cache = os.path.join(contexto['diretorio_cache'], CAMINHO_CACHE)
+    cache = carregar_cache(caminho_cache)
+    comentarios['categoria_sentimento'], _ = classificar_textos(comentarios['texto'].tolist(), cache=cache,
+                                                                workers=contexto['workers'])
+    salvar_cache(cache, caminho_cache)
+    return comentarios[['faixa_autor', 'resultado_pr', 'categoria_sentimento']]
+
+
+def _etapa_conformidade(contexto, destino, corpus):
+    from conformidade_commits import tabela_de_commits_do_parquet, analisar_conformidade_commits
+    _, por_pr = analisar_conformidade_commits(tabela_de_commits_do_parquet(corpus), workers=contexto['workers'])
+    return por_pr
+
+
+def _etapa_auto_revisao(contexto, destino, corpus):
+    from eventos_timeline import tabelas_da_timeline_do_parquet, analisar_auto_revisao
+    return analisar_auto_revisao(*tabelas_da_timeline_do_parquet(corpus))
+
+
+def _etapa_escopo(contexto, destino, corpus):
+    from classificacao_arquivos import tabela_de_arquivos_do_parquet, analisar_escopo_mudancas
+    return analisar_escopo_mudancas(tabela_de_arquivos_do_parquet(corpus), contexto['core_dirs'])
+
+
+def _etapa_revisao(contexto, destino, corpus):
+    from armazenamento_colunar import ler_tabela
+    prs = ler_tabela('prs', corpus, ['faixa', 'counts.review_comments'])
+    if 'counts.review_comments' not in prs:
+        prs['counts.review_comments'] = 0
+    prs = prs[prs['faixa'].notna() & (prs['faixa'] != FAIXA_DESCONHECIDA)]
+    # Comentários de revisão por PR dos autores da amostra, como em ideia_5.analisar_conformidade
+    return pd.DataFrame({'faixa': prs['faixa'].to_numpy(),
+                         'num_review_comments': pd.to_numeric(prs['counts.review_comments']).fillna(0).to_numpy()})
+
+
+def _etapa_textos(contexto, destino, corpus):
+    from metricas_texto import extrair_textos_do_parquet, tabela_por_pr
+    # Como em ideia_4: os comentários repetidos (bots, modelos) ficam fora das médias
+    return tabela_por_pr(*extrair_textos_do_parquet(corpus), excluir_repetidos=True)
+
+
+def _etapa_responsividade(contexto, destino, corpus):
+    from responsividade import tabelas_de_responsividade_do_parquet, calcular_responsividade
+    return calcular_responsividade(*tabelas_de_responsividade_do_parquet(corpus))
+
+
+def _etapa_agregados_tamanho(contexto, destino, tamanho):
+    import ideia_1
+    return ideia_1.agregar_tamanho(tamanho)
+
+
+def _etapa_agregados_eficiencia(contexto, destino, eficiencia):
+    import ideia_2
+    from agregados import resumir_tabela_eficiencia
+    # Como no script da ideia 2: tabelas e box plots a partir do estado (esboços de quantis)
+    return ideia_2.agregar_eficiencia_do_estado(resumir_tabela_eficiencia(eficiencia))
+
+
+def _etapa_agregados_qualidade(contexto, destino, qualidade):
+    import ideia_3
+    return ideia_3.agregar_qualidade(qualidade[qualidade['faixa'] != FAIXA_DESCONHECIDA])
+
+
+def _etapa_agregados_sentimento(contexto, destino, sentimento):
+    import ideia4_llm
+    return ideia4_llm.calcular_proporcoes(sentimento)
+
+
+def _etapa_agregados_responsividade(contexto, destino, responsividade):
+    from responsividade import responsividade_por_faixa
+    return responsividade_por_faixa(responsividade)
+
+
+def _etapa_agregados_ideia_5(contexto, destino, conformidade, auto_revisao, escopo, revisao):
+    import ideia_5
+    agregados = ideia_5.agregar_conformidade({'conformidade': conformidade, 'escopo': escopo, 'revisao': revisao})
+    agregados['taxa_conformidade'] = conformidade.groupby('faixa')['taxa_conformidade'].mean().reindex(ORDEM_FAIXAS)
+    agregados['self_review_commits'] = (auto_revisao.groupby('faixa')['self_review_commits'].mean()
+                                        .reindex(ORDEM_FAIXAS))
+    return agregados
+
+
+def _etapa_figuras(contexto, destino, agregados_tamanho, agregados_eficiencia, agregados_qualidade, textos,
+                   responsividade, agregados_sentimento, agregados_ideia_5):
+    import ideia_1
+    import ideia_2
+    import ideia_3
+    import ideia_4
+    import ideia4_llm
+    import ideia_5
+    # Os mesmos gráficos do relatorio.py, na mesma ordem
+    especificacoes = (ideia_1.especificacoes_tamanho(agregados_tamanho)
+                      + ideia_2.especificacoes_eficiencia(agregados_eficiencia)
+                      + ideia_3.especificacoes_qualidade(agregados_qualidade)
+                      + ideia_4.especificacoes_responsividade(responsividade)
+                      + ideia_4.especificacoes_textos(textos)
+                      + ideia4_llm.especificacoes_sentimento(agregados_sentimento)
+                      + ideia_5.especificacoes_conformidade(agregados_ideia_5))
+    return renderizar_com_cache(especificacoes, contexto)
+
+
+# 'entradas': etapas cujos resultados a etapa recebe; 'modulos': módulos cujo fonte (com o dos
+# módulos do repositório que eles importam) entra na versão do código, além dos importados pela
+# própria função da etapa; 'parametros': chaves do contexto que entram na chave ('corpus' = os JSONs);
+# 'cache': False para etapas que não valem a pena guardar (as figuras têm cache próprio).
+ETAPAS = {
+    'corpus': {'funcao': _etapa_corpus, 'entradas': [], 'parametros': ['corpus'],
+               'modulos': ['carregador_prs', 'armazenamento_colunar']},
+    'indice': {'funcao': _etapa_indice, 'entradas': ['corpus'], 'modulos': ['indice_autores']},
+    'tamanho': {'funcao': _etapa_tamanho, 'entradas': ['corpus'], 'modulos': ['ideia_1']},
+    'eficiencia': {'funcao': _etapa_eficiencia, 'entradas': ['corpus'], 'parametros': ['semente', 'autores_por_estrato'],
+                   'modulos': ['metricas_vetorizadas', 'amostragem']},
+    'qualidade': {'funcao': _etapa_qualidade, 'entradas': ['corpus', 'indice'],
+                  'modulos': ['metricas_vetorizadas', 'indice_autores']},
+    'sentimento': {'funcao': _etapa_sentimento, 'entradas': ['corpus'], 'modulos': ['classificacao_sentimento']},
+    'conformidade': {'funcao': _etapa_conformidade, 'entradas': ['corpus'], 'modulos': ['conformidade_commits']},
+    'auto_revisao': {'funcao': _etapa_auto_revisao, 'entradas': ['corpus'], 'modulos': ['eventos_timeline']},
+    'escopo': {'funcao': _etapa_escopo, 'entradas': ['corpus'], 'parametros': ['core_dirs'],
+               'modulos': ['classificacao_arquivos']},
+    'revisao': {'funcao': _etapa_revisao, 'entradas': ['corpus']},
+    'textos': {'funcao': _etapa_textos, 'entradas': ['corpus'], 'modulos': ['metricas_texto']},
+    'responsividade': {'funcao': _etapa_responsividade, 'entradas': ['corpus'], 'modulos': ['responsividade']},
+    'agregados_tamanho': {'funcao': _etapa_agregados_tamanho, 'entradas': ['tamanho'], 'modulos': ['ideia_1']},
+    'agregados_eficiencia': {'funcao': _etapa_agregados_eficiencia, 'entradas': ['eficiencia'],
+                             'modulos': ['ideia_2', 'graficos']},
+    'agregados_qualidade': {'funcao': _etapa_agregados_qualidade, 'entradas': ['qualidade'],
+                            'modulos': ['ideia_3', 'graficos']},
+    'agregados_sentimento': {'funcao': _etapa_agregados_sentimento, 'entradas': ['sentimento'],
+                             'modulos': ['ideia4_llm']},
+    'agregados_responsividade': {'funcao': _etapa_agregados_responsividade, 'entradas': ['responsividade'],
+                                 'modulos': ['responsividade']},
+    'agregados_ideia_5': {'funcao': _etapa_agregados_ideia_5,
+                          'entradas': ['conformidade', 'auto_revisao', 'escopo', 'revisao'], 'modulos': ['ideia_5']},
+    'figuras': {'funcao': _etapa_figuras, 'entradas': ['agregados_tamanho', 'agregados_eficiencia',
+                                                       'agregados_qualidade', 'textos', 'responsividade',
+                                                       'agregados_sentimento', 'agregados_ideia_5'], 'cache': False},
+}
+ALVOS_PADRAO = ['agregados_tamanho', 'agregados_responsividade', 'agregados_ideia_5', 'figuras']
+
+
+# --------------------------
+# Chaves de cache
+# --------------------------
+
+def resumo(valor):
+    """
+    Hash determinístico (hex) de um valor: DataFrames, Series e arrays pelo conteúdo,
+    dicionários e listas recursivamente, os demais pelo repr.
+    """
+    h = hashlib.sha1()
+    _atualizar(h, valor)
+    return h.hexdigest()
+
+
+def _atualizar(h, valor):
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        colunas = list(valor.columns) if isinstance(valor, pd.DataFrame) else [valor.name]
+        h.update(repr((type(valor).__name__, valor.shape, colunas, list(map(str, np.atleast_1d(valor.dtypes))))).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+        except TypeError:
+            # Colunas com valores não hasheáveis (ex.: listas de outliers dos box plots)
+            h.update(pickle.dumps(valor, protocol=5))
+    elif isinstance(valor, np.ndarray):
+        h.update(repr((valor.dtype.str, valor.shape)).encode())
+        h.update(np.ascontiguousarray(valor).tobytes() if valor.dtype != object else pickle.dumps(valor))
+    elif isinstance(valor, dict):
+        h.update(b'{')
+        for chave in sorted(valor, key=repr):
+            h.update(repr(chave).encode())
+            _atualizar(h, valor[chave])
+        h.update(b'}')
+    elif isinstance(valor, (list, tuple)):
+        h.update(b'[')
+        for item in valor:
+            _atualizar(h, item)
+        h.update(b']')
+    else:
+        h.update(repr(valor).encode())
+
+
+def impressao_do_corpus(base_path=BASE_DIR):
+    """
+    Identifica o estado do corpus: caminho, tamanho e data de modificação de cada JSON de PR,
+    mais o conteúdo dos sample-devs.jsonl (que definem as faixas). Não lê os JSONs.
+    """
+    h = hashlib.sha1()
+    for repo_name, dev_name, caminho in listar_arquivos_de_prs(base_path):
+        estado = os.stat(caminho)
+        h.update(f'{os.path.relpath(caminho, base_path)}\0{estado.st_size}\0{estado.st_mtime_ns}\n'.encode())
+    if os.path.isdir(base_path):
+        for repo_name in sorted(os.listdir(base_path)):
+            devs_file = os.path.join(base_path, repo_name, 'sample-devs.jsonl')
+            if os.path.isfile(devs_file):
+                with open(devs_file, 'rb') as f:
+                    h.update(f.read())
+    return h.hexdigest()
+
+
+def _modulos_importados(fonte):
+    """
+    Módulos do repositório importados em qualquer ponto de um trecho de código (inclusive
+    dentro de funções). Módulos de fora do repositório são ignorados.
+    """
+    nomes = set()
+    for no in ast.walk(ast.parse(fonte)):
+        if isinstance(no, ast.Import):
+            nomes.update(alias.name.split('.')[0] for alias in no.names)
+        elif isinstance(no, ast.ImportFrom) and no.module and not no.level:
+            nomes.add(no.module.split('.')[0])
+    return {nome for nome in nomes if os.path.isfile(os.path.join(DIRETORIO_CODIGO, nome + '.py'))}
+
+
+def resumo_dos_modulos(modulos, h=None):
+    """
+    Acrescenta ao hash o fonte dos módulos e, transitivamente, o de todos os módulos do
+    repositório que eles importam. Os arquivos são lidos sem importar os módulos.
+    """
+    h = h or hashlib.sha1()
+    pendentes, fontes = list(modulos), {}
+    while pendentes:
+        modulo = pendentes.pop()
+        if modulo in fontes:
+            continue
+        with open(os.path.join(DIRETORIO_CODIGO, modulo + '.py'), 'rb') as f:
+            fontes[modulo] = f.read()
+        pendentes.extend(_modulos_importados(fontes[modulo]) - set(fontes))
+    for modulo in sorted(fontes):
+        h.update(modulo.encode() + b'\0' + fontes[modulo])
+    return h
+
+
+def versao_do_codigo(nome):
+    """
+    Versão do código de uma etapa: o fonte da função da etapa e dos módulos do repositório de
+    que ela depende (os declarados, os importados pela função e os importados por eles).
+    """
+    etapa = ETAPAS[nome]
+    fonte = inspect.getsource(etapa['funcao'])
+    modulos = set(etapa.get('modulos', [])) | _modulos_importados(textwrap.dedent(fonte))
+    return resumo_dos_modulos(modulos, hashlib.sha1(fonte.encode())).hexdigest()
+
+
+def chave_da_etapa(nome, contexto, chaves=None):
+    """
+    Chave de cache de uma etapa: versão do código, parâmetros e chaves das etapas de entrada.
+    Depende só das chaves das entradas (não dos resultados), então é calculada sem executar nada.
+    """
+    chaves = {} if chaves is None else chaves
+    if nome in chaves:
+        return chaves[nome]
+    etapa = ETAPAS[nome]
+    h = hashlib.sha1(f'{VERSAO_CACHE}:{nome}:{versao_do_codigo(nome)}'.encode())
+    for parametro in etapa.get('parametros', []):
+        if parametro == 'corpus':
+            h.update(impressao_do_corpus(contexto['base_path']).encode())
+        else:
+            h.update(resumo(contexto.get(parametro)).encode())
+    for entrada in etapa['entradas']:
+        h.update(chave_da_etapa(entrada, contexto, chaves).encode())
+    chaves[nome] = h.hexdigest()
+    return chaves[nome]
+
+
+# --------------------------
+# Execução
+# --------------------------
+
+def _gravar_pickle(valor, caminho):
+    temporario = caminho + '.tmp'
+    with open(temporario, 'wb') as f:
+        pickle.dump(valor, f, protocol=5)
+    os.replace(temporario, caminho)
+
+
+def executar(alvos=None, base_path=BASE_DIR, workers=None, diretorio_saida='.', diretorio_cache=DIRETORIO_CACHE,
+             core_dirs=None, refazer=(), semente=SEMENTE_PADRAO, autores_por_estrato=AUTORES_POR_ESTRATO):
+    """
+    Executa as etapas necessárias para obter os 'alvos' (padrão: ALVOS_PADRAO) e devolve um
+    dicionário alvo -> resultado. Sem 'core_dirs', a etapa 'escopo' usa ideia_5.CORE_DIRS_POR_REPO;
+    'semente' e 'autores_por_estrato' definem o sorteio dos autores da etapa 'eficiencia'.
+    Etapas em 'refazer' são executadas mesmo que estejam em cache.
+    """
+    if core_dirs is None:
+        from ideia_5 import CORE_DIRS_POR_REPO
+        core_dirs = CORE_DIRS_POR_REPO
+    alvos = list(alvos or ALVOS_PADRAO)
+    os.makedirs(diretorio_cache, exist_ok=True)
+    contexto = {'base_path': base_path, 'workers': workers, 'diretorio_saida': diretorio_saida,
+                'diretorio_cache': diretorio_cache, 'core_dirs': core_dirs, 'semente': semente,
+                'autores_por_estrato': autores_por_estrato}
+    chaves, resultados = {}, {}
+
+    def obter(nome):
+        if nome in resultados:
+            return resultados[nome]
+        etapa = ETAPAS[nome]
+        chave = chave_da_etapa(nome, contexto, chaves)
+        destino = os.path.join(diretorio_cache, f'{nome}-{chave[:20]}')
+        guardar = etapa.get('cache', True)
+        if guardar and nome not in refazer and os.path.isfile(destino + '.pkl'):
+            print(f"[cache] {nome}")
+            with open(destino + '.pkl', 'rb') as f:
+                resultados[nome] = pickle.load(f)
+            return resultados[nome]
+
+        entradas = [obter(entrada) for entrada in etapa['entradas']]
+        print(f"[executando] {nome}")
+        with instrumentacao.etapa(nome):
+            resultado = etapa['funcao'](contexto, destino, *entradas)
+        if guardar:
+            _gravar_pickle(resultado, destino + '.pkl')
+        resultados[nome] = resultado
+        return resultado
+
+    return {alvo: obter(alvo) for alvo in alvos}
+
+
+def renderizar_com_cache(especificacoes, contexto):
+    """
+    Desenha apenas as especificações que mudaram: cada PNG fica no cache sob o hash da
+    especificação (e do código de graficos) e é copiado para o diretório de saída.
+    Retorna a lista de caminhos gravados.
+    """
+    from graficos import renderizar_graficos
+
+    versao = resumo_dos_modulos(['graficos']).hexdigest()
+    pendentes, copias = [], []
+    for especificacao in especificacoes:
+        chave = resumo([versao, especificacao])
+        em_cache = os.path.abspath(os.path.join(contexto['diretorio_cache'], f'figura-{chave[:20]}.png'))
+        if not os.path.isfile(em_cache):
+            pendentes.append(dict(especificacao, caminho=em_cache))
+        copias.append((em_cache, os.path.join(contexto['diretorio_saida'], especificacao['caminho'])))
+
+    print(f"-> {len(pendentes)} de {len(especificacoes)} gráficos a desenhar; os demais vêm do cache.")
+    renderizar_graficos(pendentes, contexto['workers'])
+    for origem, destino in copias:
+        os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+        shutil.copyfile(origem, destino)
+    return [destino for _, destino in copias]
+
+
+def limpar_cache(diretorio_cache=DIRETORIO_CACHE):
+    """
+    Remove todo o cache (o corpus em Parquet e os resultados de todas as etapas).
+    """
+    if os.path.isdir(diretorio_cache):
+        shutil.rmtree(diretorio_cache)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Executa as análises das ideias 1 a 5 com cache por etapa.")
+    parser.add_argument('saida', nargs='?', default='.', help="diretório dos gráficos")
+    parser.add_argument('--base', default=BASE_DIR)
+    parser.add_argument('--alvos', default=None, help=f"etapas separadas por vírgulas ({', '.join(ETAPAS)})")
+    parser.add_argument('--refazer', default='', help="etapas a executar mesmo se estiverem em cache")
+    parser.add_argument('--core-dirs', default=None,
+                        help="JSON repo -> lista de diretórios core (etapa 'escopo'; padrão: ideia_5.CORE_DIRS_POR_REPO)")
+    parser.add_argument('--semente', type=int, default=SEMENTE_PADRAO, help="semente do sorteio da etapa 'eficiencia'")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache', default=DIRETORIO_CACHE)
+    argumentos = parser.parse_args()
+
+    core_dirs = None
+    if argumentos.core_dirs:
+        with open(argumentos.core_dirs, 'r', encoding='utf-8') as f:
+            core_dirs = {repo: tuple(dirs) for repo, dirs in json.load(f).items()}
+    alvos = argumentos.alvos.split(',') if argumentos.alvos else None
+    resultados = executar(alvos, argumentos.base, argumentos.workers, argumentos.saida, argumentos.cache,
+                          core_dirs, [nome for nome in argumentos.refazer.split(',') if nome], argumentos.semente)
+
+    for nome, resultado in resultados.items():
+        if isinstance(resultado, (pd.DataFrame, pd.Series)):
+            print(f"\n--- {nome} ---")
+            print(resultado.to_string())
+        elif isinstance(resultado, dict):
+            for parte, tabela in resultado.items():
+                if isinstance(tabela, (pd.DataFrame, pd.Series)):
+                    print(f"\n--- {nome}: {parte} ---")
+                    print(tabela.to_string())
@@ -0,0 +1,88 @@
+# Relatório completo em lote: executa as análises das ideias 1 a 5, agrega cada uma por
+# faixa e grava todos os gráficos em PNG de uma vez, desenhados em paralelo e sem abrir
+# nenhuma janela (ver graficos). Pode rodar em servidores sem display.
+#   python relatorio.py [diretorio_de_saida]
+
+import os
+import sys
+
+import pandas as pd
+
+import ideia_1
+import ideia_2
+import ideia_3
+import ideia_4
+import ideia4_llm
+import ideia_5
+from carregador_prs import BASE_DIR, FAIXA_DESCONHECIDA, carregar_faixas_desenvolvedores
+from graficos import renderizar_graficos
+from amostragem import sortear, iterar_amostra
+from agregados import resumir_em_fluxo, resumir_eficiencia
+from ingestao_incremental import COLUNA_ARQUIVO
+
+
+def especificacoes_do_relatorio(base_path=BASE_DIR, workers=None):
+    """
+    Atualiza os datasets das análises e devolve as especificações de todos os gráficos.
+    Análises sem dados (ex.: sem o CSV de sentimento) são puladas com um aviso.
+    """
+    especificacoes = []
+    mapa_devs = carregar_faixas_desenvolvedores(base_path)
+
+    df_tamanho = ideia_1.analisar_tamanho(base_path, mapa_devs, workers)
+    if df_tamanho.empty:
+        print("Ideia 1: nenhum PR para analisar.")
+    else:
+        especificacoes += ideia_1.especificacoes_tamanho(ideia_1.agregar_tamanho(df_tamanho))
+
+    # Ideia 2: só os JSONs dos autores sorteados são lidos (ver amostragem) e resumidos em
+    # fluxo; os box plots saem dos esboços de quantis do estado (ver agregados)
+    prs = iterar_amostra(sortear(mapa_devs), ideia_2.CAMPOS_EFICIENCIA, base_path=base_path, workers=workers)
+    agregados_eficiencia = ideia_2.agregar_eficiencia_do_estado(resumir_em_fluxo(prs, resumir_eficiencia))
+    if not agregados_eficiencia["hora_criacao"]:
+        print("Ideia 2: nenhum PR para analisar.")
+    else:
+        especificacoes += ideia_2.especificacoes_eficiencia(agregados_eficiencia)
+
+    df_qualidade = ideia_3.atualizar_dados_qualidade(base_path, workers=workers)
+    if df_qualidade.empty:
+        print("Ideia 3: nenhum PR para analisar.")
+    else:
+        df_qualidade = df_qualidade[df_qualidade['faixa'] != FAIXA_DESCONHECIDA].drop(columns=[COLUNA_ARQUIVO])
+        especificacoes += ideia_3.especificacoes_qualidade(ideia_3.agregar_qualidade(df_qualidade))
+
+    por_comentario, _ = ideia_4.analisar_responsividade(base_path, mapa_devs, workers)
+    if por_comentario.empty:
+        print("Ideia 4: nenhum comentário de revisão para a análise de responsividade.")
+    else:
+        especificacoes += ideia_4.especificacoes_responsividade(por_comentario)
+
+    tabela_textos = ideia_4.analisar_textos(base_path, mapa_devs, workers, excluir_repetidos=True)
+    if tabela_textos.empty:
+        print("Ideia 4: nenhum PR para a análise de textos.")
+    else:
+        especificacoes += ideia_4.especificacoes_textos(tabela_textos)
+
+    if os.path.isfile(ideia4_llm.CAMINHO_ENTRADA):
+        counts_pct = ideia4_llm.calcular_proporcoes(pd.read_csv(ideia4_llm.CAMINHO_ENTRADA))
+        especificacoes += ideia4_llm.especificacoes_sentimento(counts_pct)
+    else:
+        print(f"Ideia 4: '{ideia4_llm.CAMINHO_ENTRADA}' não encontrado (gere-o com: python classificacao_sentimento.py).")
+
+    tabelas_conformidade = ideia_5.analisar_conformidade(base_path, mapa_devs, workers)
+    if tabelas_conformidade['revisao'].empty:
+        print("Ideia 5: nenhum PR para analisar.")
+    else:
+        especificacoes += ideia_5.especificacoes_conformidade(ideia_5.agregar_conformidade(tabelas_conformidade))
+
+    return especificacoes
+
+
+def gerar_relatorio(base_path=BASE_DIR, diretorio_saida='.', workers=None):
+    especificacoes = especificacoes_do_relatorio(base_path, workers)
+    print(f"\nGerando {len(especificacoes)} gráficos em '{diretorio_saida}'...")
+    return renderizar_graficos(especificacoes, workers, diretorio_saida)
+
+
+if __name__ == "__main__":
+    gerar_relatorio(diretorio_saida=sys.argv[1] if len(sys.argv) > 1 else '.')
@@ -0,0 +1,156 @@
+# Responsividade do autor do PR (ideia 4): o tempo entre cada comentário de revisão
+# (review_comments[].created_at) e a próxima reação do autor, um novo commit ou um comentário
+# dele (em review_comments ou issue_comments).
+# Em vez de procurar, para cada comentário, a próxima reação entre todos os commits e
+# comentários do PR (quadrático por PR), os comentários e as reações do corpus inteiro viram
+# duas tabelas de eventos ordenadas pelo instante, e uma junção "as-of" (pd.merge_asof, por PR)
+# liga cada comentário à primeira reação estritamente posterior. O custo é o da ordenação,
+# O(n log n) no total de eventos.
+# Os papéis vêm do campo 'author' do PR: comentários de outras pessoas são os de revisão;
+# commits do PR e comentários do próprio autor são as reações. Os commits não trazem o autor
+# no corpus, então todos os commits do PR contam como reação do autor.
+
+import numpy as np
+import pandas as pd
+
+from carregador_prs import FAIXA_DESCONHECIDA
+from metricas_vetorizadas import converter_datas
+from instrumentacao import instrumentado
+from agregados import resumir
+
+CHAVE_PR = ['repo', 'pr_number']
+COLUNAS_PRS = CHAVE_PR + ['author', 'faixa']
+COLUNAS_EVENTOS = CHAVE_PR + ['origem', 'usuario', 'created_at']
+COLUNAS_RESULTADO = CHAVE_PR + ['faixa', 'revisor', 'created_at', 'respondido_em', 'tipo_resposta', 'latencia_horas']
+QUANTIS_RESUMO = [0.25, 0.5, 0.75, 0.9]
+
+
+def _login(usuario):
+    """
+    O usuário de um comentário aparece no corpus como texto ('login') ou objeto ({'login': ...}).
+    """
+    if isinstance(usuario, dict):
+        return usuario.get('login')
+    return usuario
+
+
+def tabelas_de_responsividade(prs):
+    """
+    Monta, a partir dos PRs (dicionários), a tabela de PRs e a de eventos: um comentário
+    (origem 'review_comment' ou 'issue_comment') ou commit ('commit') por linha.
+    """
+    linhas_prs, linhas_eventos = [], []
+    for pr in prs:
+        chave = (pr.get('repo'), pr.get('pr_number'))
+        linhas_prs.append(chave + (pr.get('author'), pr.get('faixa')))
+        for origem in ('review_comments', 'issue_comments'):
+            for comentario in pr.get(origem) or []:
+                linhas_eventos.append(chave + (origem[:-1], _login(comentario.get('user')), comentario.get('created_at')))
+        for commit in pr.get('commits') or []:
+            linhas_eventos.append(chave + ('commit', None, commit.get('date')))
+
+    df_prs = pd.DataFrame.from_records(linhas_prs, columns=COLUNAS_PRS)
+    eventos = pd.DataFrame.from_records(linhas_eventos, columns=COLUNAS_EVENTOS)
+    eventos['created_at'] = converter_datas(eventos['created_at'])
+    return df_prs, eventos
+
+
+def tabelas_de_responsividade_do_parquet(diretorio, repos=None):
+    """
+    Monta as mesmas tabelas diretamente do armazenamento Parquet (ver armazenamento_colunar).
+    """
+    from armazenamento_colunar import ler_tabela
+
+    df_prs = ler_tabela('prs', diretorio, COLUNAS_PRS, repos)
+    partes = []
+    for nome in ('review_comments', 'issue_comments'):
+        comentarios = ler_tabela(nome, diretorio, CHAVE_PR + ['created_at', 'user', 'user.login'], repos)
+        # Usuário gravado como texto fica em 'user'; como objeto, em 'user.login'
+        usuario = comentarios['user'] if 'user' in comentarios else pd.Series(None, index=comentarios.index, dtype=object)
+        if 'user.login' in comentarios:
+            usuario = usuario.where(usuario.notna(), comentarios['user.login'])
+        partes.append(pd.DataFrame({'repo': comentarios['repo'], 'pr_number': comentarios['pr_number'],
+                                    'origem': nome[:-1], 'usuario': usuario,
+                                    'created_at': comentarios.get('created_at')}))
+    commits = ler_tabela('commits', diretorio, CHAVE_PR + ['date'], repos)
+    partes.append(pd.DataFrame({'repo': commits['repo'], 'pr_number': commits['pr_number'], 'origem': 'commit',
+                                'usuario': None, 'created_at': commits.get('date')}))
+
+    for coluna in COLUNAS_PRS:
+        if coluna not in df_prs:
+            df_prs[coluna] = None
+    eventos = pd.concat(partes, ignore_index=True)[COLUNAS_EVENTOS]
+    eventos['created_at'] = converter_datas(eventos['created_at'])
+    return df_prs[COLUNAS_PRS], eventos
+
+
+@instrumentado('responsividade')
+def calcular_responsividade(df_prs, eventos):
+    """
+    Latência de resposta a cada comentário de revisão, para os PRs de faixa conhecida.
+
+    Retorna um DataFrame com uma linha por comentário de revisão (de alguém que não o autor):
+    pr_number, faixa, revisor, created_at, respondido_em, tipo_resposta ('commit' ou
+    'comentario') e latencia_horas. Comentários sem reação posterior ficam com latência nula.
+    """
+    prs = df_prs[(df_prs['faixa'] != FAIXA_DESCONHECIDA) & df_prs['author'].notna()]
+    prs = prs.assign(autor=prs['author'].astype(str).str.lower())
+    eventos = eventos[eventos['created_at'].notna()].merge(prs[CHAVE_PR + ['autor', 'faixa']], on=CHAVE_PR)
+    do_autor = eventos['usuario'].astype(str).str.lower() == eventos['autor']
+
+    comentarios = eventos[(eventos['origem'] == 'review_comment') & eventos['usuario'].notna() & ~do_autor]
+    reacoes = eventos[(eventos['origem'] == 'commit') | do_autor]
+    if comentarios.empty:
+        return pd.DataFrame(columns=COLUNAS_RESULTADO).astype(
+            {'created_at': 'datetime64[ns, UTC]', 'respondido_em': 'datetime64[ns, UTC]', 'latencia_horas': 'float64'})
+
+    # Chave inteira por PR: a junção as-of compara um inteiro por linha em vez de duas colunas
+    codigos = pd.MultiIndex.from_frame(prs[CHAVE_PR]).drop_duplicates()
+    comentarios = comentarios.assign(pr=codigos.get_indexer(pd.MultiIndex.from_frame(comentarios[CHAVE_PR])))
+    reacoes = pd.DataFrame({
+        'pr': codigos.get_indexer(pd.MultiIndex.from_frame(reacoes[CHAVE_PR])),
+        # .array mantém o tipo com fuso mesmo sem reações (to_numpy daria uma coluna object)
+        'respondido_em': reacoes['created_at'].array,
+        'tipo_resposta': np.where(reacoes['origem'] == 'commit', 'commit', 'comentario'),
+    })
+
+    ligados = pd.merge_asof(
+        comentarios.sort_values('created_at'), reacoes.sort_values('respondido_em'),
+        left_on='created_at', right_on='respondido_em', by='pr',
+        direction='forward', allow_exact_matches=False)
+    ligados['latencia_horas'] = (ligados['respondido_em'] - ligados['created_at']).dt.total_seconds() / 3600
+    ligados = ligados.sort_values(['pr', 'created_at'], kind='stable')
+    ligados = ligados.rename(columns={'usuario': 'revisor'})
+    return ligados[COLUNAS_RESULTADO].reset_index(drop=True)
+
+
+def responsividade_por_pr(por_comentario):
+    """
+    Por PR: comentários de revisão, proporção respondida e mediana/média da latência.
+    """
+    grupos = por_comentario.groupby(CHAVE_PR, sort=False)
+    por_pr = grupos.agg(faixa=('faixa', 'first'), comentarios=('latencia_horas', 'size'),
+                        respondidos=('latencia_horas', 'count'), latencia_mediana=('latencia_horas', 'median'),
+                        latencia_media=('latencia_horas', 'mean'))
+    por_pr['proporcao_respondida'] = por_pr['respondidos'] / por_pr['comentarios']
+    return por_pr.reset_index()
+
+
+def responsividade_por_faixa(por_comentario, ordem=('E', 'D', 'C', 'B', 'A')):
+    """
+    Distribuição da latência por faixa: contagens, proporção respondida, média e quantis.
+    """
+    grupos = por_comentario.groupby('faixa')['latencia_horas']
+    resumo = pd.DataFrame({'comentarios': grupos.size(), 'respondidos': grupos.count(), 'media': grupos.mean()})
+    resumo['proporcao_respondida'] = resumo['respondidos'] / resumo['comentarios']
+    quantis = grupos.quantile(QUANTIS_RESUMO).unstack()
+    quantis.columns = [f'p{int(q * 100)}' for q in quantis.columns]
+    return resumo.join(quantis).reindex(list(ordem))
+
+
+def resumir_responsividade(prs):
+    """
+    Estado parcial da latência por faixa (ver agregados), para o map-reduce por repositório.
+    """
+    return resumir(calcular_responsividade(*tabelas_de_responsividade(prs)), ['latencia_horas'],
+                   distribuicoes=['latencia_horas'])
@@ -0,0 +1,263 @@
+# Testes de significância das diferenças entre faixas para qualquer métrica por PR
+# (tempo_merge_horas, densidade_comentarios, rework_commits, taxa_conformidade, ...):
+#   - teste global: ANOVA de um fator e Kruskal-Wallis;
+#   - comparações par a par (Mann-Whitney ou t de Welch) com correção para comparações
+#     múltiplas (Holm, Bonferroni ou Benjamini-Hochberg);
+#   - intervalos de confiança por bootstrap e p-valores por permutação.
+# As reamostragens são feitas em blocos de réplicas como operações matriciais do NumPy
+# (réplicas x linhas) e os blocos são distribuídos pelo pool compartilhado
+# (carregador_prs.executar_em_lotes). Cada bloco recebe sua própria semente, derivada da
+# semente principal, então o resultado não depende do número de processos.
+# Nos scripts, as reamostragens são opcionais (--reamostragem): os testes clássicos saem
+# sempre, em segundos; as permutações e o bootstrap levam minutos em corpora grandes.
+
+import sys
+from functools import partial
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from carregador_prs import executar_em_lotes
+from instrumentacao import instrumentado
+
+ORDEM_FAIXAS = ['E', 'D', 'C', 'B', 'A']
+REPLICAS_PADRAO = 10000
+REPLICAS_POR_LOTE = 100
+CONFIANCA_PADRAO = 0.95
+ALFA_PADRAO = 0.05
+SEMENTE_PADRAO = 42
+
+
+def grupos_por_faixa(df, coluna, ordem=ORDEM_FAIXAS):
+    """
+    Valores não nulos de 'coluna' por faixa, na ordem pedida; faixas sem valores ficam de fora.
+    """
+    valores = df[coluna].to_numpy(dtype='float64')
+    faixas = df['faixa'].to_numpy()
+    grupos = {}
+    for faixa in ordem:
+        grupo = valores[(faixas == faixa) & ~np.isnan(valores)]
+        if len(grupo):
+            grupos[faixa] = grupo
+    return grupos
+
+
+# --------------------------
+# Testes clássicos
+# --------------------------
+
+def teste_global(grupos):
+    """
+    ANOVA de um fator e Kruskal-Wallis entre todas as faixas.
+    """
+    amostras = [grupo for grupo in grupos.values() if len(grupo) > 1]
+    if len(amostras) < 2:
+        return pd.DataFrame(columns=['teste', 'estatistica', 'p_valor'])
+    anova = stats.f_oneway(*amostras)
+    kruskal = stats.kruskal(*amostras)
+    return pd.DataFrame({
+        'teste': ['anova', 'kruskal_wallis'],
+        'estatistica': [anova.statistic, kruskal.statistic],
+        'p_valor': [anova.pvalue, kruskal.pvalue],
+    })
+
+
+def corrigir_p_valores(p_valores, metodo='holm'):
+    """
+    Correção para comparações múltiplas: 'holm', 'bonferroni' ou 'fdr_bh' (Benjamini-Hochberg).
+    """
+    p = np.asarray(p_valores, dtype='float64')
+    m = len(p)
+    if m == 0:
+        return p
+    if metodo == 'bonferroni':
+        return np.minimum(p * m, 1.0)
+
+    ordem = np.argsort(p)
+    if metodo == 'holm':
+        ajustados = np.maximum.accumulate((m - np.arange(m)) * p[ordem])
+    elif metodo == 'fdr_bh':
+        ajustados = np.minimum.accumulate((m / np.arange(m, 0, -1) * p[ordem][::-1]))[::-1]
+    else:
+        raise ValueError(f"Método de correção desconhecido: '{metodo}'")
+    resultado = np.empty(m)
+    resultado[ordem] = np.minimum(ajustados, 1.0)
+    return resultado
+
+
+def comparacoes_pareadas(grupos, teste='mannwhitney', correcao='holm', alfa=ALFA_PADRAO):
+    """
+    Compara todas as faixas duas a duas com Mann-Whitney ('mannwhitney') ou t de Welch ('welch')
+    e ajusta os p-valores para comparações múltiplas.
+    """
+    linhas = []
+    for faixa_1, faixa_2 in combinations(grupos, 2):
+        a, b = grupos[faixa_1], grupos[faixa_2]
+        if teste == 'mannwhitney':
+            resultado = stats.mannwhitneyu(a, b, alternative='two-sided')
+        elif teste == 'welch':
+            resultado = stats.ttest_ind(a, b, equal_var=False)
+        else:
+            raise ValueError(f"Teste pareado desconhecido: '{teste}'")
+        linhas.append((faixa_1, faixa_2, a.mean() - b.mean(), resultado.statistic, resultado.pvalue))
+
+    pares = pd.DataFrame.from_records(
+        linhas, columns=['faixa_1', 'faixa_2', 'diferenca_medias', 'estatistica', 'p_valor'])
+    pares['p_ajustado'] = corrigir_p_valores(pares['p_valor'], correcao)
+    pares['significativo'] = pares['p_ajustado'] < alfa
+    return pares
+
+
+# --------------------------
+# Reamostragem (executada nos processos do pool)
+# --------------------------
+
+def _sementes(semente, quantidade):
+    return np.random.SeedSequence(semente).spawn(quantidade)
+
+
+def _tamanhos_de_lote(replicas, tamanho_lote):
+    return [min(tamanho_lote, replicas - inicio) for inicio in range(0, replicas, tamanho_lote)]
+
+
+def _bootstrap_lote(tarefa):
+    """
+    Médias de 'replicas' reamostragens com reposição de um grupo, numa só operação:
+    uma matriz de índices (réplicas x n) indexa o vetor de valores.
+    """
+    grupo, valores, semente, replicas = tarefa
+    gerador = np.random.default_rng(semente)
+    indices = gerador.integers(0, len(valores), size=(replicas, len(valores)), dtype=np.int32)
+    return grupo, valores[indices].mean(axis=1)
+
+
+def _soma_entre_grupos(somas, contagens):
+    # Σ n_k·média_k², que ordena as permutações da mesma forma que o F da ANOVA
+    # (a soma total dos quadrados não muda ao permutar os rótulos)
+    return (somas ** 2 / np.maximum(contagens, 1)).sum(axis=-1)
+
+
+def _permutacao_lote(tarefa, valores, inicios):
+    """
+    Estatística entre grupos para 'replicas' permutações, numa só operação: os valores
+    (ordenados por grupo) são embaralhados por linha de uma matriz (réplicas x n), e as
+    somas de cada grupo saem de um reduceat sobre as mesmas fatias contíguas.
+    """
+    semente, replicas = tarefa
+    gerador = np.random.default_rng(semente)
+    permutados = np.tile(valores, (replicas, 1))
+    gerador.permuted(permutados, axis=1, out=permutados)
+    somas = np.add.reduceat(permutados, inicios, axis=1)
+    return _soma_entre_grupos(somas, np.diff(np.append(inicios, len(valores))))
+
+
+def intervalos_bootstrap(grupos, replicas=REPLICAS_PADRAO, confianca=CONFIANCA_PADRAO, workers=None,
+                         semente=SEMENTE_PADRAO, tamanho_lote=REPLICAS_POR_LOTE):
+    """
+    Média de cada faixa com o intervalo de confiança por bootstrap (percentis das médias reamostradas).
+    """
+    tamanhos = _tamanhos_de_lote(replicas, tamanho_lote)
+    tarefas = [
+        (grupo, valores, semente_lote, tamanho)
+        for indice, (grupo, valores) in enumerate(grupos.items())
+        for semente_lote, tamanho in zip(_sementes([semente, indice], len(tamanhos)), tamanhos)
+    ]
+    medias = {grupo: [] for grupo in grupos}
+    for grupo, bloco in executar_em_lotes(_bootstrap_lote, tarefas, workers, True):
+        medias[grupo].append(bloco)
+
+    caudas = [(1 - confianca) / 2 * 100, (1 + confianca) / 2 * 100]
+    linhas = []
+    for grupo, valores in grupos.items():
+        inferior, superior = np.percentile(np.concatenate(medias[grupo]), caudas)
+        linhas.append((grupo, len(valores), valores.mean(), inferior, superior))
+    return pd.DataFrame.from_records(linhas, columns=['faixa', 'n', 'media', 'ic_inferior', 'ic_superior'])
+
+
+def teste_permutacao(grupos, replicas=REPLICAS_PADRAO, workers=None, semente=SEMENTE_PADRAO,
+                     tamanho_lote=REPLICAS_POR_LOTE):
+    """
+    P-valor por permutação da hipótese de que as médias de todos os grupos informados são
+    iguais (com dois grupos, equivale ao teste bilateral da diferença de médias).
+    """
+    valores = np.concatenate(list(grupos.values()))
+    contagens = np.array([len(grupo) for grupo in grupos.values()])
+    inicios = np.concatenate([[0], np.cumsum(contagens)[:-1]])
+    observado = _soma_entre_grupos(np.add.reduceat(valores, inicios), contagens)
+
+    tamanhos = _tamanhos_de_lote(replicas, tamanho_lote)
+    tarefas = list(zip(_sementes(semente, len(tamanhos)), tamanhos))
+    funcao = partial(_permutacao_lote, valores=valores, inicios=inicios)
+    # Tolerância relativa para empates numéricos com o valor observado
+    limite = observado * (1 - 1e-12)
+    extremos = sum(int((bloco >= limite).sum()) for bloco in executar_em_lotes(funcao, tarefas, workers, False))
+    return (extremos + 1) / (replicas + 1)
+
+
+# --------------------------
+# Análise completa de uma métrica
+# --------------------------
+
+@instrumentado('testes_estatisticos')
+def analisar_metrica(df, coluna, ordem=ORDEM_FAIXAS, replicas=REPLICAS_PADRAO, teste='mannwhitney',
+                     correcao='holm', alfa=ALFA_PADRAO, workers=None, semente=SEMENTE_PADRAO):
+    """
+    Executa todos os testes para uma coluna de métrica de um DataFrame com a coluna 'faixa'.
+    Retorna um dicionário com:
+      'global'     -> ANOVA, Kruskal-Wallis e permutação (todas as faixas);
+      'pareado'    -> comparações par a par, com p-valores corrigidos e p-valores por permutação;
+      'intervalos' -> média e intervalo de confiança por bootstrap de cada faixa.
+    Com replicas=0 as reamostragens não são feitas.
+    """
+    grupos = grupos_por_faixa(df, coluna, ordem)
+    global_ = teste_global(grupos)
+    pareado = comparacoes_pareadas(grupos, teste, correcao, alfa)
+
+    if replicas and len(grupos) >= 2:
+        global_.loc[len(global_)] = ['permutacao', np.nan,
+                                     teste_permutacao(grupos, replicas, workers, semente)]
+        p_permutacao = [
+            teste_permutacao({f1: grupos[f1], f2: grupos[f2]}, replicas, workers, semente)
+            for f1, f2 in zip(pareado['faixa_1'], pareado['faixa_2'])
+        ]
+        pareado['p_permutacao'] = p_permutacao
+        pareado['p_permutacao_ajustado'] = corrigir_p_valores(p_permutacao, correcao)
+    intervalos = (intervalos_bootstrap(grupos, replicas, workers=workers, semente=semente)
+                  if replicas else None)
+    return {'global': global_, 'pareado': pareado, 'intervalos': intervalos}
+
+
+def replicas_pedidas(argumentos=None):
+    """
+    Réplicas de reamostragem pedidas na linha de comando de um script: '--reamostragem'
+    (REPLICAS_PADRAO) ou '--reamostragem=N'. Sem a opção, 0 (apenas os testes clássicos).
+    """
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    for argumento in argumentos:
+        if argumento == '--reamostragem':
+            return REPLICAS_PADRAO
+        if argumento.startswith('--reamostragem='):
+            return int(argumento.split('=', 1)[1])
+    return 0
+
+
+def analisar_metricas(df, colunas, **opcoes):
+    """
+    Aplica analisar_metrica a várias colunas; retorna um dicionário coluna -> resultado.
+    """
+    return {coluna: analisar_metrica(df, coluna, **opcoes) for coluna in colunas}
+
+
+def imprimir_resultado(coluna, resultado, alfa=ALFA_PADRAO):
+    """
+    Resumo no console dos testes de uma métrica.
+    """
+    print(f"\n--- Testes de significância: {coluna} ---")
+    print(resultado['global'].to_string(index=False))
+    if resultado['intervalos'] is not None:
+        print(resultado['intervalos'].to_string(index=False))
+    significativos = resultado['pareado'][resultado['pareado']['significativo']]
+    pares = ', '.join(f"{a}x{b}" for a, b in zip(significativos['faixa_1'], significativos['faixa_2']))
+    print(f"Pares com diferença significativa (p ajustado < {alfa}): {pares or 'nenhum'}")